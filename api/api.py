@@ -1,9 +1,11 @@
 import os
+import json
+import math
 from fastapi import FastAPI, Query, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pymongo import MongoClient
 from influxdb_client import InfluxDBClient
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
 import uuid
 import uvicorn
@@ -14,6 +16,13 @@ from fastapi_cache.decorator import cache
 import socket
 import psutil
 import time
+from anyio import from_thread
+
+from durations import parse_duration as parse_flux_duration
+from event_storage import ensure_event_collections
+from influx_tiers import select_tier
+from spatial_queries import parse_polygon, region_visits
+from zone_geometry import GEOMETRY_FIELDS, normalize_zone
 
 app = FastAPI(title="Object Tracking API")
 
@@ -34,6 +43,9 @@ influxdb_bucket = os.environ.get("INFLUXDB_BUCKET", "object_positions")
 mongodb_uri = os.environ.get("MONGODB_URI", "mongodb://localhost:27017/")
 redis_host = os.environ.get("REDIS_HOST", "redis")
 redis_port = int(os.environ.get("REDIS_PORT", "6379"))
+# Compression the data processor applies to raw positions (off, deadband or
+# swinging_door); decides how gaps between stored points are filled
+position_compression = os.environ.get("POSITION_COMPRESSION", "off")
 
 # DB Clients
 influx_client = InfluxDBClient(url=influxdb_url, token=influxdb_token, org=influxdb_org)
@@ -41,18 +53,30 @@ query_api = influx_client.query_api()
 
 mongo_client = MongoClient(mongodb_uri)
 db = mongo_client['object_tracking']
+
+# Live state published by the data processor (e.g. zone occupancy)
+state_redis = redis.Redis(host=redis_host, port=redis_port, decode_responses=True)
 objects_collection = db['objects']
 events_collection = db['events']
 
 # Create database indexes for performance
 def create_indexes():
+    # Create time-series event collections first if configured
+    ensure_event_collections(db)
+    
     # Create indexes for frequently queried collections
     objects_collection.create_index("status")
     db['zones'].create_index("active")
+    db['zones'].create_index("updated_at")
+    objects_collection.create_index([("site", 1), ("floor", 1)])
     db['zone_events'].create_index([("object_id", 1), ("timestamp", -1)])
     db['zone_events'].create_index([("zone_id", 1), ("timestamp", -1)])
     db['events'].create_index([("object_id", 1), ("timestamp", -1)])
     db['events'].create_index("event_type")
+    db['zone_dwell_hourly'].create_index([("zone_id", 1), ("hour", 1)])
+    db['zone_dwell_hourly'].create_index("hour")
+    db['zone_transitions_hourly'].create_index("hour")
+    db['backfill_jobs'].create_index([("status", 1), ("created_at", 1)])
 
 # Initialize FastAPI Cache on startup
 @app.on_event("startup")
@@ -66,20 +90,54 @@ def format_timestamp(timestamp):
     if isinstance(timestamp, datetime):
         return timestamp.isoformat()
     elif isinstance(timestamp, (float, int)):
-        return datetime.fromtimestamp(timestamp).isoformat()
+        # Legacy epoch seconds written before timestamps were BSON dates
+        return datetime.utcfromtimestamp(timestamp).isoformat()
     else:
         return str(timestamp)
 
+def parse_time_range(start, end, default=timedelta(hours=1)):
+    """Parse optional ISO start/end strings, defaulting to the last hour."""
+    end_time = datetime.fromisoformat(end) if end else datetime.now()
+    start_time = datetime.fromisoformat(start) if start else end_time - default
+    return start_time, end_time
+
+def parse_query_time(value):
+    """Parse an ISO time for MongoDB filters as a naive UTC datetime.
+    
+    Stored timestamps are BSON dates in UTC, which PyMongo compares with
+    naive datetimes as UTC. Offsets (including a trailing Z) are converted.
+    """
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def parse_duration(value):
+    """Parse a Flux duration such as '500ms', '5m' or '1h15m' into seconds."""
+    try:
+        return parse_flux_duration(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/")
 def read_root():
     return {"status": "online", "service": "Object Tracking API"}
 
 @app.get("/objects", response_model=List[Dict[str, Any]])
-def get_objects(status: Optional[str] = None, limit: int = 100):
-    """Get all tracked objects with optional status filter"""
+def get_objects(
+    status: Optional[str] = None,
+    site: Optional[str] = None,
+    floor: Optional[str] = None,
+    limit: int = 100
+):
+    """Get all tracked objects with optional status and site/floor filters"""
     query = {}
     if status:
         query["status"] = status
+    if site:
+        query["site"] = site
+    if floor:
+        query["floor"] = floor
     
     objects = list(objects_collection.find(query).limit(limit))
     
@@ -106,9 +164,16 @@ def get_object_history(
     object_id: str, 
     start: Optional[str] = None,
     end: Optional[str] = None,
-    interval: Optional[str] = None
+    interval: Optional[str] = None,
+    max_points: Optional[int] = Query(None, ge=1)
 ):
-    """Get position history for an object with optional time range"""
+    """Get position history for an object with optional time range
+    
+    Reads from the coarsest downsampling tier that satisfies the requested
+    interval, or that still returns about max_points points over the range.
+    """
+    interval_seconds = parse_duration(interval) if interval else 0
+    
     try:
         # Set default time range if not provided
         if not end:
@@ -121,17 +186,42 @@ def get_object_history(
         else:
             start_time = datetime.fromisoformat(start)
         
+        # Coarsest acceptable point spacing in seconds
+        resolution = interval_seconds
+        if not interval and max_points:
+            resolution = (end_time - start_time).total_seconds() / max_points
+        tier = select_tier(start_time, end_time, resolution)
+        
         # Build Flux query
         flux_query = f'''
-        from(bucket: "{influxdb_bucket}")
+        from(bucket: "{tier["bucket"]}")
             |> range(start: {start_time.isoformat()}Z, stop: {end_time.isoformat()}Z)
             |> filter(fn: (r) => r._measurement == "object_position")
             |> filter(fn: (r) => r.object_id == "{object_id}")
         '''
         
-        # Add aggregation if interval specified
-        if interval:
-            flux_query += f'''
+        # Add aggregation if interval specified or the tier is still too fine
+        if not interval and max_points and resolution > max(tier["resolution"], 1):
+            interval = f"{math.ceil(resolution)}s"
+            interval_seconds = math.ceil(resolution)
+        if interval and interval_seconds > tier["resolution"]:
+            if tier["resolution"] == 0 and position_compression == "deadband":
+                # Deadband-compressed positions reconstruct within the
+                # deadband by holding the last stored point, so windows
+                # without a stored point repeat the previous one
+                flux_query += f'''
+            |> aggregateWindow(every: {interval}, fn: mean, createEmpty: true)
+            |> fill(usePrevious: true)
+            |> filter(fn: (r) => exists r._value)
+            '''
+            else:
+                if tier["resolution"] == 0:
+                    # Raw positions may be compressed by the processor; fill
+                    # the gaps between stored points by linear interpolation
+                    # first, which is what the swinging door bound assumes
+                    flux_query = 'import "interpolate"\n' + flux_query + f'''
+            |> interpolate.linear(every: {interval})'''
+                flux_query += f'''
             |> aggregateWindow(every: {interval}, fn: mean, createEmpty: false)
             '''
             
@@ -158,6 +248,337 @@ def get_object_history(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error querying data: {str(e)}")
 
+# Positions per object the heatmap should need at most: longer windows read
+# from a coarser downsampling tier instead of every raw point
+HEATMAP_POINTS_PER_OBJECT = 1000
+
+@app.get("/analytics/heatmap")
+@cache(expire=60)  # Cache for 60 seconds
+def get_activity_heatmap(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    bins: int = Query(20, ge=1, le=500),
+    min_x: float = 0,
+    max_x: float = 100,
+    min_y: float = 0,
+    max_y: float = 100
+):
+    """Get an activity heatmap binned server-side over all objects' positions
+    
+    Long windows are binned from a downsampled tier, so each counted point
+    stands for the tier's resolution rather than one raw position.
+    """
+    if max_x <= min_x or max_y <= min_y:
+        raise HTTPException(status_code=400, detail="Invalid heatmap bounds")
+    
+    try:
+        start_time, end_time = parse_time_range(start, end)
+        cell_w = (max_x - min_x) / bins
+        cell_h = (max_y - min_y) / bins
+        resolution = (end_time - start_time).total_seconds() / HEATMAP_POINTS_PER_OBJECT
+        tier = select_tier(start_time, end_time, resolution)
+        
+        # Bin every position into a grid cell inside InfluxDB, returning
+        # one row per non-empty cell instead of the raw points
+        flux_query = f'''
+        from(bucket: "{tier["bucket"]}")
+            |> range(start: {start_time.isoformat()}Z, stop: {end_time.isoformat()}Z)
+            |> filter(fn: (r) => r._measurement == "object_position")
+            |> filter(fn: (r) => r._field == "x" or r._field == "y")
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+            |> filter(fn: (r) => r.x >= {min_x} and r.x <= {max_x} and r.y >= {min_y} and r.y <= {max_y})
+            |> map(fn: (r) => ({{
+                _time: r._time,
+                cx: if r.x >= {max_x} then {bins - 1} else int(v: (r.x - {min_x}) / {cell_w}),
+                cy: if r.y >= {max_y} then {bins - 1} else int(v: (r.y - {min_y}) / {cell_h}),
+                _value: 1
+            }}))
+            |> group(columns: ["cx", "cy"])
+            |> sum()
+        '''
+        
+        counts = [[0] * bins for _ in range(bins)]
+        for table in query_api.query(flux_query):
+            for record in table.records:
+                counts[record["cy"]][record["cx"]] += record.get_value()
+        
+        return {
+            "start": start_time.isoformat(),
+            "end": end_time.isoformat(),
+            "tier": tier["name"],
+            "x_edges": [min_x + i * cell_w for i in range(bins + 1)],
+            "y_edges": [min_y + i * cell_h for i in range(bins + 1)],
+            "counts": counts
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying data: {str(e)}")
+
+@app.get("/analytics/dwell")
+@cache(expire=60)  # Cache for 60 seconds
+def get_zone_dwell(
+    zone_id: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    hourly: bool = False
+):
+    """Get visit counts and dwell-time histograms per zone
+    
+    Reads the hourly rollups maintained by the data processor, one small
+    document per zone and hour, instead of pairing raw zone events.
+    """
+    try:
+        # Rollup hours are naive UTC, like other stored timestamps
+        end_time = parse_query_time(end) if end else datetime.utcnow()
+        start_time = parse_query_time(start) if start else end_time - timedelta(days=7)
+        query = {"hour": {"$gte": start_time.replace(minute=0, second=0, microsecond=0), "$lte": end_time}}
+        if zone_id:
+            query["zone_id"] = zone_id
+        
+        zones = {}
+        for doc in db['zone_dwell_hourly'].find(query).sort("hour", 1):
+            zone = zones.setdefault(doc["zone_id"], {
+                "zone_id": doc["zone_id"],
+                "visits": 0,
+                "dwell_samples": 0,
+                "total_dwell": 0,
+                "histogram": {},
+                "hours": []
+            })
+            zone["visits"] += doc.get("visits", 0)
+            zone["dwell_samples"] += doc.get("dwell_samples", 0)
+            zone["total_dwell"] += doc.get("total_dwell", 0)
+            for bucket, count in doc.get("histogram", {}).items():
+                zone["histogram"][bucket] = zone["histogram"].get(bucket, 0) + count
+            if hourly:
+                zone["hours"].append({
+                    "hour": format_timestamp(doc["hour"]),
+                    "visits": doc.get("visits", 0),
+                    "total_dwell": doc.get("total_dwell", 0),
+                    "histogram": doc.get("histogram", {})
+                })
+        
+        names = {z["_id"]: z.get("name") for z in db['zones'].find({"_id": {"$in": list(zones)}}, {"name": 1})}
+        for zone in zones.values():
+            zone["zone_name"] = names.get(zone["zone_id"], "Unknown Zone")
+            zone["mean_dwell"] = zone["total_dwell"] / zone["dwell_samples"] if zone["dwell_samples"] else None
+            if not hourly:
+                del zone["hours"]
+        
+        return {
+            "start": start_time.isoformat(),
+            "end": end_time.isoformat(),
+            "zones": list(zones.values())
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying data: {str(e)}")
+
+@app.get("/analytics/transitions")
+@cache(expire=60)  # Cache for 60 seconds
+def get_zone_transitions(
+    start: Optional[str] = None,
+    end: Optional[str] = None
+):
+    """Get the zone-to-zone transition counts over a time range
+    
+    Summed from the processor's hourly transition rollups.
+    """
+    try:
+        # Rollup hours are naive UTC, like other stored timestamps
+        end_time = parse_query_time(end) if end else datetime.utcnow()
+        start_time = parse_query_time(start) if start else end_time - timedelta(days=7)
+        query = {"hour": {"$gte": start_time.replace(minute=0, second=0, microsecond=0), "$lte": end_time}}
+        
+        counts = {}
+        for doc in db['zone_transitions_hourly'].find(query):
+            for to_zone_id, count in doc.get("to", {}).items():
+                key = (doc["from_zone_id"], to_zone_id)
+                counts[key] = counts.get(key, 0) + count
+        
+        zone_ids = {zone_id for pair in counts for zone_id in pair}
+        names = {z["_id"]: z.get("name") for z in db['zones'].find({"_id": {"$in": list(zone_ids)}}, {"name": 1})}
+        
+        return {
+            "start": start_time.isoformat(),
+            "end": end_time.isoformat(),
+            "zones": [{"zone_id": zone_id, "zone_name": names.get(zone_id, "Unknown Zone")} for zone_id in sorted(zone_ids)],
+            "transitions": [
+                {"from_zone": from_zone, "to_zone": to_zone, "count": count}
+                for (from_zone, to_zone), count in sorted(counts.items(), key=lambda item: -item[1])
+            ]
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying data: {str(e)}")
+
+@app.get("/analytics/region-visits")
+@cache(expire=60)  # Cache for 60 seconds
+def get_region_visits(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    min_x: Optional[float] = None,
+    min_y: Optional[float] = None,
+    max_x: Optional[float] = None,
+    max_y: Optional[float] = None,
+    polygon: Optional[str] = None,
+    site: Optional[str] = None,
+    floor: Optional[str] = None
+):
+    """Find which objects were inside a rectangle or polygon between start and end
+    
+    Pass the rectangle as min_x/min_y/max_x/max_y or the polygon as
+    'x1,y1;x2,y2;...', optionally limited to a site and/or floor. Returns
+    each object's first and last time inside.
+    """
+    try:
+        vertices = parse_polygon(polygon) if polygon else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid polygon: {e}")
+    if vertices:
+        bbox = (
+            min(x for x, _ in vertices), min(y for _, y in vertices),
+            max(x for x, _ in vertices), max(y for _, y in vertices)
+        )
+    elif None not in (min_x, min_y, max_x, max_y) and max_x >= min_x and max_y >= min_y:
+        bbox = (min_x, min_y, max_x, max_y)
+    else:
+        raise HTTPException(status_code=400, detail="Provide a polygon or min_x, min_y, max_x and max_y")
+    
+    try:
+        start_time, end_time = parse_time_range(start, end)
+        tier = select_tier(start_time, end_time)
+        visits = region_visits(query_api, tier["bucket"], start_time, end_time, bbox, vertices, site, floor)
+        
+        return {
+            "start": start_time.isoformat(),
+            "end": end_time.isoformat(),
+            "objects": [
+                dict(visit, first_seen=visit["first_seen"].isoformat(), last_seen=visit["last_seen"].isoformat())
+                for visit in visits
+            ]
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying data: {str(e)}")
+
+# How far before a replay chunk to look for the positions it starts from;
+# objects silent for longer are not shown until they report again
+REPLAY_SEED_LOOKBACK = timedelta(minutes=5)
+
+@app.get("/replay/frames")
+@cache(expire=60)  # Cache for 60 seconds
+def get_replay_frames(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    every: str = "1s",
+    chunk: int = Query(0, ge=0),
+    chunk_size: int = Query(300, ge=1, le=3600)
+):
+    """Get time-synchronized position snapshots of all objects for replay.
+    
+    The window is split into chunks of chunk_size frames spaced `every`
+    apart; each request returns one chunk as columnar frames so a client can
+    play one chunk while prefetching the next. The seed frame holds every
+    object's last position before the chunk start. Windows older than the raw
+    retention are replayed from a downsampled tier, which needs `every` to be
+    at least the tier's resolution.
+    """
+    step = parse_duration(every)
+    start_time, end_time = parse_time_range(start, end)
+    tier = select_tier(start_time, end_time, step)
+    if tier["resolution"] > step:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Positions from {start_time.isoformat()} are only kept at {tier['resolution']}s resolution; "
+                   f"replay them with every={tier['resolution']}s or more"
+        )
+    
+    try:
+        chunk_span = timedelta(seconds=step * chunk_size)
+        chunks = max(1, math.ceil((end_time - start_time) / chunk_span))
+        chunk_start = start_time + chunk * chunk_span
+        chunk_end = min(chunk_start + chunk_span, end_time)
+        
+        frames = []
+        object_ids = []
+        object_index = {}
+        seed = {"i": [], "x": [], "y": []}
+        
+        def index_of(obj_id):
+            if obj_id not in object_index:
+                object_index[obj_id] = len(object_ids)
+                object_ids.append(obj_id)
+            return object_index[obj_id]
+        
+        if chunk_start < end_time:
+            # Where every object was when the chunk starts, so objects that
+            # only report now and then are shown from its first frame
+            seed_query = f'''
+            from(bucket: "{tier["bucket"]}")
+                |> range(start: {(chunk_start - REPLAY_SEED_LOOKBACK).isoformat()}Z, stop: {chunk_start.isoformat()}Z)
+                |> filter(fn: (r) => r._measurement == "object_position")
+                |> filter(fn: (r) => r._field == "x" or r._field == "y")
+                |> last()
+                |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+                |> keep(columns: ["_time", "object_id", "x", "y"])
+            '''
+            latest = {}
+            for table in query_api.query(seed_query):
+                for record in table.records:
+                    obj_id = record["object_id"]
+                    if obj_id not in latest or record.get_time() > latest[obj_id].get_time():
+                        latest[obj_id] = record
+            for obj_id, record in latest.items():
+                if record["x"] is not None and record["y"] is not None:
+                    seed["i"].append(index_of(obj_id))
+                    seed["x"].append(record["x"])
+                    seed["y"].append(record["y"])
+            
+            # Last position of every object per time bucket, x/y side by side
+            flux_query = f'''
+            from(bucket: "{tier["bucket"]}")
+                |> range(start: {chunk_start.isoformat()}Z, stop: {chunk_end.isoformat()}Z)
+                |> filter(fn: (r) => r._measurement == "object_position")
+                |> filter(fn: (r) => r._field == "x" or r._field == "y")
+                |> aggregateWindow(every: {every}, fn: last, createEmpty: false)
+                |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+                |> keep(columns: ["_time", "object_id", "x", "y"])
+            '''
+            
+            frames_by_time = {}
+            for table in query_api.query(flux_query):
+                for record in table.records:
+                    frame = frames_by_time.get(record.get_time())
+                    if frame is None:
+                        frame = frames_by_time[record.get_time()] = {"i": [], "x": [], "y": []}
+                    frame["i"].append(index_of(record["object_id"]))
+                    frame["x"].append(record["x"])
+                    frame["y"].append(record["y"])
+            
+            for frame_time in sorted(frames_by_time):
+                frame = frames_by_time[frame_time]
+                frame["t"] = frame_time.timestamp()
+                frames.append(frame)
+        
+        return {
+            "start": start_time.isoformat(),
+            "end": end_time.isoformat(),
+            "every": every,
+            "tier": tier["name"],
+            "chunk": chunk,
+            "chunks": chunks,
+            # Epoch seconds; naive range bounds are UTC like in the Flux range
+            "chunk_start": chunk_start.replace(tzinfo=timezone.utc).timestamp(),
+            "chunk_end": chunk_end.replace(tzinfo=timezone.utc).timestamp(),
+            "object_ids": object_ids,
+            "seed": seed,
+            "frames": frames
+        }
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying data: {str(e)}")
+
 @app.get("/events")
 def get_events(
     event_type: Optional[str] = None,
@@ -176,9 +597,9 @@ def get_events(
     
     time_query = {}
     if start:
-        time_query["$gte"] = datetime.fromisoformat(start)
+        time_query["$gte"] = parse_query_time(start)
     if end:
-        time_query["$lte"] = datetime.fromisoformat(end)
+        time_query["$lte"] = parse_query_time(end)
     
     if time_query:
         query["timestamp"] = time_query
@@ -194,13 +615,28 @@ def get_events(
     
     return events
 
+def clear_zones_cache():
+    """Drop the cached /zones and /zones/{zone_id} responses.
+    
+    Zone endpoints are sync and run in the threadpool, so the async cache
+    clear is run on the event loop and waited for.
+    """
+    from_thread.run(FastAPICache.clear, "zones")
+
 @app.get("/zones")
-@cache(expire=60)  # Cache for 60 seconds
-def get_zones(active_only: bool = True):
-    """Get all zones"""
+@cache(expire=60, namespace="zones")  # Cache for 60 seconds, cleared on zone edits
+def get_zones(active_only: bool = True, site: Optional[str] = None, floor: Optional[str] = None):
+    """Get all zones, or those applying to a site and/or floor
+    
+    Zones without a site or floor apply to every site or floor.
+    """
     query = {}
     if active_only:
         query["active"] = True
+    if site:
+        query["site"] = {"$in": [site, None]}
+    if floor:
+        query["floor"] = {"$in": [floor, None]}
     
     zones = list(db['zones'].find(query))
     for zone in zones:
@@ -208,8 +644,54 @@ def get_zones(active_only: bool = True):
     
     return zones
 
+# Seconds after which a sharded processor's occupancy entries are ignored
+OCCUPANCY_STALE_SECONDS = 30
+
+@app.get("/zones/occupancy")
+def get_zones_occupancy():
+    """Get the live number of objects in each zone
+    
+    Served from the snapshot the data processor publishes to Redis, without
+    touching zone_events. Processors sharded by site/floor publish one entry
+    per zone and shard; their occupants are merged per zone.
+    """
+    try:
+        entries = state_redis.hgetall("zone_occupancy")
+        updated_at = state_redis.get("zone_occupancy:updated_at")
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Occupancy unavailable: {str(e)}")
+    
+    zones = {}
+    now = time.time()
+    for field, entry in entries.items():
+        entry = json.loads(entry)
+        zone_id = entry.pop("zone_id", field)
+        entry.pop("shard", None)
+        if now - entry.pop("updated_at", now) > OCCUPANCY_STALE_SECONDS:
+            continue  # left by a shard that stopped publishing
+        zone = zones.get(zone_id)
+        if zone is None:
+            zones[zone_id] = dict(entry, zone_id=zone_id)
+        else:
+            zone["object_ids"] = sorted(set(zone["object_ids"]) | set(entry["object_ids"]))
+            zone["count"] = len(zone["object_ids"])
+    
+    return {
+        "updated_at": datetime.utcfromtimestamp(float(updated_at)).isoformat() if updated_at else None,
+        "zones": list(zones.values())
+    }
+
+@app.get("/zones/version")
+def get_zones_version():
+    """Get a fingerprint that changes whenever any zone is created, updated or deleted"""
+    count = db['zones'].count_documents({})
+    latest = db['zones'].find_one({}, {"updated_at": 1}, sort=[("updated_at", -1)])
+    updated_at = format_timestamp(latest["updated_at"]) if latest and "updated_at" in latest else ""
+    
+    return {"version": f"{count}:{updated_at}"}
+
 @app.get("/zones/{zone_id}")
-@cache(expire=60)  # Cache for 60 seconds
+@cache(expire=60, namespace="zones")  # Cache for 60 seconds, cleared on zone edits
 def get_zone(zone_id: str):
     """Get a specific zone by ID"""
     zone = db['zones'].find_one({"_id": zone_id})
@@ -225,19 +707,36 @@ def create_zone(zone: dict):
     if "_id" not in zone:
         zone["_id"] = f"zone_{str(uuid.uuid4())[:8]}"
     
-    zone["created_at"] = datetime.now()
-    zone["updated_at"] = datetime.now()
+    # Validate the geometry and drop redundant vertices of free-hand drawings
+    try:
+        normalize_zone(zone)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    zone["created_at"] = datetime.utcnow()
+    zone["updated_at"] = datetime.utcnow()
     zone["active"] = True
     
     db['zones'].insert_one(zone)
     # Invalidate the zones cache when a new zone is created
-    FastAPICache.clear(namespace="zones")
+    clear_zones_cache()
     return {"id": zone["_id"], "status": "created"}
 
 @app.put("/zones/{zone_id}")
 def update_zone(zone_id: str, zone_update: dict):
     """Update an existing zone"""
-    zone_update["updated_at"] = datetime.now()
+    if any(field in zone_update for field in GEOMETRY_FIELDS):
+        # Validate the geometry the zone ends up with
+        existing = db['zones'].find_one({"_id": zone_id})
+        if not existing:
+            raise HTTPException(status_code=404, detail="Zone not found")
+        zone = dict(existing, **zone_update)
+        try:
+            normalize_zone(zone)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        zone_update.update({field: zone[field] for field in GEOMETRY_FIELDS if field in zone_update})
+    zone_update["updated_at"] = datetime.utcnow()
     
     result = db['zones'].update_one(
         {"_id": zone_id},
@@ -248,8 +747,7 @@ def update_zone(zone_id: str, zone_update: dict):
         raise HTTPException(status_code=404, detail="Zone not found")
     
     # Invalidate both the specific zone cache and the zones list cache
-    FastAPICache.clear(namespace=f"zones_{zone_id}")
-    FastAPICache.clear(namespace="zones")
+    clear_zones_cache()
     return {"status": "updated"}
 
 @app.delete("/zones/{zone_id}")
@@ -263,16 +761,72 @@ def delete_zone(zone_id: str, hard_delete: bool = False):
         # Soft delete
         result = db['zones'].update_one(
             {"_id": zone_id},
-            {"$set": {"active": False, "updated_at": datetime.now()}}
+            {"$set": {"active": False, "updated_at": datetime.utcnow()}}
         )
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Zone not found")
     
     # Invalidate both the specific zone cache and the zones list cache
-    FastAPICache.clear(namespace=f"zones_{zone_id}")
-    FastAPICache.clear(namespace="zones")
+    clear_zones_cache()
     return {"status": "deleted"}
 
+@app.post("/zones/{zone_id}/backfill")
+def backfill_zone(zone_id: str, start: str, end: Optional[str] = None):
+    """Queue a job computing a zone's events from the stored position history
+
+    The data processor runs queued jobs in the background; follow their
+    progress with /backfill-jobs/{job_id}.
+    """
+    if not db['zones'].find_one({"_id": zone_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    start_time = parse_query_time(start)
+    end_time = parse_query_time(end) if end else datetime.utcnow()
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end must be after start")
+
+    job_id = f"backfill_{str(uuid.uuid4())[:8]}"
+    db['backfill_jobs'].insert_one({
+        "_id": job_id,
+        "zone_id": zone_id,
+        "start": start_time,
+        "end": end_time,
+        # Older ranges are only kept in the downsampled tiers
+        "bucket": select_tier(start_time, end_time)["bucket"],
+        "status": "pending",
+        "objects_total": None,
+        "objects_done": 0,
+        "events_inserted": 0,
+        "completed_objects": [],
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    })
+    return {"id": job_id, "status": "pending"}
+
+@app.get("/backfill-jobs")
+def get_backfill_jobs(zone_id: Optional[str] = None, limit: int = 20):
+    """Get the most recent backfill jobs"""
+    query = {"zone_id": zone_id} if zone_id else {}
+    jobs = list(db['backfill_jobs'].find(query, {"completed_objects": 0}).sort("created_at", -1).limit(limit))
+    return [format_backfill_job(job) for job in jobs]
+
+@app.get("/backfill-jobs/{job_id}")
+def get_backfill_job(job_id: str):
+    """Get the status and progress of a backfill job"""
+    job = db['backfill_jobs'].find_one({"_id": job_id}, {"completed_objects": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return format_backfill_job(job)
+
+def format_backfill_job(job):
+    """Convert a backfill job document for JSON output with its progress."""
+    for field in ("start", "end", "created_at", "updated_at", "heartbeat_at"):
+        if field in job:
+            job[field] = format_timestamp(job[field])
+    total = job.get("objects_total")
+    job["progress"] = job.get("objects_done", 0) / total if total else None
+    return job
+
 @app.get("/zone-events")
 @cache(expire=30)  # Cache for 30 seconds
 def get_zone_events(
@@ -295,9 +849,9 @@ def get_zone_events(
     
     time_query = {}
     if start:
-        time_query["$gte"] = datetime.fromisoformat(start)
+        time_query["$gte"] = parse_query_time(start)
     if end:
-        time_query["$lte"] = datetime.fromisoformat(end)
+        time_query["$lte"] = parse_query_time(end)
     
     if time_query:
         query["timestamp"] = time_query
@@ -325,9 +879,9 @@ def get_object_zones(
     
     time_query = {}
     if start:
-        time_query["$gte"] = datetime.fromisoformat(start)
+        time_query["$gte"] = parse_query_time(start)
     if end:
-        time_query["$lte"] = datetime.fromisoformat(end)
+        time_query["$lte"] = parse_query_time(end)
     
     if time_query:
         query["timestamp"] = time_query
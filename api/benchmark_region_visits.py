@@ -0,0 +1,126 @@
+"""
+Benchmark of the region visits query against the client-side approach.
+
+Seeds a dedicated bucket with random-walk positions, then answers "which
+objects were inside this rectangle/polygon" twice: with region_visits()
+(filtering inside InfluxDB) and the way clients had to before, by pulling
+each object's full history and filtering it locally.
+
+Needs a running InfluxDB:
+    python benchmark_region_visits.py --seed [--objects 200] [--minutes 60]
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from influxdb_client import InfluxDBClient, Point
+from influxdb_client.client.write_api import SYNCHRONOUS
+
+from spatial_queries import point_in_polygon, region_visits
+
+BENCH_BUCKET = "region_visits_benchmark"
+
+
+def seed(client, org, objects, minutes, rate, start_time, rng):
+    """Write a random walk per object into the benchmark bucket."""
+    buckets_api = client.buckets_api()
+    bucket = buckets_api.find_bucket_by_name(BENCH_BUCKET)
+    if bucket is not None:
+        buckets_api.delete_bucket(bucket)
+    buckets_api.create_bucket(bucket_name=BENCH_BUCKET, org=org)
+
+    write_api = client.write_api(write_options=SYNCHRONOUS)
+    steps = int(minutes * 60 * rate)
+    for i in range(objects):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        points = []
+        for step in range(steps):
+            x = min(100, max(0, x + rng.uniform(-1, 1)))
+            y = min(100, max(0, y + rng.uniform(-1, 1)))
+            points.append(
+                Point("object_position")
+                .tag("object_id", f"obj_{i}")
+                .field("x", x)
+                .field("y", y)
+                .time(start_time + timedelta(seconds=step / rate))
+            )
+        write_api.write(bucket=BENCH_BUCKET, record=points)
+    return objects * steps
+
+
+def client_side(query_api, object_ids, start_time, end_time, polygon):
+    """Fetch each object's history and filter it locally, as clients used to."""
+    visits = []
+    for object_id in object_ids:
+        flux_query = f'''
+        from(bucket: "{BENCH_BUCKET}")
+            |> range(start: {start_time.isoformat()}Z, stop: {end_time.isoformat()}Z)
+            |> filter(fn: (r) => r._measurement == "object_position")
+            |> filter(fn: (r) => r.object_id == "{object_id}")
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+        '''
+        times = [
+            record.get_time()
+            for table in query_api.query(flux_query)
+            for record in table.records
+            if point_in_polygon(record["x"], record["y"], polygon)
+        ]
+        if times:
+            visits.append({"object_id": object_id, "first_seen": min(times), "last_seen": max(times)})
+    return visits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark region visit queries")
+    parser.add_argument("--seed", action="store_true", help="(re)create the benchmark dataset")
+    parser.add_argument("--objects", type=int, default=200)
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--rate", type=float, default=1, help="positions per object per second")
+    parser.add_argument("--random-seed", type=int, default=1)
+    args = parser.parse_args()
+
+    org = os.environ.get("INFLUXDB_ORG", "tracking")
+    client = InfluxDBClient(
+        url=os.environ.get("INFLUXDB_URL", "http://localhost:8086"),
+        token=os.environ.get("INFLUXDB_TOKEN", "my-token"),
+        org=org,
+        timeout=600_000,
+    )
+    query_api = client.query_api()
+
+    # Fixed window so re-runs without --seed query the same data
+    start_time = datetime(2024, 1, 1)
+    end_time = start_time + timedelta(minutes=args.minutes)
+
+    if args.seed:
+        rng = random.Random(args.random_seed)
+        written = seed(client, org, args.objects, args.minutes, args.rate, start_time, rng)
+        print(f"Seeded {written} positions for {args.objects} objects")
+
+    rectangle = [(40, 40), (60, 40), (60, 60), (40, 60)]
+    triangle = [(20, 20), (80, 30), (50, 80)]
+    object_ids = [f"obj_{i}" for i in range(args.objects)]
+
+    for name, polygon in (("rectangle", rectangle), ("polygon", triangle)):
+        xs = [x for x, _ in polygon]
+        ys = [y for _, y in polygon]
+        bbox = (min(xs), min(ys), max(xs), max(ys))
+
+        begin = time.perf_counter()
+        server = region_visits(query_api, BENCH_BUCKET, start_time, end_time, bbox,
+                               None if polygon is rectangle else polygon)
+        server_time = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        local = client_side(query_api, object_ids, start_time, end_time, polygon)
+        local_time = time.perf_counter() - begin
+
+        same = {v["object_id"] for v in server} == {v["object_id"] for v in local}
+        print(f"{name}: region_visits {server_time:.2f}s, client-side {local_time:.2f}s "
+              f"({local_time / server_time:.1f}x), {len(server)} objects, results match: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Flux duration literals.
+"""
+import re
+
+# Seconds per fixed-length Flux duration unit. Calendar units (mo, y) have
+# no fixed length in seconds and are not accepted.
+DURATION_UNITS = {
+    "ns": 1e-9,
+    "us": 1e-6,
+    "µs": 1e-6,
+    "ms": 0.001,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 604800,
+}
+_DURATION_PART = re.compile(r"(\d+)(ns|us|µs|ms|s|m|h|d|w)")
+
+
+def parse_duration(value):
+    """Parse a Flux duration such as '500ms', '5m' or '1h15m' into seconds.
+
+    Raises:
+        ValueError: If the value is not a positive duration
+    """
+    parts = _DURATION_PART.findall(value or "")
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        raise ValueError(f"Invalid duration: {value}")
+    seconds = sum(int(number) * DURATION_UNITS[unit] for number, unit in parts)
+    if seconds <= 0:
+        raise ValueError(f"Invalid duration: {value}")
+    return seconds
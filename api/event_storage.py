@@ -0,0 +1,58 @@
+"""
+Storage layout of the events and zone_events collections.
+
+In the default "standard" mode both are ordinary collections. In
+"timeseries" mode they are MongoDB time-series collections bucketed by
+object or zone, with documents expiring after EVENTS_TTL_SECONDS.
+"""
+import os
+
+event_storage_mode = os.environ.get("EVENT_STORAGE_MODE", "standard")
+events_ttl_seconds = int(os.environ.get("EVENTS_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Time-series options per collection; zone_events is also indexed by object
+EVENT_COLLECTIONS = {
+    "events": {"timeField": "timestamp", "metaField": "object_id", "granularity": "seconds"},
+    "zone_events": {"timeField": "timestamp", "metaField": "zone_id", "granularity": "seconds"},
+}
+
+
+def is_timeseries(db, name):
+    """Check whether a collection exists as a time-series collection."""
+    info = next(iter(db.list_collections(filter={"name": name})), None)
+    return bool(info and info.get("type") == "timeseries")
+
+
+def create_timeseries_collection(db, kind, name=None, ttl_seconds=None):
+    """Create a time-series event collection with the configured TTL.
+
+    Args:
+        db: object_tracking database
+        kind: Key of EVENT_COLLECTIONS whose options to use
+        name: Collection name, defaults to kind
+        ttl_seconds: Expiry of documents, 0 disables it
+    """
+    ttl_seconds = events_ttl_seconds if ttl_seconds is None else ttl_seconds
+    options = {"timeseries": EVENT_COLLECTIONS[kind]}
+    if ttl_seconds > 0:
+        options["expireAfterSeconds"] = ttl_seconds
+    return db.create_collection(name or kind, **options)
+
+
+def ensure_event_collections(db):
+    """Create the event collections for the configured storage mode.
+
+    Existing ordinary collections are left alone (see migrate_timeseries.py);
+    existing time-series collections get their TTL updated.
+    """
+    if event_storage_mode != "timeseries":
+        return
+
+    existing = set(db.list_collection_names())
+    for name in EVENT_COLLECTIONS:
+        if name not in existing:
+            create_timeseries_collection(db, name)
+        elif is_timeseries(db, name):
+            db.command("collMod", name, expireAfterSeconds=events_ttl_seconds if events_ttl_seconds > 0 else "off")
+        else:
+            print(f"Collection {name} is not a time-series collection; run migrate_timeseries.py")
@@ -0,0 +1,119 @@
+"""
+Downsampling tiers for object positions in InfluxDB.
+
+Raw positions land in the main bucket. Influx tasks roll them up into
+coarser buckets with longer retention, and history queries read from the
+coarsest tier that still satisfies the requested range and resolution.
+
+Run `python influx_tiers.py` to create or update the buckets and tasks.
+"""
+import os
+from datetime import datetime, timedelta
+
+from influxdb_client import BucketRetentionRules, InfluxDBClient, TaskCreateRequest
+
+influxdb_bucket = os.environ.get("INFLUXDB_BUCKET", "object_positions")
+
+# Ordered from finest to coarsest; each rollup reads from the tier before it
+TIERS = [
+    {
+        "name": "raw",
+        "bucket": influxdb_bucket,
+        "resolution": 0,
+        "retention": timedelta(days=int(os.environ.get("INFLUXDB_RAW_RETENTION_DAYS", "7"))),
+    },
+    {
+        "name": "10s",
+        "bucket": f"{influxdb_bucket}_10s",
+        "resolution": 10,
+        "retention": timedelta(days=90),
+    },
+    {
+        "name": "1m",
+        "bucket": f"{influxdb_bucket}_1m",
+        "resolution": 60,
+        "retention": timedelta(days=730),
+    },
+]
+
+
+def select_tier(start_time, end_time, resolution=0, now=None):
+    """Pick the coarsest tier that still answers a query.
+
+    A tier qualifies if its retention covers start_time and its resolution
+    is no coarser than the requested one. If no tier qualifies, the finest
+    tier that still holds start_time is used (or the longest retained one).
+
+    Args:
+        start_time: Start of the queried range (naive UTC)
+        end_time: End of the queried range (naive UTC)
+        resolution: Coarsest acceptable spacing between points, in seconds
+        now: Reference time for retention checks (defaults to utcnow)
+    """
+    now = now or datetime.utcnow()
+    covering = [tier for tier in TIERS if start_time >= now - tier["retention"]]
+    candidates = [tier for tier in covering if tier["resolution"] <= resolution]
+    if candidates:
+        return candidates[-1]
+    if covering:
+        return covering[0]
+    return TIERS[-1]
+
+
+def rollup_flux(source, tier):
+    """Build the Flux task that downsamples the source tier into `tier`."""
+    every = f"{tier['resolution']}s"
+    return f'''
+option task = {{name: "rollup_{tier['bucket']}", every: {every}, offset: 5s}}
+
+from(bucket: "{source['bucket']}")
+    |> range(start: -task.every)
+    |> filter(fn: (r) => r._measurement == "object_position")
+    |> filter(fn: (r) => r._field == "x" or r._field == "y")
+    |> aggregateWindow(every: {every}, fn: mean, createEmpty: false)
+    |> to(bucket: "{tier['bucket']}")
+'''
+
+
+def setup_tiers(client, org):
+    """Create or update the tier buckets, their retention and rollup tasks.
+
+    Args:
+        client: InfluxDBClient with permission to manage buckets and tasks
+        org: Organization name
+    """
+    buckets_api = client.buckets_api()
+    tasks_api = client.tasks_api()
+
+    for tier in TIERS:
+        rules = BucketRetentionRules(type="expire", every_seconds=int(tier["retention"].total_seconds()))
+        bucket = buckets_api.find_bucket_by_name(tier["bucket"])
+        if bucket is None:
+            buckets_api.create_bucket(bucket_name=tier["bucket"], retention_rules=rules, org=org)
+            print(f"Created bucket {tier['bucket']} ({tier['retention'].days}d)")
+        else:
+            bucket.retention_rules = [rules]
+            buckets_api.update_bucket(bucket=bucket)
+            print(f"Updated retention of {tier['bucket']} ({tier['retention'].days}d)")
+
+    for source, tier in zip(TIERS, TIERS[1:]):
+        flux = rollup_flux(source, tier)
+        name = f"rollup_{tier['bucket']}"
+        existing = tasks_api.find_tasks(name=name)
+        if existing:
+            task = existing[0]
+            task.flux = flux
+            tasks_api.update_task(task)
+            print(f"Updated task {name}")
+        else:
+            tasks_api.create_task(task_create_request=TaskCreateRequest(org=org, flux=flux, status="active"))
+            print(f"Created task {name}")
+
+
+if __name__ == "__main__":
+    influx_client = InfluxDBClient(
+        url=os.environ.get("INFLUXDB_URL", "http://localhost:8086"),
+        token=os.environ.get("INFLUXDB_TOKEN", "my-token"),
+        org=os.environ.get("INFLUXDB_ORG", "tracking"),
+    )
+    setup_tiers(influx_client, os.environ.get("INFLUXDB_ORG", "tracking"))
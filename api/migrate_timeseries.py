@@ -0,0 +1,96 @@
+"""
+Move events and zone_events into MongoDB time-series collections.
+
+For each collection that is still an ordinary collection, documents are
+copied in _id batches into a new `<name>_ts` time-series collection
+(resuming from the last copied _id if interrupted). The original is then
+renamed to `<name>_legacy` and the copy takes its name. Legacy epoch-second
+timestamps are converted to dates while copying.
+
+Stop the data processor while the final rename runs, or events written
+between the last batch and the rename stay in `<name>_legacy`.
+
+Usage:
+    python migrate_timeseries.py [--batch-size N] [--ttl-seconds N] [--drop-legacy]
+"""
+import argparse
+import os
+from datetime import datetime, timezone
+
+from pymongo import MongoClient
+
+from event_storage import EVENT_COLLECTIONS, create_timeseries_collection, events_ttl_seconds, is_timeseries
+
+
+def to_datetime(value):
+    """Convert a stored timestamp to a UTC datetime."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromtimestamp(float(value), tz=timezone.utc)
+
+
+def migrate_collection(db, name, batch_size=1000, ttl_seconds=None, drop_legacy=False):
+    """Copy one collection into a time-series collection and swap them.
+
+    Returns:
+        Number of documents copied in this run
+    """
+    if is_timeseries(db, name):
+        print(f"{name}: already a time-series collection")
+        return 0
+    if name not in db.list_collection_names():
+        create_timeseries_collection(db, name, ttl_seconds=ttl_seconds)
+        print(f"{name}: created as a time-series collection")
+        return 0
+
+    target_name = f"{name}_ts"
+    if target_name not in db.list_collection_names():
+        create_timeseries_collection(db, name, target_name, ttl_seconds)
+    source = db[name]
+    target = db[target_name]
+
+    # Resume after the highest _id already copied
+    last = next(iter(target.find({}, {"_id": 1}).sort("_id", -1).limit(1)), None)
+    last_id = last["_id"] if last else None
+    copied = 0
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = list(source.find(query).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+        for doc in batch:
+            doc["timestamp"] = to_datetime(doc["timestamp"])
+        target.insert_many(batch, ordered=False)
+        copied += len(batch)
+        last_id = batch[-1]["_id"]
+        print(f"{name}: {copied} copied")
+
+    source.rename(f"{name}_legacy")
+    target.rename(name)
+    print(f"{name}: now a time-series collection ({copied} documents copied)")
+
+    if drop_legacy:
+        db.drop_collection(f"{name}_legacy")
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert event collections to time-series collections")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--ttl-seconds", type=int, default=events_ttl_seconds, help="document expiry, 0 disables")
+    parser.add_argument("--drop-legacy", action="store_true", help="drop the original collections afterwards")
+    args = parser.parse_args()
+
+    mongo_client = MongoClient(os.environ.get("MONGODB_URI", "mongodb://localhost:27017/"))
+    db = mongo_client["object_tracking"]
+
+    for name in EVENT_COLLECTIONS:
+        migrate_collection(db, name, args.batch_size, args.ttl_seconds, args.drop_legacy)
+
+    # Indexes are recreated by the API on startup
+    print("Done; restart the API service to recreate the indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Convert legacy epoch-second timestamps in MongoDB to BSON dates.
+
+Documents are converted in _id order, one batch per update, and the last
+converted _id of each field is checkpointed in the `migrations` collection,
+so an interrupted run resumes where it stopped. A completed run clears its
+checkpoint, so running again rescans the field and converts documents
+written with epoch seconds since (e.g. by a processor not yet upgraded).
+
+Usage:
+    python migrate_timestamps.py [--batch-size N] [--restart] [--explain]
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+# Timestamp fields written by the processor, per collection
+TIMESTAMP_FIELDS = {
+    "events": ["timestamp"],
+    "zone_events": ["timestamp"],
+    "objects": ["last_updated", "first_seen"],
+}
+
+NUMERIC_TYPES = ["double", "int", "long", "decimal"]
+
+
+def migrate_field(db, collection_name, field, batch_size=1000, restart=False):
+    """Convert one numeric timestamp field to BSON dates in batches.
+
+    Args:
+        db: object_tracking database
+        collection_name: Collection to migrate
+        field: Field holding epoch seconds
+        batch_size: Documents converted per update
+        restart: Ignore the stored checkpoint and scan from the beginning
+
+    Returns:
+        Number of documents converted
+    """
+    collection = db[collection_name]
+    checkpoints = db["migrations"]
+    checkpoint_id = f"timestamps:{collection_name}.{field}"
+
+    checkpoint = None if restart else checkpoints.find_one({"_id": checkpoint_id})
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    converted = 0
+
+    while True:
+        query = {field: {"$type": NUMERIC_TYPES}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        ids = [doc["_id"] for doc in collection.find(query, {"_id": 1}).sort("_id", 1).limit(batch_size)]
+        if not ids:
+            break
+
+        # Convert on the server: seconds -> milliseconds -> date
+        result = collection.update_many(
+            {"_id": {"$in": ids}, field: {"$type": NUMERIC_TYPES}},
+            [{"$set": {field: {"$toDate": {"$toLong": {"$multiply": [f"${field}", 1000]}}}}}]
+        )
+        converted += result.modified_count
+        last_id = ids[-1]
+        checkpoints.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": last_id, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        print(f"{collection_name}.{field}: {converted} converted (up to _id {last_id})")
+
+    # Done: the next run starts over instead of skipping older _ids that
+    # were written with epoch seconds after this run passed them
+    checkpoints.update_one(
+        {"_id": checkpoint_id},
+        {"$set": {"completed_at": datetime.utcnow()}, "$unset": {"last_id": ""}},
+        upsert=True
+    )
+    return converted
+
+
+def explain_range_queries(db):
+    """Print the winning plan of the API's time-range queries.
+
+    After migration each should be an IXSCAN with bounded timestamp
+    ranges rather than a collection scan.
+    """
+    end = datetime.utcnow()
+    start = end - timedelta(hours=1)
+    time_range = {"$gte": start, "$lte": end}
+    sample = db["zone_events"].find_one() or {}
+    queries = [
+        ("events", {"object_id": sample.get("object_id", ""), "timestamp": time_range}),
+        ("zone_events", {"object_id": sample.get("object_id", ""), "timestamp": time_range}),
+        ("zone_events", {"zone_id": sample.get("zone_id", ""), "timestamp": time_range}),
+    ]
+    for collection_name, query in queries:
+        plan = db[collection_name].find(query).sort("timestamp", -1).explain()["queryPlanner"]["winningPlan"]
+        while "inputStage" in plan and plan.get("stage") != "IXSCAN":
+            plan = plan["inputStage"]
+        bounds = plan.get("indexBounds", {}).get("timestamp")
+        print(f"{collection_name} {sorted(query)}: {plan.get('stage')} {plan.get('indexName', '')} timestamp bounds={bounds}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert epoch-second timestamps to BSON dates")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--restart", action="store_true", help="ignore checkpoints and rescan")
+    parser.add_argument("--explain", action="store_true", help="print query plans after migrating")
+    args = parser.parse_args()
+
+    mongo_client = MongoClient(os.environ.get("MONGODB_URI", "mongodb://localhost:27017/"))
+    db = mongo_client["object_tracking"]
+
+    for collection_name, fields in TIMESTAMP_FIELDS.items():
+        for field in fields:
+            total = migrate_field(db, collection_name, field, args.batch_size, args.restart)
+            print(f"{collection_name}.{field}: done, {total} converted")
+
+    if args.explain:
+        explain_range_queries(db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Spatio-temporal queries over the object position history in InfluxDB.
+"""
+
+
+def flux_string(value):
+    """Quote a value as a Flux string literal.
+
+    Backslashes, double quotes and the ${ of string interpolation are
+    escaped, so the value cannot end the literal or inject Flux.
+    """
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("${", "\\${")
+    return f'"{escaped}"'
+
+
+def parse_polygon(value):
+    """Parse 'x1,y1;x2,y2;...' into a list of (x, y) vertices."""
+    vertices = []
+    for pair in value.split(";"):
+        x, y = pair.split(",")
+        vertices.append((float(x), float(y)))
+    if len(vertices) < 3:
+        raise ValueError("A polygon needs at least 3 vertices")
+    return vertices
+
+
+def point_in_polygon(x, y, polygon):
+    """Check if a point is inside a polygon of (x, y) vertices (ray casting)."""
+    inside = False
+    n = len(polygon)
+    j = n - 1
+    for i in range(n):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def region_visits(query_api, bucket, start_time, end_time, bbox, polygon=None, site=None, floor=None):
+    """Find the objects that were inside a region during a time range.
+
+    The time range and bounding box are evaluated inside InfluxDB on the
+    pivoted x/y stream, so only positions inside the box leave the
+    database. For a rectangle InfluxDB also reduces them to the first/last
+    time per object; for a polygon the boxed points are tested exactly here.
+
+    Args:
+        query_api: InfluxDB query API
+        bucket: Bucket holding object_position points
+        start_time: Range start (naive UTC datetime)
+        end_time: Range end (naive UTC datetime)
+        bbox: (min_x, min_y, max_x, max_y) of the region
+        polygon: Optional list of (x, y) vertices inside bbox
+        site: Optional site the positions must be tagged with
+        floor: Optional floor the positions must be tagged with
+
+    Returns:
+        List of {object_id, first_seen, last_seen, samples}, earliest first
+    """
+    min_x, min_y, max_x, max_y = bbox
+    partition = ""
+    if site is not None:
+        partition += f' and r.site == {flux_string(site)}'
+    if floor is not None:
+        partition += f' and r.floor == {flux_string(floor)}'
+    flux_query = f'''
+    data = from(bucket: "{bucket}")
+        |> range(start: {start_time.isoformat()}Z, stop: {end_time.isoformat()}Z)
+        |> filter(fn: (r) => r._measurement == "object_position"{partition})
+        |> filter(fn: (r) => r._field == "x" or r._field == "y")
+        |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+        |> filter(fn: (r) => r.x >= {min_x} and r.x <= {max_x} and r.y >= {min_y} and r.y <= {max_y})
+        |> keep(columns: ["_time", "object_id", "x", "y"])
+        |> group(columns: ["object_id"])
+    '''
+
+    visits = {}
+    if polygon is None:
+        # An object's site/floor series are concatenated by the regroup, so
+        # they are sorted by time before taking the first and last rows
+        flux_query += '''
+    ordered = data |> sort(columns: ["_time"]) |> map(fn: (r) => ({r with _value: 1}))
+    ordered |> first() |> yield(name: "first")
+    ordered |> last() |> yield(name: "last")
+    data |> map(fn: (r) => ({r with _value: 1})) |> count() |> yield(name: "count")
+    '''
+        for table in query_api.query(flux_query):
+            for record in table.records:
+                visit = visits.setdefault(record["object_id"], {"object_id": record["object_id"]})
+                result = record["result"]
+                if result == "first":
+                    visit["first_seen"] = record.get_time()
+                elif result == "last":
+                    visit["last_seen"] = record.get_time()
+                else:
+                    visit["samples"] = record.get_value()
+    else:
+        flux_query += '''
+    data
+    '''
+        for table in query_api.query(flux_query):
+            for record in table.records:
+                if not point_in_polygon(record["x"], record["y"], polygon):
+                    continue
+                time = record.get_time()
+                visit = visits.get(record["object_id"])
+                if visit is None:
+                    visits[record["object_id"]] = {
+                        "object_id": record["object_id"],
+                        "first_seen": time,
+                        "last_seen": time,
+                        "samples": 1
+                    }
+                else:
+                    visit["first_seen"] = min(visit["first_seen"], time)
+                    visit["last_seen"] = max(visit["last_seen"], time)
+                    visit["samples"] += 1
+
+    result = [visit for visit in visits.values() if "first_seen" in visit]
+    result.sort(key=lambda visit: visit["first_seen"])
+    return result
@@ -0,0 +1,163 @@
+"""
+Validation and simplification of zone geometry.
+
+Zones have a 'type' and the matching geometry fields:
+
+- "polygon" (the default): 'polygon', a list of {'x', 'y'} vertices
+- "rect": 'rect', {'min_x', 'min_y', 'max_x', 'max_y'}
+- "circle": 'center', {'x', 'y'}, and 'radius'
+- "multipolygon": 'polygons', a list of {'exterior': vertices,
+  'holes': [vertices, ...]}
+- "line": 'line', a polyline of {'x', 'y'} points (a tripwire)
+
+Any zone may also name the 'site' and/or 'floor' it applies to.
+
+Free-hand shapes arrive with one vertex per mouse sample. Douglas-Peucker
+keeps only the vertices that move the outline by more than a tolerance,
+capped to a maximum number of vertices, so processor cost follows the
+shape rather than the drawing speed.
+"""
+import math
+import os
+
+zone_simplify_tolerance = float(os.environ.get("ZONE_SIMPLIFY_TOLERANCE", "0.25"))
+zone_max_vertices = int(os.environ.get("ZONE_MAX_VERTICES", "64"))
+
+
+def _segment_distance(p, a, b):
+    """Distance from point p to the segment ab, all (x, y) tuples."""
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length_sq))
+    return math.hypot(p[0] - (a[0] + t * dx), p[1] - (a[1] + t * dy))
+
+
+def _significance(points, first, last, weights):
+    """Douglas-Peucker over points[first..last], storing each split vertex's distance.
+
+    A vertex's weight is capped by that of the split it lies under, so
+    keeping all vertices above a threshold always yields a DP result.
+    """
+    stack = [(first, last, math.inf)]
+    while stack:
+        start, end, limit = stack.pop()
+        if end - start < 2:
+            continue
+        index, distance = max(
+            ((i, _segment_distance(points[i], points[start], points[end])) for i in range(start + 1, end)),
+            key=lambda item: item[1]
+        )
+        weights[index] = min(distance, limit)
+        stack.append((start, index, weights[index]))
+        stack.append((index, end, weights[index]))
+
+
+def simplify(vertices, closed=True, tolerance=None, max_vertices=None):
+    """Simplify a polygon or polyline of {'x', 'y'} vertices.
+
+    Args:
+        vertices: List of {'x', 'y'} dicts
+        closed: Whether the vertices form a closed polygon
+        tolerance: Maximum distance the outline may move
+        max_vertices: Maximum number of vertices kept
+
+    Returns:
+        New list of {'x', 'y'} dicts (the input if nothing can be removed)
+    """
+    tolerance = zone_simplify_tolerance if tolerance is None else tolerance
+    max_vertices = zone_max_vertices if max_vertices is None else max_vertices
+    points = [(float(v['x']), float(v['y'])) for v in vertices]
+    if closed and len(points) > 1 and points[0] == points[-1]:
+        # The drawn path returns to its start; the ring closes implicitly
+        points.pop()
+    minimum = 3 if closed else 2
+    if len(points) <= minimum:
+        return vertices
+
+    weights = [0.0] * len(points)
+    weights[0] = math.inf
+    if closed:
+        # Split the ring at the vertex farthest from the first one
+        far = max(range(len(points)), key=lambda i: math.hypot(points[i][0] - points[0][0], points[i][1] - points[0][1]))
+        if far == 0:
+            return vertices
+        ring = points + [points[0]]
+        weights[far] = math.inf
+        weights.append(math.inf)
+        _significance(ring, 0, far, weights)
+        _significance(ring, far, len(points), weights)
+        weights.pop()
+    else:
+        weights[-1] = math.inf
+        _significance(points, 0, len(points) - 1, weights)
+
+    ranked = sorted(range(len(points)), key=lambda i: weights[i], reverse=True)
+    keep = [
+        i for rank, i in enumerate(ranked[:max(max_vertices, minimum)])
+        if rank < minimum or weights[i] > tolerance
+    ]
+    if len(keep) >= len(points):
+        return vertices
+    return [{"x": points[i][0], "y": points[i][1]} for i in sorted(keep)]
+
+
+ZONE_TYPES = ("polygon", "rect", "circle", "multipolygon", "line")
+GEOMETRY_FIELDS = ("type", "polygon", "rect", "center", "radius", "polygons", "line", "site", "floor")
+
+
+def _vertices(value, minimum, what):
+    """Validate a list of {'x', 'y'} vertices with numeric coordinates."""
+    if not isinstance(value, list) or len(value) < minimum:
+        raise ValueError(f"{what} needs at least {minimum} points")
+    return [{"x": float(v["x"]), "y": float(v["y"])} for v in value]
+
+
+def normalize_zone(zone):
+    """Validate a zone's geometry and simplify it, in place.
+
+    Raises:
+        ValueError: If the type is unknown or its geometry fields are invalid
+    """
+    for field in ("site", "floor"):
+        # Partitions are matched as strings; empty means everywhere
+        if field in zone:
+            zone[field] = str(zone[field]) if zone[field] not in (None, "") else None
+
+    zone_type = zone.get("type") or "polygon"
+    if zone_type not in ZONE_TYPES:
+        raise ValueError(f"Unknown zone type: {zone_type}")
+    try:
+        if zone_type == "polygon":
+            zone["polygon"] = simplify(_vertices(zone.get("polygon"), 3, "polygon"), closed=True)
+        elif zone_type == "rect":
+            rect = zone["rect"]
+            x0, x1 = sorted((float(rect["min_x"]), float(rect["max_x"])))
+            y0, y1 = sorted((float(rect["min_y"]), float(rect["max_y"])))
+            zone["rect"] = {"min_x": x0, "min_y": y0, "max_x": x1, "max_y": y1}
+        elif zone_type == "circle":
+            zone["center"] = {"x": float(zone["center"]["x"]), "y": float(zone["center"]["y"])}
+            zone["radius"] = float(zone["radius"])
+            if zone["radius"] <= 0:
+                raise ValueError("radius must be positive")
+        elif zone_type == "multipolygon":
+            polygons = zone.get("polygons")
+            if not isinstance(polygons, list) or not polygons:
+                raise ValueError("multipolygon needs at least one polygon")
+            zone["polygons"] = [
+                {
+                    "exterior": simplify(_vertices(polygon.get("exterior"), 3, "exterior"), closed=True),
+                    "holes": [
+                        simplify(_vertices(hole, 3, "hole"), closed=True)
+                        for hole in polygon.get("holes") or []
+                    ]
+                }
+                for polygon in polygons
+            ]
+        else:
+            zone["line"] = simplify(_vertices(zone.get("line"), 2, "line"), closed=False)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid {zone_type} geometry: missing or malformed {e}")
+    return zone
@@ -8,11 +8,14 @@ import dash_bootstrap_components as dbc
 # Import configuration
 from config import (
     API_SERVICE_URL, MQTT_BROKER, MQTT_PORT, 
-    MQTT_TOPIC, DEFAULT_TIMEOUT
+    MQTT_TOPIC, DEFAULT_TIMEOUT, LIVE_PUSH_RATE,
+    LIVE_PUSH_QUEUE_SIZE, ZONE_CACHE_REFRESH_INTERVAL,
+    API_POOL_SIZE, API_RETRIES, API_BACKOFF_FACTOR, API_TIMEOUTS
 )
 
 # Import services
-from services import ObjectStore, MQTTClient
+from services import ObjectStore, MQTTClient, LiveBroadcaster, ZoneCache, APIClient
+from routes import register_routes
 
 # Import tab layouts
 from components.tabs.tracking_tab import create_tracking_tab
@@ -25,6 +28,14 @@ from components.tabs.zones_tab import create_zone_management_tab
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 
 # Initialize global objects
+api_client = APIClient(
+    API_SERVICE_URL,
+    timeouts=API_TIMEOUTS,
+    default_timeout=DEFAULT_TIMEOUT,
+    pool_size=API_POOL_SIZE,
+    retries=API_RETRIES,
+    backoff_factor=API_BACKOFF_FACTOR
+)
 object_store = ObjectStore(timeout=DEFAULT_TIMEOUT)
 mqtt_client = MQTTClient(
     broker=MQTT_BROKER, 
@@ -32,29 +43,44 @@ mqtt_client = MQTTClient(
     object_store=object_store,
     topic=MQTT_TOPIC
 )
+live_broadcaster = LiveBroadcaster(
+    object_store,
+    rate=LIVE_PUSH_RATE,
+    queue_size=LIVE_PUSH_QUEUE_SIZE
+)
+register_routes(app.server, live_broadcaster, api_client)
+zone_cache = ZoneCache(api_client, refresh_interval=ZONE_CACHE_REFRESH_INTERVAL)
 
 # Import callbacks and set the shared variables
 import callbacks.tracking_callbacks
 callbacks.tracking_callbacks.object_store = object_store
-callbacks.tracking_callbacks.api_service_url = API_SERVICE_URL
+callbacks.tracking_callbacks.api_client = api_client
+callbacks.tracking_callbacks.zone_cache = zone_cache
 
 import callbacks.historical_callbacks
 callbacks.historical_callbacks.object_store = object_store
-callbacks.historical_callbacks.api_service_url = API_SERVICE_URL
+callbacks.historical_callbacks.api_client = api_client
 
 import callbacks.events_callbacks
-callbacks.events_callbacks.api_service_url = API_SERVICE_URL
+callbacks.events_callbacks.api_client = api_client
 
 import callbacks.analytics_callbacks
 callbacks.analytics_callbacks.object_store = object_store
-callbacks.analytics_callbacks.api_service_url = API_SERVICE_URL
+callbacks.analytics_callbacks.api_client = api_client
 
 import callbacks.zones_callbacks
-callbacks.zones_callbacks.api_service_url = API_SERVICE_URL
+callbacks.zones_callbacks.api_client = api_client
+callbacks.zones_callbacks.zone_cache = zone_cache
 
 # Start MQTT client
 mqtt_client.connect()
 
+# Start broadcasting live deltas to push subscribers
+live_broadcaster.start()
+
+# Load zones and keep them fresh in the background
+zone_cache.start()
+
 # App layout
 app.layout = dbc.Container([
     # Header
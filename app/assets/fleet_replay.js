@@ -0,0 +1,240 @@
+/*
+ * Client-side engine for the time-synchronized fleet replay.
+ *
+ * Frames are fetched from the dashboard's /replay/frames relay one chunk at
+ * a time. While a chunk plays, the next one is prefetched, so playback only
+ * waits for the network when seeking far ahead. Positions carry over from
+ * one chunk into the next; after a seek they start from the chunk's seed
+ * frame, the last position of every object before the chunk start.
+ */
+window.dash_clientside = window.dash_clientside || {};
+
+(function () {
+    var state = {
+        config: null,
+        chunks: {},        // {index: chunk | 'loading'}
+        clock: null,       // replay time, epoch seconds
+        lastTick: null,    // wall clock of the previous interval tick
+        positions: {},     // {object_id: [x, y]} carried forward between frames
+        appliedChunk: -1,
+        appliedFrame: -1
+    };
+
+    function triggeredId() {
+        var ctx = window.dash_clientside.callback_context;
+        if (!ctx || !ctx.triggered || !ctx.triggered.length) {
+            return null;
+        }
+        return ctx.triggered[0].prop_id.split('.')[0];
+    }
+
+    function setStatus(text) {
+        var el = document.getElementById('fleet-replay-status');
+        if (el) {
+            el.textContent = text;
+        }
+    }
+
+    function chunkCount() {
+        var cfg = state.config;
+        return Math.max(1, Math.ceil((cfg.end_ts - cfg.start_ts) / cfg.chunk_seconds));
+    }
+
+    function chunkIndex(clock) {
+        var cfg = state.config;
+        return Math.min(chunkCount() - 1, Math.floor((clock - cfg.start_ts) / cfg.chunk_seconds));
+    }
+
+    function fetchChunk(index) {
+        var cfg = state.config;
+        if (index < 0 || index >= chunkCount() || state.chunks[index]) {
+            return;
+        }
+        state.chunks[index] = 'loading';
+        var params = new URLSearchParams({
+            start: cfg.start,
+            end: cfg.end,
+            every: cfg.every,
+            chunk: index,
+            chunk_size: cfg.chunk_size
+        });
+        var requested = cfg;
+        fetch('/replay/frames?' + params.toString())
+            .then(function (response) {
+                if (!response.ok) {
+                    // The relay passes the API's reason on as {error: ...}
+                    return response.json().catch(function () {
+                        return {};
+                    }).then(function (body) {
+                        throw new Error(body.error || 'HTTP ' + response.status);
+                    });
+                }
+                return response.json();
+            })
+            .then(function (chunk) {
+                if (state.config === requested) {
+                    state.chunks[index] = chunk;
+                    if (index === chunkIndex(state.clock)) {
+                        render();
+                    }
+                }
+            })
+            .catch(function (error) {
+                if (state.config === requested) {
+                    delete state.chunks[index];
+                    setStatus('Error loading replay: ' + error.message);
+                }
+            });
+    }
+
+    function ensureChunks(index) {
+        fetchChunk(index);
+        fetchChunk(index + 1);  // prefetch the next chunk while this one plays
+        // Drop chunks that are no longer needed
+        Object.keys(state.chunks).forEach(function (key) {
+            if (Number(key) < index - 1) {
+                delete state.chunks[key];
+            }
+        });
+    }
+
+    function isLoaded(index) {
+        var chunk = state.chunks[index];
+        return chunk && chunk !== 'loading';
+    }
+
+    function lastFrameAtOrBefore(frames, clock) {
+        var lo = 0;
+        var hi = frames.length - 1;
+        var found = -1;
+        while (lo <= hi) {
+            var mid = (lo + hi) >> 1;
+            if (frames[mid].t <= clock) {
+                found = mid;
+                lo = mid + 1;
+            } else {
+                hi = mid - 1;
+            }
+        }
+        return found;
+    }
+
+    function graphDiv() {
+        var container = document.getElementById('fleet-replay-plot');
+        return container ? container.querySelector('.js-plotly-plot') : null;
+    }
+
+    function render() {
+        if (!state.config || state.clock === null) {
+            return;
+        }
+        var index = chunkIndex(state.clock);
+        ensureChunks(index);
+        if (!isLoaded(index)) {
+            setStatus('Buffering...');
+            return;
+        }
+
+        var chunk = state.chunks[index];
+        var target = lastFrameAtOrBefore(chunk.frames, state.clock);
+        if (index !== state.appliedChunk || target < state.appliedFrame) {
+            // Playing on into the next chunk keeps the positions; any other
+            // seek starts over from the positions at the chunk start
+            if (index !== state.appliedChunk + 1) {
+                state.positions = {};
+            }
+            var seed = chunk.seed || {i: [], x: [], y: []};
+            for (var s = 0; s < seed.i.length; s++) {
+                state.positions[chunk.object_ids[seed.i[s]]] = [seed.x[s], seed.y[s]];
+            }
+            state.appliedChunk = index;
+            state.appliedFrame = -1;
+        }
+        for (var f = state.appliedFrame + 1; f <= target; f++) {
+            var frame = chunk.frames[f];
+            for (var i = 0; i < frame.i.length; i++) {
+                state.positions[chunk.object_ids[frame.i[i]]] = [frame.x[i], frame.y[i]];
+            }
+        }
+        state.appliedFrame = Math.max(state.appliedFrame, target);
+
+        var ids = Object.keys(state.positions);
+        var xs = new Array(ids.length);
+        var ys = new Array(ids.length);
+        for (var k = 0; k < ids.length; k++) {
+            xs[k] = state.positions[ids[k]][0];
+            ys[k] = state.positions[ids[k]][1];
+        }
+
+        var gd = graphDiv();
+        if (gd && gd.data && window.Plotly) {
+            for (var t = 0; t < gd.data.length; t++) {
+                if (gd.data[t].meta === 'fleet-positions') {
+                    window.Plotly.restyle(gd, {x: [xs], y: [ys], text: [ids]}, [t]);
+                    break;
+                }
+            }
+        }
+        setStatus(new Date(state.clock * 1000).toISOString().replace('T', ' ').slice(0, 19) +
+            ' UTC - ' + ids.length + ' objects');
+    }
+
+    function percent() {
+        var cfg = state.config;
+        return 100 * (state.clock - cfg.start_ts) / (cfg.end_ts - cfg.start_ts);
+    }
+
+    window.dash_clientside.fleet = {
+        configure: function (config) {
+            state.config = config;
+            state.chunks = {};
+            state.positions = {};
+            state.appliedChunk = -1;
+            state.appliedFrame = -1;
+            state.lastTick = null;
+            if (!config) {
+                state.clock = null;
+                return '';
+            }
+            state.clock = config.start_ts;
+            ensureChunks(0);
+            return 'Loading...';
+        },
+
+        toggle: function (play, pause, config) {
+            state.lastTick = null;
+            return triggeredId() !== 'fleet-play-button';
+        },
+
+        step: function (nIntervals, sliderValue, speed) {
+            if (!state.config) {
+                return window.dash_clientside.no_update;
+            }
+            var cfg = state.config;
+
+            if (triggeredId() === 'fleet-replay-slider') {
+                // Seek; ignore the echo of values set by playback itself
+                if (Math.abs(sliderValue - percent()) > 0.05) {
+                    state.clock = cfg.start_ts + (cfg.end_ts - cfg.start_ts) * sliderValue / 100;
+                    render();
+                }
+                return window.dash_clientside.no_update;
+            }
+
+            var now = window.performance.now();
+            var elapsed = state.lastTick === null ? 0 : (now - state.lastTick) / 1000;
+            state.lastTick = now;
+
+            var next = Math.min(cfg.end_ts, state.clock + elapsed * parseFloat(speed || '1'));
+            if (!isLoaded(chunkIndex(next))) {
+                // Hold the clock until the chunk arrives
+                ensureChunks(chunkIndex(next));
+                setStatus('Buffering...');
+                return window.dash_clientside.no_update;
+            }
+            state.clock = next;
+            render();
+            return percent();
+        }
+    };
+})();
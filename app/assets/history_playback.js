@@ -0,0 +1,180 @@
+/*
+ * Client-side playback engine for the historical movement animation.
+ *
+ * The columnar history (history-playback-data) is sent to the browser once
+ * per load. Advancing the slider, toggling the animation interval and
+ * rendering each frame (slicing the path and interpolating the current
+ * position) all happen here, without server round trips.
+ */
+window.dash_clientside = window.dash_clientside || {};
+
+(function () {
+    var BASE_RATE = 5;  // percent of the path played per second at 1x speed
+
+    var playback = {lastTick: null};
+    var columns = {data: null, x: null, y: null, seq: null};
+    var pending = {position: null, scheduled: false};
+
+    function triggeredId() {
+        var ctx = window.dash_clientside.callback_context;
+        if (!ctx || !ctx.triggered || !ctx.triggered.length) {
+            return null;
+        }
+        return ctx.triggered[0].prop_id.split('.')[0];
+    }
+
+    function graphDiv() {
+        var container = document.getElementById('history-plot');
+        return container ? container.querySelector('.js-plotly-plot') : null;
+    }
+
+    function traceIndex(gd, meta) {
+        for (var i = 0; i < gd.data.length; i++) {
+            if (gd.data[i].meta === meta) {
+                return i;
+            }
+        }
+        return -1;
+    }
+
+    function loadColumns(data) {
+        // Typed arrays let every frame slice the path without copying
+        if (columns.data !== data) {
+            var n = data.x.length;
+            columns.data = data;
+            columns.x = Float64Array.from(data.x);
+            columns.y = Float64Array.from(data.y);
+            columns.seq = new Float64Array(n);
+            for (var i = 0; i < n; i++) {
+                columns.seq[i] = i;
+            }
+        }
+        return columns;
+    }
+
+    function computeFrame(position, cols) {
+        var n = cols.x.length;
+        var exact = n * position / 100;
+        var index = Math.floor(exact);
+        var fraction = exact - index;
+        var visible = position < 100 ? Math.max(1, index) : n;
+        var x;
+        var y;
+
+        if (index < n - 1) {
+            // Interpolate between the current and the next point
+            x = cols.x[index] + fraction * (cols.x[index + 1] - cols.x[index]);
+            y = cols.y[index] + fraction * (cols.y[index + 1] - cols.y[index]);
+        } else {
+            index = Math.min(index, n - 1);
+            x = cols.x[index];
+            y = cols.y[index];
+        }
+        return {visible: Math.min(visible, n), index: index, x: x, y: y, n: n};
+    }
+
+    function renderTrail(gd, cols, frame, position) {
+        var pathIndex = traceIndex(gd, 'playback-path');
+        var currentIndex = traceIndex(gd, 'playback-current');
+        if (pathIndex < 0 || currentIndex < 0) {
+            return;
+        }
+        var times = cols.data.time;
+        var text = 'Showing ' + frame.visible + ' of ' + frame.n + ' points (' + position.toFixed(1) + '%)' +
+            '<br>Current Time: ' + times[frame.index] +
+            '<br>Position: (' + frame.x.toFixed(2) + ', ' + frame.y.toFixed(2) + ')';
+
+        window.Plotly.update(gd, {
+            x: [cols.x.subarray(0, frame.visible)],
+            y: [cols.y.subarray(0, frame.visible)],
+            'marker.color': [cols.seq.subarray(0, frame.visible)],
+            customdata: [times.slice(0, frame.visible)]
+        }, {'annotations[0].text': text}, [pathIndex]);
+        window.Plotly.restyle(gd, {x: [[frame.x]], y: [[frame.y]]}, [currentIndex]);
+    }
+
+    function renderPositionTime(gd, cols, frame) {
+        var xIndex = traceIndex(gd, 'playback-x');
+        var yIndex = traceIndex(gd, 'playback-y');
+        var currentIndex = traceIndex(gd, 'playback-current');
+        if (xIndex < 0 || yIndex < 0 || currentIndex < 0) {
+            return;
+        }
+        var times = cols.data.time.slice(0, frame.visible);
+        var last = frame.visible - 1;
+
+        window.Plotly.restyle(gd, {
+            x: [times, times],
+            y: [cols.x.subarray(0, frame.visible), cols.y.subarray(0, frame.visible)]
+        }, [xIndex, yIndex]);
+        window.Plotly.restyle(gd, {
+            x: [[times[last], times[last]]],
+            y: [[cols.x[last], cols.y[last]]]
+        }, [currentIndex]);
+    }
+
+    function render() {
+        pending.scheduled = false;
+        var gd = graphDiv();
+        var data = pending.data;
+        if (!gd || !gd.data || !data || !data.x.length || !window.Plotly) {
+            return;
+        }
+        var cols = loadColumns(data);
+        var position = pending.position === null || pending.position === undefined ? 100 : pending.position;
+        var frame = computeFrame(position, cols);
+
+        if (data.viz_type === 'trail') {
+            renderTrail(gd, cols, frame, position);
+        } else if (data.viz_type === 'position_time') {
+            renderPositionTime(gd, cols, frame);
+        }
+    }
+
+    window.dash_clientside.history = {
+        advance: function (play, pause, reset, nIntervals, current, speed) {
+            var trigger = triggeredId();
+            if (trigger === 'reset-button') {
+                playback.lastTick = null;
+                return 0;
+            }
+            if (trigger === 'interval-animation') {
+                // Advance by elapsed wall time so playback speed is independent of frame rate
+                var now = window.performance.now();
+                var elapsed = playback.lastTick === null ? 0 : (now - playback.lastTick) / 1000;
+                playback.lastTick = now;
+                return Math.min(100, (current || 0) + elapsed * BASE_RATE * parseFloat(speed || '1'));
+            }
+            // Play/pause: restart the wall clock on the next tick
+            playback.lastTick = null;
+            return window.dash_clientside.no_update;
+        },
+
+        toggle: function (play, pause, reset, sliderValue) {
+            var trigger = triggeredId();
+            if (trigger === 'play-button') {
+                return false;
+            }
+            if (trigger === 'pause-button' || trigger === 'reset-button') {
+                return true;
+            }
+            if (trigger === 'movement-slider' && sliderValue >= 100) {
+                // Automatically stop when reaching the end
+                return true;
+            }
+            return window.dash_clientside.no_update;
+        },
+
+        render: function (position, figure, data) {
+            // Coalesce updates into one redraw per animation frame, after
+            // any new figure has been drawn
+            pending.position = position;
+            pending.data = data;
+            if (!pending.scheduled) {
+                pending.scheduled = true;
+                window.requestAnimationFrame(render);
+            }
+            return window.dash_clientside.no_update;
+        }
+    };
+})();
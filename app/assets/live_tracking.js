@@ -0,0 +1,144 @@
+/*
+ * Client-side renderer for the live tracking stream.
+ *
+ * Subscribes to the dashboard's /live/stream Server-Sent Events endpoint and
+ * applies the per-tick position deltas to the "Objects" (and "Trails") traces
+ * of the tracking plot in place, so no server callback runs per update.
+ */
+window.dash_clientside = window.dash_clientside || {};
+
+(function () {
+    var STREAM_URL = '/live/stream';
+
+    var state = {
+        source: null,
+        positions: {},   // {id: [x, y]}
+        trails: {},      // {id: [[x, y], ...]}
+        showTrails: false,
+        trailLength: 20,
+        renderPending: false,
+        connected: false
+    };
+
+    function graphDiv() {
+        var container = document.getElementById('tracking-plot');
+        return container ? container.querySelector('.js-plotly-plot') : null;
+    }
+
+    function traceIndex(gd, name) {
+        if (!gd || !gd.data) {
+            return -1;
+        }
+        for (var i = 0; i < gd.data.length; i++) {
+            if (gd.data[i].name === name) {
+                return i;
+            }
+        }
+        return -1;
+    }
+
+    function render() {
+        state.renderPending = false;
+        var gd = graphDiv();
+        var objectsIndex = traceIndex(gd, 'Objects');
+        if (objectsIndex < 0 || !window.Plotly) {
+            return;
+        }
+
+        var ids = Object.keys(state.positions);
+        var xs = new Array(ids.length);
+        var ys = new Array(ids.length);
+        for (var i = 0; i < ids.length; i++) {
+            xs[i] = state.positions[ids[i]][0];
+            ys[i] = state.positions[ids[i]][1];
+        }
+        window.Plotly.restyle(gd, {x: [xs], y: [ys], text: [ids], customdata: [ids]}, [objectsIndex]);
+
+        var trailsIndex = traceIndex(gd, 'Trails');
+        if (state.showTrails && trailsIndex >= 0) {
+            var tx = [];
+            var ty = [];
+            Object.keys(state.trails).forEach(function (id) {
+                var trail = state.trails[id];
+                if (trail.length > 1) {
+                    for (var j = 0; j < trail.length; j++) {
+                        tx.push(trail[j][0]);
+                        ty.push(trail[j][1]);
+                    }
+                    tx.push(null);
+                    ty.push(null);
+                }
+            });
+            window.Plotly.restyle(gd, {x: [tx], y: [ty]}, [trailsIndex]);
+        }
+    }
+
+    function scheduleRender() {
+        if (!state.renderPending) {
+            state.renderPending = true;
+            window.requestAnimationFrame(render);
+        }
+    }
+
+    function applyFrame(frame) {
+        if (frame.full) {
+            state.positions = {};
+            state.trails = {};
+        }
+        for (var i = 0; i < frame.u.length; i++) {
+            var id = frame.u[i][0];
+            var pos = [frame.u[i][1], frame.u[i][2]];
+            state.positions[id] = pos;
+            var trail = state.trails[id] || (state.trails[id] = []);
+            trail.push(pos);
+            if (trail.length > state.trailLength) {
+                trail.splice(0, trail.length - state.trailLength);
+            }
+        }
+        for (var k = 0; k < frame.r.length; k++) {
+            delete state.positions[frame.r[k]];
+            delete state.trails[frame.r[k]];
+        }
+        scheduleRender();
+    }
+
+    function connect() {
+        if (state.source) {
+            return;
+        }
+        state.source = new EventSource(STREAM_URL);
+        state.source.onopen = function () {
+            state.connected = true;
+        };
+        state.source.onmessage = function (event) {
+            applyFrame(JSON.parse(event.data));
+        };
+        state.source.onerror = function () {
+            // EventSource reconnects on its own; the server resends a snapshot
+            state.connected = false;
+        };
+    }
+
+    function disconnect() {
+        if (state.source) {
+            state.source.close();
+            state.source = null;
+        }
+        state.connected = false;
+        state.positions = {};
+        state.trails = {};
+    }
+
+    window.dash_clientside.live = {
+        configure: function (livePush, showTrails, trailLength) {
+            state.showTrails = (showTrails || []).indexOf('show') >= 0;
+            state.trailLength = trailLength || 20;
+            if ((livePush || []).indexOf('live') >= 0) {
+                connect();
+                return 'Receiving live updates';
+            }
+            disconnect();
+            return 'Polling for updates';
+        }
+    };
+})();
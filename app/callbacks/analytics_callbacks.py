@@ -1,72 +1,125 @@
 """
 Callbacks for the analytics functionality.
 """
+from datetime import datetime, timedelta
 from dash import Input, Output, State, callback
 import plotly.graph_objects as go
 import numpy as np
 
 # These will be set by app.py
 object_store = None
-api_service_url = None
+api_client = None
+
+# Selectable analytics timeframes
+TIMEFRAMES = {
+    '1h': timedelta(hours=1),
+    '6h': timedelta(hours=6),
+    '24h': timedelta(days=1),
+    '7d': timedelta(days=7),
+}
+
+def bin_positions(x, y, grid_size, bounds):
+    """Bin positions into a grid_size x grid_size count grid.
+    
+    Args:
+        x: Sequence of x coordinates
+        y: Sequence of y coordinates
+        grid_size: Number of bins per axis
+        bounds: (min_x, max_x, min_y, max_y)
+    
+    Returns:
+        Tuple (counts, x_edges, y_edges) with counts indexed [y][x]
+    """
+    min_x, max_x, min_y, max_y = bounds
+    counts, x_edges, y_edges = np.histogram2d(
+        x, y,
+        bins=grid_size,
+        range=[[min_x, max_x], [min_y, max_y]]
+    )
+    return counts.T, x_edges, y_edges
+
+def create_heatmap_figure(counts, x_edges, y_edges, title):
+    """Create a heatmap figure from a binned count grid."""
+    x_edges = np.asarray(x_edges)
+    y_edges = np.asarray(y_edges)
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=counts,
+        x=(x_edges[:-1] + x_edges[1:]) / 2,  # bin centers
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        colorscale='Viridis',
+        hoverongaps=False,
+        hoverinfo='x+y+z'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title="X Position",
+        yaxis_title="Y Position",
+    )
+    
+    return fig
 
 @callback(
     Output('activity-heatmap', 'figure'),
     Input('generate-heatmap-button', 'n_clicks'),
     State('analytics-timeframe', 'value'),
     State('heatmap-resolution', 'value'),
+    State('min-x', 'value'),
+    State('max-x', 'value'),
+    State('min-y', 'value'),
+    State('max-y', 'value'),
 )
-def generate_activity_heatmap(n_clicks, timeframe, resolution):
+def generate_activity_heatmap(n_clicks, timeframe, resolution, min_x, max_x, min_y, max_y):
     """Generate a heatmap of object activity."""
-    global object_store
+    global object_store, api_client
     
     if not n_clicks:
         return go.Figure()
     
+    # Convert resolution to int
+    grid_size = int(resolution)
+    bounds = (min_x, max_x, min_y, max_y)
+    
+    # Bin the whole timeframe server-side
+    try:
+        if api_client:
+            # Whole minutes, so repeated requests hit the API's cache
+            end_time = datetime.utcnow().replace(second=0, microsecond=0)
+            start_time = end_time - TIMEFRAMES.get(timeframe, TIMEFRAMES['1h'])
+            heatmap = api_client.get_json('/analytics/heatmap', params={
+                'start': start_time.isoformat(),
+                'end': end_time.isoformat(),
+                'bins': grid_size,
+                'min_x': min_x,
+                'max_x': max_x,
+                'min_y': min_y,
+                'max_y': max_y,
+            })
+            return create_heatmap_figure(
+                heatmap['counts'], heatmap['x_edges'], heatmap['y_edges'],
+                f"Object Activity Heatmap ({timeframe} timeframe)"
+            )
+    except Exception as e:
+        print(f"Error fetching heatmap: {e}")
+    
+    # Fall back to the in-memory history of active objects
     try:
-        # Convert resolution to int
-        grid_size = int(resolution)
-        
-        # Create empty grid
-        heatmap_data = np.zeros((grid_size, grid_size))
-        
-        # Get active objects and populate heatmap
         if object_store:
             active_objects = object_store.get_active_objects()
+            points = np.array(
+                [point[:2] for data in active_objects.values() for point in data['history']],
+                dtype=float
+            ).reshape(-1, 2)
             
-            for obj_id, data in active_objects.items():
-                # Get history points
-                history = data['history']
-                
-                # Add each history point to the heatmap
-                for point in history:
-                    x, y, _ = point
-                    # Convert x,y to grid coordinates
-                    grid_x = min(grid_size-1, max(0, int(x / 100 * grid_size)))
-                    grid_y = min(grid_size-1, max(0, int(y / 100 * grid_size)))
-                    
-                    # Increment count at this location
-                    heatmap_data[grid_y, grid_x] += 1
-            
-            # Create heatmap figure
-            fig = go.Figure(data=go.Heatmap(
-                z=heatmap_data,
-                x=np.linspace(0, 100, grid_size),
-                y=np.linspace(0, 100, grid_size),
-                colorscale='Viridis',
-                hoverongaps=False,
-                hoverinfo='x+y+z'
-            ))
-            
-            fig.update_layout(
-                title=f"Object Activity Heatmap ({timeframe} timeframe)",
-                xaxis_title="X Position",
-                yaxis_title="Y Position",
+            counts, x_edges, y_edges = bin_positions(points[:, 0], points[:, 1], grid_size, bounds)
+            return create_heatmap_figure(
+                counts, x_edges, y_edges,
+                "Object Activity Heatmap (recent live data)"
             )
-            
-            return fig
     except Exception as e:
         print(f"Error generating heatmap: {e}")
     
     return go.Figure().update_layout(
         title="Error generating heatmap"
-    ) 
\ No newline at end of file
+    ) 
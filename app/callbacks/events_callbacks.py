@@ -2,10 +2,9 @@
 Callbacks for the events browser functionality.
 """
 from dash import Input, Output, State, callback, html
-import requests
 
 # These will be set by app.py
-api_service_url = None
+api_client = None
 
 @callback(
     Output('events-table-container', 'children'),
@@ -16,13 +15,13 @@ api_service_url = None
 )
 def load_events(n_clicks, event_type, start_date, end_date):
     """Load and display event data."""
-    global api_service_url
+    global api_client
     
     if not n_clicks:
         return html.Div("Click 'Load Events' to view event data")
     
     try:
-        if api_service_url:
+        if api_client:
             # Format dates
             start_time = f"{start_date}T00:00:00"
             end_time = f"{end_date}T23:59:59"
@@ -38,30 +37,27 @@ def load_events(n_clicks, event_type, start_date, end_date):
                 params['event_type'] = event_type
             
             # Get events from API
-            response = requests.get(f"{api_service_url}/events", params=params)
+            events = api_client.get_json('/events', params=params)
             
-            if response.status_code == 200:
-                events = response.json()
-                
-                if events:
-                    # Create table
-                    return html.Div([
-                        html.H5(f"Found {len(events)} events"),
-                        html.Table(
-                            # Header
-                            [html.Tr([html.Th(col) for col in ['Timestamp', 'Object ID', 'Event Type', 'Details']])] +
-                            # Rows
-                            [html.Tr([
-                                html.Td(event.get('timestamp', '')),
-                                html.Td(event.get('object_id', '')),
-                                html.Td(event.get('event_type', '')),
-                                html.Td(str(event.get('details', {})))
-                            ]) for event in events],
-                            className="table table-striped"
-                        )
-                    ])
-                else:
-                    return html.Div("No events found for the selected criteria")
+            if events:
+                # Create table
+                return html.Div([
+                    html.H5(f"Found {len(events)} events"),
+                    html.Table(
+                        # Header
+                        [html.Tr([html.Th(col) for col in ['Timestamp', 'Object ID', 'Event Type', 'Details']])] +
+                        # Rows
+                        [html.Tr([
+                            html.Td(event.get('timestamp', '')),
+                            html.Td(event.get('object_id', '')),
+                            html.Td(event.get('event_type', '')),
+                            html.Td(str(event.get('details', {})))
+                        ]) for event in events],
+                        className="table table-striped"
+                    )
+                ])
+            else:
+                return html.Div("No events found for the selected criteria")
     except Exception as e:
         return html.Div(f"Error loading events: {str(e)}")
     
@@ -1,19 +1,32 @@
 """
 Callbacks for the historical data functionality.
 """
-from dash import Input, Output, State, callback
+from dash import Input, Output, State, callback, clientside_callback, ClientsideFunction
 import plotly.graph_objects as go
 import pandas as pd
-import requests
 import plotly.express as px
 from dash.exceptions import PreventUpdate
 import dash
 from dash import html, dcc
 import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from config import FLEET_REPLAY_CHUNK_FRAMES, HISTORY_AUTO_MAX_POINTS
 
 # These will be set by app.py
 object_store = None
-api_service_url = None
+api_client = None
+
+# Loaded histories shared by all sessions, keyed by
+# (object_id, start_date, end_date, resolution)
+HISTORY_CACHE_SIZE = 16
+_history_cache = OrderedDict()
+_history_cache_lock = threading.Lock()
+
+# Paths longer than this are drawn with WebGL traces
+WEBGL_THRESHOLD = 5000
 
 @callback(
     Output('history-object-selector', 'options'),
@@ -21,16 +34,14 @@ api_service_url = None
 )
 def update_object_dropdown(n):
     """Update the dropdown with available objects."""
-    global api_service_url, object_store
+    global api_client, object_store
     
     try:
         # Get objects from API
-        if api_service_url:
-            response = requests.get(f"{api_service_url}/objects?limit=100")
-            if response.status_code == 200:
-                objects = response.json()
-                options = [{'label': obj['_id'], 'value': obj['_id']} for obj in objects]
-                return options
+        if api_client:
+            objects = api_client.get_json('/objects', params={'limit': 100})
+            options = [{'label': obj['_id'], 'value': obj['_id']} for obj in objects]
+            return options
     except Exception as e:
         print(f"Error fetching objects for dropdown: {e}")
     
@@ -41,358 +52,331 @@ def update_object_dropdown(n):
     
     return []
 
+def get_history_frame(object_id, start_date, end_date, resolution, refresh=False):
+    """Get the history of an object as a DataFrame, fetching it at most once.
+    
+    Histories are cached per (object, range, resolution) so slider moves and
+    visualization changes only re-slice data that is already loaded.
+    Pass refresh=True to fetch again regardless of the cache.
+    """
+    global api_client
+    
+    key = (object_id, start_date, end_date, resolution)
+    with _history_cache_lock:
+        if key in _history_cache and not refresh:
+            _history_cache.move_to_end(key)
+            return _history_cache[key]
+    
+    # Format dates
+    start_time = f"{start_date}T00:00:00"
+    end_time = f"{end_date}T23:59:59"
+    
+    # Add interval parameter if not raw data; 'auto' lets the API pick a
+    # downsampled tier that yields about HISTORY_AUTO_MAX_POINTS points
+    params = {'start': start_time, 'end': end_time}
+    if resolution == 'auto':
+        params['max_points'] = HISTORY_AUTO_MAX_POINTS
+    elif resolution != 'raw':
+        params['interval'] = resolution
+    
+    # Get history from API
+    history_data = api_client.get_json('/objects/{object_id}/history', params=params, object_id=object_id)
+    
+    # Convert to DataFrame
+    df = pd.DataFrame(history_data)
+    
+    with _history_cache_lock:
+        _history_cache[key] = df
+        while len(_history_cache) > HISTORY_CACHE_SIZE:
+            _history_cache.popitem(last=False)
+    return df
+
 @callback(
-    Output('history-plot', 'figure'),
-    Input('history-viz-type', 'value'),
+    Output('history-data-store', 'data'),
     Input('load-history-button', 'n_clicks'),
-    Input('movement-slider', 'value'),
     State('history-object-selector', 'value'),
     State('history-date-range', 'start_date'),
     State('history-date-range', 'end_date'),
     State('history-resolution', 'value'),
 )
-def update_viz_type(viz_type, n_clicks, slider_position, object_id, start_date, end_date, resolution):
-    """Update visualization based on selected type and slider position."""
+def load_history(n_clicks, object_id, start_date, end_date, resolution):
+    """Load the selected history once and remember which one is shown."""
     if not n_clicks or not object_id:
-        return go.Figure()
+        return None
     
     try:
-        # Format dates
-        start_time = f"{start_date}T00:00:00"
-        end_time = f"{end_date}T23:59:59"
-        
-        # Add interval parameter if not raw data
-        interval_param = f"&interval={resolution}" if resolution != 'raw' else ""
-        
-        # Get history from API
-        response = requests.get(
-            f"{api_service_url}/objects/{object_id}/history?start={start_time}&end={end_time}{interval_param}"
-        )
+        df = get_history_frame(object_id, start_date, end_date, resolution, refresh=True)
+        return {
+            'object_id': object_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'resolution': resolution,
+            'points': len(df),
+        }
+    except Exception as e:
+        print(f"Error loading history: {e}")
+    
+    return None
+
+@callback(
+    Output('history-plot', 'figure'),
+    Output('history-playback-data', 'data'),
+    Input('history-viz-type', 'value'),
+    Input('history-data-store', 'data'),
+)
+def update_viz_type(viz_type, loaded):
+    """Build the visualization once per loaded history and viz type.
+    
+    Playback does not come back here: the columnar history is sent to the
+    browser once and assets/history_playback.js slices and interpolates it
+    for every slider position.
+    """
+    if not loaded:
+        return go.Figure(), None
+    
+    object_id = loaded['object_id']
+    
+    try:
+        # Use the cached history (fetched again only if evicted)
+        df = get_history_frame(object_id, loaded['start_date'], loaded['end_date'], loaded['resolution'])
         
-        if response.status_code == 200:
-            history_data = response.json()
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(history_data)
+        if not df.empty:
+            fig = go.Figure()
+            # WebGL keeps long paths responsive while they are restyled
+            path_trace = go.Scattergl if len(df) > WEBGL_THRESHOLD else go.Scatter
+            last = len(df) - 1
             
-            if not df.empty:
-                fig = go.Figure()
+            # Choose visualization based on type
+            if viz_type == "trail":
+                # Progress info, updated by the client during playback
+                fig.add_annotation(
+                    text=f"Showing {len(df)} of {len(df)} points (100.0%)<br>Current Time: {df['time'].iloc[-1]}<br>Position: ({df['x'].iloc[-1]:.2f}, {df['y'].iloc[-1]:.2f})",
+                    xref="paper", yref="paper",
+                    x=0.5, y=1.05, 
+                    showarrow=False,
+                    font=dict(size=12)
+                )
                 
-                # Choose visualization based on type
-                if viz_type == "trail":
-                    # Calculate how many points to show based on slider position
-                    if slider_position < 100:  # If slider is not at max
-                        points_to_show = max(1, int(len(df) * slider_position / 100))
-                        df_visible = df.iloc[:points_to_show]
-                    else:
-                        df_visible = df
-                    
-                    # Create smoother interpolation for animation
-                    if len(df_visible) > 1:
-                        # Determine the exact position based on fractional slider value
-                        exact_point_index = len(df) * slider_position / 100
-                        integer_part = int(exact_point_index)
-                        fraction_part = exact_point_index - integer_part
-                        
-                        # Ensure we're not at the last point or beyond
-                        if integer_part < len(df) - 1:
-                            # Get the current point and next point for interpolation
-                            current_point = df.iloc[integer_part]
-                            next_point = df.iloc[integer_part + 1]
-                            
-                            # Calculate interpolated position
-                            interp_x = current_point['x'] + fraction_part * (next_point['x'] - current_point['x'])
-                            interp_y = current_point['y'] + fraction_part * (next_point['y'] - current_point['y'])
-                            
-                            # Save interpolated position for animation
-                            current_interp_pos = (interp_x, interp_y)
-                        else:
-                            # At or beyond the last point
-                            if integer_part >= len(df):
-                                integer_part = len(df) - 1
-                            current_interp_pos = (df.iloc[integer_part]['x'], df.iloc[integer_part]['y'])
-                    else:
-                        # Only one point, no interpolation
-                        current_interp_pos = (df_visible['x'].iloc[0], df_visible['y'].iloc[0]) if not df_visible.empty else (0, 0)
-                    
-                    # Add sequential path trace (2D trail)
-                    fig.add_trace(go.Scatter(
-                        x=df_visible['x'],
-                        y=df_visible['y'],
-                        mode='lines+markers',
-                        line=dict(
-                            width=2,
-                            color='rgba(50, 100, 200, 0.7)'
-                        ),
-                        marker=dict(
-                            size=8,
-                            color=df_visible.index,  # Color points by sequence
-                            colorscale='Viridis',
-                            showscale=True,
-                            colorbar=dict(
-                                title="Sequence",
-                                tickvals=[0, len(df_visible)-1] if len(df_visible) > 1 else [0],
-                                ticktext=["Start", "Current"] if len(df_visible) > 1 else ["Start"],
-                                lenmode="fraction",
-                                len=0.6,  # Make colorbar shorter
-                                y=0,     # Move to bottom
-                                yanchor="bottom"
-                            ),
-                            line=dict(width=1, color='DarkSlateGrey')
-                        ),
-                        text=[f"Time: {t}<br>Position: ({x:.2f}, {y:.2f})" 
-                              for t, x, y in zip(df_visible['time'], df_visible['x'], df_visible['y'])],
-                        hoverinfo='text',
-                        name=f"Path of {object_id}"
-                    ))
-                    
-                    # Add arrow markers to show direction
-                    arrow_step = max(1, len(df_visible)//10)  # Adjust for fewer arrows
-                    for i in range(0, len(df_visible)-1, arrow_step):
-                        if i+1 < len(df_visible):
-                            fig.add_annotation(
-                                x=df_visible['x'].iloc[i],
-                                y=df_visible['y'].iloc[i],
-                                ax=df_visible['x'].iloc[i+1],
-                                ay=df_visible['y'].iloc[i+1],
-                                xref="x", yref="y",
-                                axref="x", ayref="y",
-                                showarrow=True,
-                                arrowhead=2,
-                                arrowsize=1,
-                                arrowwidth=1,
-                                arrowcolor="rgba(50, 100, 200, 0.7)"
-                            )
-                    
-                    # Add start point
-                    if len(df_visible) > 0:
-                        fig.add_trace(go.Scatter(
-                            x=[df_visible['x'].iloc[0]],
-                            y=[df_visible['y'].iloc[0]],
-                            mode='markers',
-                            marker=dict(size=15, color='green', symbol='circle-open'),
-                            name="Start"
-                        ))
-                    
-                    # Add smoothly animated current position using interpolation
-                    if len(df_visible) > 0:
-                        # Add an animated marker at the interpolated position
-                        fig.add_trace(go.Scatter(
-                            x=[current_interp_pos[0]],
-                            y=[current_interp_pos[1]],
-                            mode='markers',
-                            marker=dict(
-                                size=16,
-                                color='red',
-                                symbol='diamond',
-                                line=dict(width=2, color='black')
-                            ),
-                            name="Current Position",
-                            hoverinfo='none'
-                        ))
-                    
-                    # Add the full path in lighter color
-                    if slider_position < 100 and len(df) > len(df_visible):
-                        fig.add_trace(go.Scatter(
-                            x=df['x'],
-                            y=df['y'],
-                            mode='lines',
-                            line=dict(width=1, color='rgba(100, 100, 100, 0.2)'),
-                            name="Full Path",
-                            showlegend=True,
-                        ))
-                    
-                    # Update layout
-                    fig.update_layout(
-                        title=f"Movement Path for Object {object_id}",
-                        xaxis_title="X Position",
-                        yaxis_title="Y Position",
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=-0.2,
-                            xanchor="center",
-                            x=0.5
-                        ),
-                        margin=dict(l=20, r=20, t=50, b=100),  # Add more margin at the bottom
-                        hovermode='closest',
-                        # Make the plot square to avoid distortion
-                        yaxis=dict(
-                            scaleanchor="x",
-                            scaleratio=1,
-                        )
-                    )
-                    
-                    # Add info about the current progress
-                    if len(df_visible) > 0:
-                        # Get exact time through interpolation if possible
-                        if len(df) > 1:
-                            exact_point_index = len(df) * slider_position / 100
-                            integer_part = int(exact_point_index)
-                            fraction_part = exact_point_index - integer_part
-                            
-                            if integer_part < len(df) - 1:
-                                # Interpolate between timestamps if they are datetime objects
-                                try:
-                                    current_time = df['time'].iloc[integer_part]
-                                    next_time = df['time'].iloc[integer_part + 1]
-                                    # Just use the closest time point for display - interpolating time is complex
-                                    current_time_str = current_time
-                                except:
-                                    current_time_str = df_visible['time'].iloc[-1] if not df_visible.empty else "N/A"
-                            else:
-                                current_time_str = df_visible['time'].iloc[-1] if not df_visible.empty else "N/A"
-                        else:
-                            current_time_str = df_visible['time'].iloc[-1] if not df_visible.empty else "N/A"
-                        
-                        progress_text = f"Showing {len(df_visible)} of {len(df)} points ({slider_position:.1f}%)"
-                        
-                        fig.add_annotation(
-                            text=f"{progress_text}<br>Current Time: {current_time_str}<br>Position: ({current_interp_pos[0]:.2f}, {current_interp_pos[1]:.2f})",
-                            xref="paper", yref="paper",
-                            x=0.5, y=1.05, 
-                            showarrow=False,
-                            font=dict(size=12)
-                        )
+                # Add the full path in lighter color
+                fig.add_trace(path_trace(
+                    x=df['x'],
+                    y=df['y'],
+                    mode='lines',
+                    line=dict(width=1, color='rgba(100, 100, 100, 0.2)'),
+                    name="Full Path",
+                    showlegend=True,
+                    hoverinfo='none'
+                ))
                 
-                elif viz_type == "heatmap":
-                    # Create a heatmap of positions
-                    x_range = [df['x'].min(), df['x'].max()]
-                    y_range = [df['y'].min(), df['y'].max()]
-                    
-                    # Create 2D histogram
-                    fig = px.density_heatmap(
-                        df, x='x', y='y', 
-                        nbinsx=50, nbinsy=50,
-                        title=f"Position Density for Object {object_id}"
-                    )
-                    
-                    # Improve layout
-                    fig.update_layout(
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=-0.2,
-                            xanchor="center",
-                            x=0.5
+                # Add sequential path trace (2D trail), sliced by the client
+                fig.add_trace(path_trace(
+                    x=df['x'],
+                    y=df['y'],
+                    mode='lines+markers',
+                    line=dict(
+                        width=2,
+                        color='rgba(50, 100, 200, 0.7)'
+                    ),
+                    marker=dict(
+                        size=8,
+                        color=list(range(len(df))),  # Color points by sequence
+                        colorscale='Viridis',
+                        cmin=0,
+                        cmax=max(last, 1),
+                        showscale=True,
+                        colorbar=dict(
+                            title="Sequence",
+                            tickvals=[0, last] if last > 0 else [0],
+                            ticktext=["Start", "End"] if last > 0 else ["Start"],
+                            lenmode="fraction",
+                            len=0.6,  # Make colorbar shorter
+                            y=0,     # Move to bottom
+                            yanchor="bottom"
                         ),
-                        margin=dict(l=20, r=20, t=50, b=100)
+                        line=dict(width=1, color='DarkSlateGrey')
+                    ),
+                    customdata=df['time'],
+                    hovertemplate="Time: %{customdata}<br>Position: (%{x:.2f}, %{y:.2f})<extra></extra>",
+                    name=f"Path of {object_id}",
+                    meta='playback-path'
+                ))
+                
+                # Add arrow markers along the full path to show direction
+                arrow_step = max(1, len(df)//10)  # Adjust for fewer arrows
+                for i in range(0, last, arrow_step):
+                    fig.add_annotation(
+                        x=df['x'].iloc[i],
+                        y=df['y'].iloc[i],
+                        ax=df['x'].iloc[i+1],
+                        ay=df['y'].iloc[i+1],
+                        xref="x", yref="y",
+                        axref="x", ayref="y",
+                        showarrow=True,
+                        arrowhead=2,
+                        arrowsize=1,
+                        arrowwidth=1,
+                        arrowcolor="rgba(50, 100, 200, 0.7)"
                     )
                 
-                elif viz_type == "position_time":
-                    # Calculate how many points to show based on slider
-                    if slider_position < 100:
-                        points_to_show = max(1, int(len(df) * slider_position / 100))
-                        df_visible = df.iloc[:points_to_show]
-                    else:
-                        df_visible = df
-                    
-                    # Create position vs time plot
-                    fig.add_trace(go.Scatter(
-                        x=df_visible['time'],
-                        y=df_visible['x'],
-                        mode='lines+markers',
-                        name='X Position'
-                    ))
-                    
-                    fig.add_trace(go.Scatter(
-                        x=df_visible['time'],
-                        y=df_visible['y'],
-                        mode='lines+markers',
-                        name='Y Position'
-                    ))
-                    
-                    # Add current position marker
-                    if len(df_visible) > 0:
-                        last_time = df_visible['time'].iloc[-1]
-                        fig.add_trace(go.Scatter(
-                            x=[last_time, last_time],
-                            y=[df_visible['x'].iloc[-1], df_visible['y'].iloc[-1]],
-                            mode='markers',
-                            marker=dict(size=10, color='red', symbol='star'),
-                            name="Current Position"
-                        ))
-                    
-                    # Update layout
-                    fig.update_layout(
-                        title=f"Position vs Time for Object {object_id}",
-                        xaxis_title="Time",
-                        yaxis_title="Position",
-                        legend=dict(
-                            orientation="h",
-                            yanchor="bottom",
-                            y=-0.2,
-                            xanchor="center",
-                            x=0.5
-                        ),
-                        margin=dict(l=20, r=20, t=50, b=100),
-                        hovermode='closest'
+                # Add start point
+                fig.add_trace(go.Scatter(
+                    x=[df['x'].iloc[0]],
+                    y=[df['y'].iloc[0]],
+                    mode='markers',
+                    marker=dict(size=15, color='green', symbol='circle-open'),
+                    name="Start"
+                ))
+                
+                # Add current position marker, moved by the client
+                fig.add_trace(go.Scatter(
+                    x=[df['x'].iloc[-1]],
+                    y=[df['y'].iloc[-1]],
+                    mode='markers',
+                    marker=dict(
+                        size=16,
+                        color='red',
+                        symbol='diamond',
+                        line=dict(width=2, color='black')
+                    ),
+                    name="Current Position",
+                    hoverinfo='none',
+                    meta='playback-current'
+                ))
+                
+                # Update layout
+                fig.update_layout(
+                    title=f"Movement Path for Object {object_id}",
+                    xaxis_title="X Position",
+                    yaxis_title="Y Position",
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=-0.2,
+                        xanchor="center",
+                        x=0.5
+                    ),
+                    margin=dict(l=20, r=20, t=50, b=100),  # Add more margin at the bottom
+                    hovermode='closest',
+                    # Make the plot square to avoid distortion
+                    yaxis=dict(
+                        scaleanchor="x",
+                        scaleratio=1,
                     )
+                )
+            
+            elif viz_type == "heatmap":
+                # Create 2D histogram
+                fig = px.density_heatmap(
+                    df, x='x', y='y', 
+                    nbinsx=50, nbinsy=50,
+                    title=f"Position Density for Object {object_id}"
+                )
                 
-                return fig
+                # Improve layout
+                fig.update_layout(
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=-0.2,
+                        xanchor="center",
+                        x=0.5
+                    ),
+                    margin=dict(l=20, r=20, t=50, b=100)
+                )
+            
+            elif viz_type == "position_time":
+                # Create position vs time plot, sliced by the client
+                fig.add_trace(path_trace(
+                    x=df['time'],
+                    y=df['x'],
+                    mode='lines+markers',
+                    name='X Position',
+                    meta='playback-x'
+                ))
+                
+                fig.add_trace(path_trace(
+                    x=df['time'],
+                    y=df['y'],
+                    mode='lines+markers',
+                    name='Y Position',
+                    meta='playback-y'
+                ))
+                
+                # Add current position marker
+                last_time = df['time'].iloc[-1]
+                fig.add_trace(go.Scatter(
+                    x=[last_time, last_time],
+                    y=[df['x'].iloc[-1], df['y'].iloc[-1]],
+                    mode='markers',
+                    marker=dict(size=10, color='red', symbol='star'),
+                    name="Current Position",
+                    meta='playback-current'
+                ))
+                
+                # Update layout
+                fig.update_layout(
+                    title=f"Position vs Time for Object {object_id}",
+                    xaxis_title="Time",
+                    yaxis_title="Position",
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=-0.2,
+                        xanchor="center",
+                        x=0.5
+                    ),
+                    margin=dict(l=20, r=20, t=50, b=100),
+                    hovermode='closest'
+                )
+            
+            # Columnar copy of the history for client-side playback
+            playback_data = {
+                'viz_type': viz_type,
+                'time': df['time'].tolist(),
+                'x': df['x'].tolist(),
+                'y': df['y'].tolist(),
+            }
+            return fig, playback_data
     except Exception as e:
         print(f"Error updating visualization: {e}")
     
     return go.Figure().update_layout(
         title="No history data available for this selection"
-    ) 
+    ), None
 
 # Define state stores for animation
 @callback(
     Output('movement-slider', 'max'),
     Output('movement-slider', 'marks'),
     Output('movement-slider', 'step'),
-    Input('load-history-button', 'n_clicks'),
-    State('history-object-selector', 'value'),
-    State('history-date-range', 'start_date'),
-    State('history-date-range', 'end_date'),
-    State('history-resolution', 'value'),
+    Input('history-data-store', 'data'),
 )
-def setup_slider(n_clicks, object_id, start_date, end_date, resolution):
+def setup_slider(loaded):
     """Setup the slider based on available data points with finer step size."""
-    if not n_clicks or not object_id:
+    if not loaded:
         return 100, {}, 0.25
     
-    try:
-        # Format dates
-        start_time = f"{start_date}T00:00:00"
-        end_time = f"{end_date}T23:59:59"
+    if loaded['points'] > 0:
+        # Create marks for the slider - show some important percentages
+        marks = {
+            0: '0%',
+            25: '25%',
+            50: '50%',
+            75: '75%',
+            100: '100%'
+        }
         
-        # Add interval parameter if not raw data
-        interval_param = f"&interval={resolution}" if resolution != 'raw' else ""
-        
-        # Get history from API
-        response = requests.get(
-            f"{api_service_url}/objects/{object_id}/history?start={start_time}&end={end_time}{interval_param}"
-        )
-        
-        if response.status_code == 200:
-            history_data = response.json()
-            
-            # Get the number of points
-            num_points = len(history_data)
-            
-            if num_points > 0:
-                # Create marks for the slider - show some important percentages
-                marks = {
-                    0: '0%',
-                    25: '25%',
-                    50: '50%',
-                    75: '75%',
-                    100: '100%'
-                }
-                
-                # Use a smaller step size for smoother animation
-                return 100, marks, 0.25
-    
-    except Exception as e:
-        print(f"Error setting up slider: {e}")
+        # Use a smaller step size for smoother animation
+        return 100, marks, 0.25
     
     # Default values with finer step size
     return 100, {0: '0%', 100: '100%'}, 0.25
 
-# Update the animation interval for smoother movement
-@callback(
+# Playback runs entirely in the browser (see assets/history_playback.js):
+# advancing the slider, starting/stopping the animation interval and
+# rendering each frame never reach the server.
+clientside_callback(
+    ClientsideFunction(namespace='history', function_name='advance'),
     Output('movement-slider', 'value'),
     Input('play-button', 'n_clicks'),
     Input('pause-button', 'n_clicks'),
@@ -402,55 +386,9 @@ def setup_slider(n_clicks, object_id, start_date, end_date, resolution):
     State('playback-speed', 'value'),
     prevent_initial_call=True
 )
-def control_animation(play, pause, reset, n_intervals, current_value, speed):
-    """Control the animation playback of the movement with smoother transitions."""
-    ctx = dash.callback_context
-    
-    if not ctx.triggered:
-        return current_value
-    
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    
-    if button_id == 'play-button':
-        # Start animation - this will trigger the interval
-        return current_value
-    
-    elif button_id == 'pause-button':
-        # Pause animation - no change to value
-        return current_value
-    
-    elif button_id == 'reset-button':
-        # Reset to beginning
-        return 0
-    
-    elif button_id == 'interval-animation':
-        # Use smaller increments for smoother animation
-        speed_factor = float(speed)
-        # Smaller increment for smoother animation (0.5 instead of 1)
-        increment = 0.25 * speed_factor
-        new_value = current_value + increment
-        
-        # Stop at 100%
-        if new_value > 100:
-            return 100
-        
-        return new_value
-    
-    return current_value
-
-# Add this to your layout in the historical_tab.py file:
-# Just before the end of the animation-controls div
-html.Div([
-    dcc.Interval(
-        id='interval-animation',
-        interval=50,  # 100ms = 0.1 seconds
-        n_intervals=0,
-        disabled=True
-    )
-]),
 
-# Control the interval based on play/pause
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace='history', function_name='toggle'),
     Output('interval-animation', 'disabled'),
     Input('play-button', 'n_clicks'),
     Input('pause-button', 'n_clicks'),
@@ -458,27 +396,101 @@ html.Div([
     Input('movement-slider', 'value'),
     prevent_initial_call=True
 )
-def toggle_animation_interval(play, pause, reset, slider_value):
-    """Enable or disable the animation interval."""
-    ctx = dash.callback_context
+
+clientside_callback(
+    ClientsideFunction(namespace='history', function_name='render'),
+    Output('history-playback-frame', 'children'),
+    Input('movement-slider', 'value'),
+    Input('history-plot', 'figure'),
+    State('history-playback-data', 'data'),
+)
+
+# Fleet replay: frame intervals selectable in the tab, in seconds
+FLEET_REPLAY_STEPS = {'1s': 1, '5s': 5, '10s': 10, '1m': 60}
+
+@callback(
+    Output('fleet-replay-plot', 'figure'),
+    Output('fleet-replay-config', 'data'),
+    Input('load-fleet-replay-button', 'n_clicks'),
+    State('fleet-replay-start', 'value'),
+    State('fleet-replay-end', 'value'),
+    State('fleet-replay-every', 'value'),
+    State('min-x', 'value'),
+    State('max-x', 'value'),
+    State('min-y', 'value'),
+    State('max-y', 'value'),
+)
+def load_fleet_replay(n_clicks, start, end, every, min_x, max_x, min_y, max_y):
+    """Prepare a fleet replay; frames are streamed to the browser in chunks."""
+    if not n_clicks:
+        return go.Figure(), None
     
-    if not ctx.triggered:
-        # Default: disabled
-        return True
+    try:
+        end_time = datetime.fromisoformat(end) if end else datetime.utcnow()
+        start_time = datetime.fromisoformat(start) if start else end_time - timedelta(hours=1)
+    except ValueError as e:
+        return go.Figure().update_layout(title=f"Invalid time range: {e}"), None
     
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
+    if end_time <= start_time:
+        return go.Figure().update_layout(title="End must be after start"), None
     
-    if button_id == 'play-button':
-        # Enable interval for animation
-        return False
+    step = FLEET_REPLAY_STEPS.get(every, 1)
+    chunk_seconds = step * FLEET_REPLAY_CHUNK_FRAMES
+    start_ts = start_time.replace(tzinfo=timezone.utc).timestamp()
+    end_ts = end_time.replace(tzinfo=timezone.utc).timestamp()
     
-    elif button_id in ['pause-button', 'reset-button']:
-        # Disable interval
-        return True
+    config = {
+        'start': start_time.isoformat(),
+        'end': end_time.isoformat(),
+        'every': every,
+        'chunk_size': FLEET_REPLAY_CHUNK_FRAMES,
+        'chunk_seconds': chunk_seconds,
+        'start_ts': start_ts,
+        'end_ts': end_ts,
+    }
     
-    elif button_id == 'movement-slider' and slider_value >= 100:
-        # Automatically stop when reaching the end
-        return True
+    # Positions are filled in by assets/fleet_replay.js
+    fig = go.Figure(go.Scattergl(
+        x=[],
+        y=[],
+        mode='markers',
+        marker=dict(size=8),
+        hoverinfo='text',
+        name='Objects',
+        meta='fleet-positions'
+    ))
+    fig.update_layout(
+        title=f"Fleet Replay {config['start']} to {config['end']} (UTC)",
+        xaxis=dict(range=[min_x, max_x], title="X Position"),
+        yaxis=dict(range=[min_y, max_y], title="Y Position"),
+        margin=dict(l=20, r=20, t=50, b=20),
+        showlegend=False,
+        uirevision='fleet-replay',
+    )
     
-    # No change
-    return dash.no_update 
\ No newline at end of file
+    return fig, config
+
+clientside_callback(
+    ClientsideFunction(namespace='fleet', function_name='configure'),
+    Output('fleet-replay-status', 'children'),
+    Input('fleet-replay-config', 'data'),
+    prevent_initial_call=True
+)
+
+clientside_callback(
+    ClientsideFunction(namespace='fleet', function_name='toggle'),
+    Output('fleet-replay-interval', 'disabled'),
+    Input('fleet-play-button', 'n_clicks'),
+    Input('fleet-pause-button', 'n_clicks'),
+    Input('fleet-replay-config', 'data'),
+    prevent_initial_call=True
+)
+
+clientside_callback(
+    ClientsideFunction(namespace='fleet', function_name='step'),
+    Output('fleet-replay-slider', 'value'),
+    Input('fleet-replay-interval', 'n_intervals'),
+    Input('fleet-replay-slider', 'value'),
+    State('fleet-playback-speed', 'value'),
+    prevent_initial_call=True
+)
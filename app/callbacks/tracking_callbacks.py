@@ -1,18 +1,26 @@
 """
 Callbacks for the real-time tracking functionality.
 """
-from dash import Input, Output, State, callback
+from dash import Input, Output, State, callback, clientside_callback, ClientsideFunction
 import plotly.graph_objects as go
 import dash
-import requests
 import time
 from dash.dependencies import Input, Output
 from dash import html
 
+from config import LIVE_PUSH_REFRESH_INTERVAL
+from services import APIError
+
 # Import object_store instance from main app
 # This will be set by app.py
 object_store = None
-api_service_url = None  # Add this line to store API URL
+api_client = None
+zone_cache = None
+
+# Rendered details per object, reused while the object has not moved
+# {obj_id: (last_update, children)}
+_details_cache = {}
+_DETAILS_CACHE_SIZE = 64
 
 
 @callback(
@@ -21,7 +29,19 @@ api_service_url = None  # Add this line to store API URL
 )
 def update_interval(value):
     """Updates the refresh interval based on selected frequency."""
-    return (1000 / value)
+    return 1000 / value
+
+
+@callback(
+    Output('tracking-interval', 'interval'),
+    Input('update-frequency', 'value'),
+    Input('live-push', 'value')
+)
+def update_tracking_interval(value, live_push):
+    """Slows server-side redraws down while live push moves the objects."""
+    if 'live' in (live_push or []):
+        return LIVE_PUSH_REFRESH_INTERVAL * 1000
+    return 1000 / value
 
 
 @callback(
@@ -47,7 +67,8 @@ def toggle_trail_length(show_trails):
 
 @callback(
     Output('tracking-plot', 'figure'),
-    Input('interval-component', 'n_intervals'),
+    Output('tracking-zone-version', 'data'),
+    Input('tracking-interval', 'n_intervals'),
     Input('show-trails', 'value'),
     Input('trail-length', 'value'),
     Input('min-x', 'value'),
@@ -56,12 +77,23 @@ def toggle_trail_length(show_trails):
     Input('max-y', 'value'),
     Input('background-image-store', 'data'),
     Input('show-zones', 'value'),
+    Input('live-push', 'value'),
+    State('tracking-zone-version', 'data'),
 )
-def update_graph(n, show_trails, trail_length, min_x, min_y, max_x, max_y, bg_image, show_zones):
+def update_graph(n, show_trails, trail_length, min_x, min_y, max_x, max_y, bg_image, show_zones, live_push,
+                 drawn_zone_version):
     """Updates the tracking plot with real-time data."""
-    global object_store, api_service_url
+    global object_store, zone_cache
     if not object_store:
-        return go.Figure()
+        return go.Figure(), None
+    
+    # With live push enabled the browser applies position deltas itself, so
+    # the slow tracking interval only rebuilds the figure when the zones
+    # have changed; a setting change always rebuilds it
+    live = 'live' in (live_push or [])
+    zone_version = zone_cache.version if zone_cache else None
+    if live and dash.ctx.triggered_id == 'tracking-interval' and zone_version == drawn_zone_version:
+        return dash.no_update, dash.no_update
     
     # Create base figure
     fig = go.Figure()
@@ -84,49 +116,9 @@ def update_graph(n, show_trails, trail_length, min_x, min_y, max_x, max_y, bg_im
             )
         )
     
-    # Add zones if enabled
-    if 'show' in show_zones and api_service_url:
-        try:
-            response = requests.get(f"{api_service_url}/zones")
-            if response.status_code == 200:
-                zones = response.json()
-                
-                for zone in zones:
-                    polygon = zone['polygon']
-                    x_vals = [p['x'] for p in polygon]
-                    y_vals = [p['y'] for p in polygon]
-                    
-                    # Close the polygon
-                    x_vals.append(x_vals[0])
-                    y_vals.append(y_vals[0])
-                    
-                    # Convert hex color to rgba for transparency
-                    hex_color = zone.get('color', '#FF5733')
-                    # Remove # if present
-                    if hex_color.startswith('#'):
-                        hex_color = hex_color[1:]
-                    
-                    # Convert hex to rgb
-                    r = int(hex_color[0:2], 16)
-                    g = int(hex_color[2:4], 16)
-                    b = int(hex_color[4:6], 16)
-                    
-                    # Create rgba string with 0.3 opacity
-                    rgba_color = f'rgba({r},{g},{b},0.3)'
-                    
-                    fig.add_trace(go.Scatter(
-                        x=x_vals,
-                        y=y_vals,
-                        fill="toself",
-                        fillcolor=rgba_color,  # Use rgba format
-                        line=dict(color=f'rgb({r},{g},{b})'),
-                        name=zone.get('name', 'Unnamed Zone'),
-                        text=zone.get('description', ''),
-                        hoverinfo='text',
-                        showlegend=False,
-                    ))
-        except Exception as e:
-            print(f"Error loading zones: {e}")
+    # Add zones if enabled (precomputed by the zone cache, no HTTP here)
+    if 'show' in show_zones and zone_cache:
+        fig.add_traces(zone_cache.get_tracking_traces())
     
     # Get active objects
     active_objects = object_store.get_active_objects()
@@ -154,7 +146,26 @@ def update_graph(n, show_trails, trail_length, min_x, min_y, max_x, max_y, bg_im
     ))
     
     # Add trails if enabled
-    if 'show' in show_trails:
+    if 'show' in show_trails and live:
+        # Single trace the live renderer can restyle in place
+        trails = object_store.get_object_trails(max_trail_points=trail_length)
+        trail_x = []
+        trail_y = []
+        for trail in trails.values():
+            if len(trail['x']) > 1:
+                trail_x.extend(trail['x'] + [None])
+                trail_y.extend(trail['y'] + [None])
+        
+        fig.add_trace(go.Scatter(
+            x=trail_x,
+            y=trail_y,
+            mode='lines',
+            line=dict(width=1, dash='dot'),
+            name='Trails',
+            showlegend=False,
+            hoverinfo='none'
+        ))
+    elif 'show' in show_trails:
         trails = object_store.get_object_trails(max_trail_points=trail_length)
         
         for obj_id, trail in trails.items():
@@ -179,7 +190,16 @@ def update_graph(n, show_trails, trail_length, min_x, min_y, max_x, max_y, bg_im
         hovermode='closest',
     )
     
-    return fig 
+    return fig, zone_version
+
+# Open or close the push stream in the browser (see assets/live_tracking.js)
+clientside_callback(
+    ClientsideFunction(namespace='live', function_name='configure'),
+    Output('live-stream-status', 'children'),
+    Input('live-push', 'value'),
+    Input('show-trails', 'value'),
+    Input('trail-length', 'value'),
+)
 
 @callback(
     [Output('background-image-store', 'data'),
@@ -208,24 +228,39 @@ def update_selected_object(clickData):
 @callback(
     Output('object-details', 'children'),
     Input('selected-object', 'data'),
-    Input('interval-component', 'n_intervals')
+    Input('tracking-interval', 'n_intervals')
 )
 def display_object_details(obj_id, n):
-    global object_store, api_service_url
+    global object_store, api_client
     
     if not obj_id:
         return html.Div("Click on an object to see details")
     
+    # Skip refetching while the object has not been updated since last time
+    last_update = object_store.get_last_update(obj_id) if object_store else None
+    cached = _details_cache.get(obj_id)
+    if cached and last_update is not None and cached[0] == last_update:
+        return cached[1]
+    
     # Try to get API data
     try:
-        if api_service_url:
-            response = requests.get(f"{api_service_url}/objects/{obj_id}")
-            zones_response = requests.get(f"{api_service_url}/objects/{obj_id}/zones?limit=5")
+        if api_client:
+            # Both requests are independent, so issue them concurrently
+            api_data, zone_events = api_client.get_json_many([
+                ('/objects/{object_id}', None, {'object_id': obj_id}),
+                ('/objects/{object_id}/zones', {'limit': 5}, {'object_id': obj_id}),
+            ])
+            for result in (api_data, zone_events):
+                if isinstance(result, Exception) and not isinstance(result, APIError):
+                    raise result
+            if isinstance(api_data, APIError):
+                api_data = None
+            if isinstance(zone_events, APIError):
+                zone_events = None
             
             details = []
             
-            if response.status_code == 200:
-                api_data = response.json()
+            if api_data is not None:
                 details.extend([
                     html.H5(f"Object ID: {obj_id}"),
                     html.P(f"Status: {api_data.get('status', 'Unknown')}"),
@@ -235,34 +270,36 @@ def display_object_details(obj_id, n):
                 ])
             
             # Add zone information
-            if zones_response.status_code == 200:
-                zone_events = zones_response.json()
+            if zone_events:
+                # Find current zones (those with enter but no matching exit)
+                current_zones = set()
+                for event in reversed(zone_events):
+                    if event['event_type'] == 'enter':
+                        current_zones.add(event['zone_name'])
+                    elif event['event_type'] == 'exit' and event['zone_name'] in current_zones:
+                        current_zones.remove(event['zone_name'])
                 
-                if zone_events:
-                    # Find current zones (those with enter but no matching exit)
-                    current_zones = set()
-                    for event in reversed(zone_events):
-                        if event['event_type'] == 'enter':
-                            current_zones.add(event['zone_name'])
-                        elif event['event_type'] == 'exit' and event['zone_name'] in current_zones:
-                            current_zones.remove(event['zone_name'])
-                    
-                    if current_zones:
-                        details.append(html.H6("Current Zones:"))
-                        details.append(html.Ul([
-                            html.Li(zone) for zone in current_zones
-                        ]))
-                    
-                    details.append(html.H6("Recent Zone Activity:"))
+                if current_zones:
+                    details.append(html.H6("Current Zones:"))
                     details.append(html.Ul([
-                        html.Li(f"{event['timestamp'].split('T')[1][:8]} - {event['event_type']} {event['zone_name']}")
-                        for event in zone_events[:5]
+                        html.Li(zone) for zone in current_zones
                     ]))
+                
+                details.append(html.H6("Recent Zone Activity:"))
+                details.append(html.Ul([
+                    html.Li(f"{event['timestamp'].split('T')[1][:8]} - {event['event_type']} {event['zone_name']}")
+                    for event in zone_events[:5]
+                ]))
             
             details.append(html.A("View All Zone Events", href="#", id=f"view-events-{obj_id}", 
                                   className="btn btn-sm btn-info"))
             
-            return html.Div(details)
+            children = html.Div(details)
+            if last_update is not None:
+                if obj_id not in _details_cache and len(_details_cache) >= _DETAILS_CACHE_SIZE:
+                    _details_cache.pop(next(iter(_details_cache)))
+                _details_cache[obj_id] = (last_update, children)
+            return children
             
     except Exception as e:
         # Fallback to local store
@@ -3,13 +3,45 @@ Callbacks for the zone management functionality.
 """
 from dash import Input, Output, State, callback, html
 import plotly.graph_objects as go
-import requests
 import time
-import dash_bootstrap_components as dbc
-from dash import dcc
+
+from services import APIError
 
 # These will be set by app.py
-api_service_url = None
+api_client = None
+zone_cache = None
+
+# Circles drawn more stretched than this (long over short axis) get a warning
+CIRCLE_MAX_ASPECT = 1.2
+
+def circle_from_box(min_x, min_y, max_x, max_y):
+    """Get the circle saved for an ellipse drawn into a bounding box.
+    
+    The radius is the mean of the half-axes, so a slightly stretched
+    drawing keeps about the size the user drew.
+    
+    Returns:
+        (center, radius, aspect) where aspect is the ratio of the longer
+        to the shorter axis
+    """
+    width, height = max_x - min_x, max_y - min_y
+    center = {"x": (min_x + max_x) / 2, "y": (min_y + max_y) / 2}
+    aspect = max(width, height) / min(width, height) if min(width, height) > 0 else float("inf")
+    return center, (width + height) / 4, aspect
+
+def drawn_box(relayout_data):
+    """Get (min_x, min_y, max_x, max_y) of the last shape drawn as a box, or None."""
+    shapes = relayout_data.get('shapes')
+    if isinstance(shapes, list) and shapes:
+        shape = shapes[-1]
+    else:
+        # Edited shapes come as keys like 'shapes[0].x0'
+        shape = {k.rsplit('.', 1)[-1]: v for k, v in relayout_data.items() if k.startswith('shapes[')}
+    if not all(isinstance(shape.get(k), (int, float)) for k in ('x0', 'y0', 'x1', 'y1')):
+        return None
+    min_x, max_x = sorted((shape['x0'], shape['x1']))
+    min_y, max_y = sorted((shape['y0'], shape['y1']))
+    return min_x, min_y, max_x, max_y
 
 @callback(
     Output('zone-editor-plot', 'figure'),
@@ -18,7 +50,7 @@ api_service_url = None
 )
 def update_zone_editor(n, zone_list):
     """Update the zone editor plot with current zones."""
-    global api_service_url
+    global zone_cache
     
     fig = go.Figure()
     
@@ -31,49 +63,9 @@ def update_zone_editor(n, zone_list):
         uirevision='constant',  # keeps drawing state
     )
     
-    # Try to get zones from API
-    try:
-        if api_service_url:
-            response = requests.get(f"{api_service_url}/zones")
-            if response.status_code == 200:
-                zones = response.json()
-                
-                # Add each zone as a filled polygon
-                for zone in zones:
-                    polygon = zone['polygon']
-                    x_vals = [p['x'] for p in polygon]
-                    y_vals = [p['y'] for p in polygon]
-                    
-                    # Close the polygon
-                    x_vals.append(x_vals[0])
-                    y_vals.append(y_vals[0])
-                    
-                    # Convert hex color to rgba for transparency
-                    hex_color = zone.get('color', '#FF5733')
-                    # Remove # if present
-                    if hex_color.startswith('#'):
-                        hex_color = hex_color[1:]
-                    
-                    # Convert hex to rgb
-                    r = int(hex_color[0:2], 16)
-                    g = int(hex_color[2:4], 16)
-                    b = int(hex_color[4:6], 16)
-                    
-                    # Create rgba string with 0.5 opacity
-                    rgba_color = f'rgba({r},{g},{b},0.5)'
-                    
-                    fig.add_trace(go.Scatter(
-                        x=x_vals,
-                        y=y_vals,
-                        fill="toself",
-                        fillcolor=rgba_color,  # Use rgba format
-                        line=dict(color=f'rgb({r},{g},{b})'),  # Use rgb format for line
-                        name=zone.get('name', 'Unnamed Zone'),
-                        text=zone.get('description', ''),
-                        customdata=[zone['_id']],
-                    ))
-    except Exception as e:
-        print(f"Error loading zones: {e}")
+    # Add each zone as a filled polygon from the zone cache
+    if zone_cache:
+        fig.add_traces(zone_cache.get_editor_traces())
     
     return fig
 
@@ -85,34 +77,32 @@ def update_zone_editor(n, zone_list):
 )
 def update_zone_list(n, save_clicks, delete_clicks):
     """Update the list of zones."""
-    global api_service_url
+    global zone_cache
     
     try:
-        if api_service_url:
-            response = requests.get(f"{api_service_url}/zones")
-            if response.status_code == 200:
-                zones = response.json()
-                
-                if zones:
-                    # Create selectable list of zones
-                    return [
-                        html.Div([
-                            html.Div(
-                                f"{zone['name']}", 
-                                style={
-                                    "padding": "8px",
-                                    "border-left": f"4px solid {zone.get('color', '#FF5733')}",
-                                    "margin-bottom": "4px",
-                                    "cursor": "pointer",
-                                    "background-color": "#f8f9fa"
-                                },
-                                id=f"zone-item-{zone['_id']}",
-                                className="zone-list-item"
-                            )
-                        ]) for zone in zones
-                    ]
-                else:
-                    return html.Div("No zones defined yet")
+        if zone_cache:
+            zones = zone_cache.get_zones()
+            
+            if zones:
+                # Create selectable list of zones
+                return [
+                    html.Div([
+                        html.Div(
+                            f"{zone['name']}", 
+                            style={
+                                "padding": "8px",
+                                "border-left": f"4px solid {zone.get('color', '#FF5733')}",
+                                "margin-bottom": "4px",
+                                "cursor": "pointer",
+                                "background-color": "#f8f9fa"
+                            },
+                            id=f"zone-item-{zone['_id']}",
+                            className="zone-list-item"
+                        )
+                    ]) for zone in zones
+                ]
+            else:
+                return html.Div("No zones defined yet")
     except Exception as e:
         return html.Div(f"Error loading zones: {str(e)}")
 
@@ -122,22 +112,24 @@ def update_zone_list(n, save_clicks, delete_clicks):
     State('zone-name', 'value'),
     State('zone-description', 'value'),
     State('zone-color', 'value'),
+    State('zone-type', 'value'),
     State('zone-editor-plot', 'relayoutData')
 )
-def save_zone(n_clicks, name, description, color, relayout_data):
+def save_zone(n_clicks, name, description, color, zone_type, relayout_data):
     """Save a new zone."""
-    global api_service_url
+    global api_client, zone_cache
 
     if not n_clicks or not name:
         print(f"No clicks or name: {n_clicks}, {name}")
         return 0
     
     try:
-        if api_service_url and relayout_data:
+        if api_client and relayout_data:
             print(f"Relayout data: {relayout_data}")
             
             # Extract polygon coordinates from relayoutData
             polygon = []
+            from_box = False  # extracted from a rectangle or line's corners
             
             # Check for shapes in relayoutData
             # In Plotly's relayoutData, shapes are defined with keys like 'shapes[0].path'
@@ -172,6 +164,7 @@ def save_zone(n_clicks, name, description, color, relayout_data):
                     rect_y1 = next((relayout_data[k] for k in shape_keys if 'y1' in k), None)
                     
                     if all([rect_x0, rect_y0, rect_x1, rect_y1]):
+                        from_box = True
                         polygon = [
                             {"x": rect_x0, "y": rect_y0},
                             {"x": rect_x1, "y": rect_y0},
@@ -199,6 +192,7 @@ def save_zone(n_clicks, name, description, color, relayout_data):
                                     continue
                     elif all(k in shape for k in ['x0', 'y0', 'x1', 'y1']):
                         # Rectangle
+                        from_box = True
                         polygon = [
                             {"x": shape['x0'], "y": shape['y0']},
                             {"x": shape['x1'], "y": shape['y0']},
@@ -219,17 +213,36 @@ def save_zone(n_clicks, name, description, color, relayout_data):
                 "name": name,
                 "description": description,
                 "color": color,
-                "polygon": polygon
             }
+            if zone_type == 'line':
+                # A drawn line gives its end points as a box's opposite
+                # corners, an open path its vertices
+                zone_data["type"] = "line"
+                zone_data["line"] = [polygon[0], polygon[2]] if from_box else polygon
+            elif from_box:
+                # Rectangles and circles are drawn as their bounding box
+                min_x, max_x = sorted((polygon[0]["x"], polygon[2]["x"]))
+                min_y, max_y = sorted((polygon[0]["y"], polygon[2]["y"]))
+                if zone_type == 'circle':
+                    zone_data["type"] = "circle"
+                    zone_data["center"], zone_data["radius"], _ = circle_from_box(min_x, min_y, max_x, max_y)
+                else:
+                    zone_data["type"] = "rect"
+                    zone_data["rect"] = {"min_x": min_x, "min_y": min_y, "max_x": max_x, "max_y": max_y}
+            else:
+                zone_data["polygon"] = polygon
             
             # Send to API
-            response = requests.post(f"{api_service_url}/zones", json=zone_data)
-            if response.status_code == 200:
-                print(f"Zone saved successfully")
-                return 0
-            else:
-                print(f"Zone not saved: {response.status_code}, {response.text}")
+            try:
+                api_client.post_json('/zones', json=zone_data)
+            except APIError as e:
+                print(f"Zone not saved: {e}")
                 return 0
+            
+            print(f"Zone saved successfully")
+            if zone_cache:
+                zone_cache.invalidate()
+            return 0
     except Exception as e:
         print(f"Error saving zone: {e}")
         import traceback
@@ -243,14 +256,12 @@ def save_zone(n_clicks, name, description, color, relayout_data):
 )
 def update_zone_dropdown(n):
     """Update the zone dropdown options."""
-    global api_service_url
+    global zone_cache
     
     try:
-        if api_service_url:
-            response = requests.get(f"{api_service_url}/zones")
-            if response.status_code == 200:
-                zones = response.json()
-                return [{"label": zone['name'], "value": zone['_id']} for zone in zones]
+        if zone_cache:
+            zones = zone_cache.get_zones()
+            return [{"label": zone['name'], "value": zone['_id']} for zone in zones]
     except Exception as e:
         print(f"Error updating zone dropdown: {e}")
     
@@ -265,13 +276,13 @@ def update_zone_dropdown(n):
 )
 def search_zone_events(n_clicks, zone_id, object_id, event_type):
     """Search for zone events based on filters."""
-    global api_service_url
+    global api_client
     
     if not n_clicks:
         return html.Div("Select search criteria and click 'Search Events'")
     
     try:
-        if api_service_url:
+        if api_client:
             # Build query parameters
             params = {}
             if zone_id:
@@ -281,67 +292,61 @@ def search_zone_events(n_clicks, zone_id, object_id, event_type):
             if event_type and event_type != 'all':
                 params['event_type'] = event_type
             
-            # Get zone events from API
-            response = requests.get(f"{api_service_url}/zone-events", params=params)
-            print(f"zone events response: {response}")
-            if response.status_code == 200:
-                events = response.json()
+            # Get zone events and the zone name lookup concurrently
+            events, zones = api_client.get_json_many([
+                ('/zone-events', params, None),
+                ('/zones', None, None),
+            ])
+            if isinstance(events, Exception):
+                raise events
+            
+            if events:
+                # Create zone name lookup
+                zones = {z['_id']: z['name'] for z in zones} if not isinstance(zones, Exception) else {}
                 
-                if events:
-                    # Create zone name lookup
-                    zones_response = requests.get(f"{api_service_url}/zones")
-                    zones = {z['_id']: z['name'] for z in zones_response.json()} if zones_response.status_code == 200 else {}
-                    
-                    # Create table of events
-                    return html.Div([
-                        html.H5(f"Found {len(events)} events"),
-                        html.Table(
-                            # Header
-                            [html.Tr([html.Th(col) for col in ['Time', 'Object', 'Zone', 'Event', 'Duration']])] +
-                            # Rows
-                            [html.Tr([
-                                html.Td(event.get('timestamp', '').split('T')[1][:8]),
-                                html.Td(event.get('object_id', '')),
-                                html.Td(zones.get(event.get('zone_id', ''), event.get('zone_id', ''))),
-                                html.Td(
-                                    html.Span(
-                                        event.get('event_type', ''),
-                                        style={
-                                            'background-color': '#d4edda' if event.get('event_type') == 'enter' else '#f8d7da',
-                                            'padding': '2px 6px',
-                                            'border-radius': '4px'
-                                        }
-                                    )
-                                ),
-                                html.Td(f"{event.get('duration', '-')} sec" if event.get('duration') else "-")
-                            ]) for event in events],
-                            className="table table-striped"
-                        )
-                    ])
-                else:
-                    return html.Div("No events found for the selected criteria")
+                # Create table of events
+                return html.Div([
+                    html.H5(f"Found {len(events)} events"),
+                    html.Table(
+                        # Header
+                        [html.Tr([html.Th(col) for col in ['Time', 'Object', 'Zone', 'Event', 'Duration']])] +
+                        # Rows
+                        [html.Tr([
+                            html.Td(event.get('timestamp', '').split('T')[1][:8]),
+                            html.Td(event.get('object_id', '')),
+                            html.Td(zones.get(event.get('zone_id', ''), event.get('zone_id', ''))),
+                            html.Td(
+                                html.Span(
+                                    event.get('event_type', ''),
+                                    style={
+                                        'background-color': '#d4edda' if event.get('event_type') == 'enter' else '#f8d7da',
+                                        'padding': '2px 6px',
+                                        'border-radius': '4px'
+                                    }
+                                )
+                            ),
+                            html.Td(f"{event.get('duration', '-')} sec" if event.get('duration') else "-")
+                        ]) for event in events],
+                        className="table table-striped"
+                    )
+                ])
+            else:
+                return html.Div("No events found for the selected criteria")
     except Exception as e:
         return html.Div(f"Error searching events: {str(e)}")
 
 @callback(
-    Output('zone-form', 'children'),
+    Output('zone-draw-status', 'children'),
+    Output('zone-draw-status', 'style'),
     Input('zone-editor-plot', 'relayoutData'),
-    State('zone-name', 'value'),
-    State('zone-description', 'value'),
-    State('zone-color', 'value')
+    Input('zone-type', 'value')
 )
-def update_zone_form(relayout_data, name, description, color):
-    """Update zone form with feedback on drawing status."""
-    children = [
-        html.Label("Zone Name:"),
-        dcc.Input(id="zone-name", type="text", placeholder="Enter zone name", value=name, className="form-control"),
-        html.Label("Description:"),
-        dcc.Textarea(id="zone-description", placeholder="Enter description", value=description, className="form-control"),
-        html.Label("Zone Color:"),
-        dcc.Input(id="zone-color", type="color", value=color or "#FF5733", className="form-control"),
-        html.Br(),
-    ]
+def update_zone_form(relayout_data, zone_type=None):
+    """Update the zone form's feedback on drawing status.
     
+    Only the status line changes, so the form's inputs (including the
+    zone type) keep their components and values.
+    """
     # Add drawing status indicator
     has_shapes = False
     if relayout_data:
@@ -349,19 +354,11 @@ def update_zone_form(relayout_data, name, description, color):
         has_shapes = len(shape_keys) > 0
     
     if has_shapes:
-        children.append(html.Div("Shape detected! You can save this zone.", 
-                                style={'color': 'green', 'margin': '10px 0'}))
-    else:
-        children.append(html.Div("Draw a shape on the map before saving.", 
-                                style={'color': 'orange', 'margin': '10px 0'}))
-    
-    children.extend([
-        dbc.Button("Save Zone", id="save-zone-button", color="primary"),
-        dbc.Button("Delete Zone", id="delete-zone-button", color="danger", className="ml-2"),
-        html.Br(),
-        html.Hr(),
-        html.H5("Defined Zones"),
-        html.Div(id="zone-list-container")
-    ])
-    
-    return children 
\ No newline at end of file
+        box = drawn_box(relayout_data) if zone_type == 'circle' else None
+        if box:
+            _, radius, aspect = circle_from_box(*box)
+            if aspect > CIRCLE_MAX_ASPECT:
+                return (f"The drawn shape is not round; it will be saved as a circle of radius {radius:.2f}.",
+                        {'color': 'orange', 'margin': '10px 0'})
+        return "Shape detected! You can save this zone.", {'color': 'green', 'margin': '10px 0'}
+    return "Draw a shape on the map before saving.", {'color': 'orange', 'margin': '10px 0'}
@@ -30,13 +30,14 @@ def create_historical_tab():
                         dcc.Dropdown(
                             id='history-resolution',
                             options=[
+                                {'label': 'Auto', 'value': 'auto'},
                                 {'label': 'Raw Data', 'value': 'raw'},
                                 {'label': '1 second', 'value': '1s'},
                                 {'label': '10 seconds', 'value': '10s'},
                                 {'label': '1 minute', 'value': '1m'},
                                 {'label': '10 minutes', 'value': '10m'},
                             ],
-                            value='raw'
+                            value='auto'
                         ),
                     ], width=3),
                     dbc.Col([
@@ -66,6 +67,13 @@ def create_historical_tab():
                 # Make the graph take up the full width and taller
                 dcc.Graph(id='history-plot', style={'height': '70vh'}),
                 
+                # Identifies the loaded history; the data itself stays cached server-side
+                dcc.Store(id='history-data-store'),
+                
+                # Columnar history sent once for client-side playback
+                dcc.Store(id='history-playback-data'),
+                html.Span(id='history-playback-frame', style={'display': 'none'}),
+                
                 # Add animation playback controls below the graph
                 dbc.Row([
                     dbc.Col([
@@ -99,7 +107,7 @@ def create_historical_tab():
                             ),
                             dcc.Interval(
                                 id='interval-animation',
-                                interval=50,  # 50ms = 0.05 seconds (faster for smoother animation)
+                                interval=33,  # ~30 frames per second, advanced in the browser
                                 n_intervals=0,
                                 disabled=True
                             ),
@@ -108,4 +116,85 @@ def create_historical_tab():
                 ], className="mt-3"),
             ], width=12),  # Make the column take up full width
         ]),
+        
+        # Time-synchronized replay of all objects
+        dbc.Row([
+            dbc.Col([
+                html.Hr(),
+                html.H4("Fleet Replay"),
+                dbc.Row([
+                    dbc.Col([
+                        html.Label("Start (UTC):"),
+                        dcc.Input(
+                            id='fleet-replay-start',
+                            type='text',
+                            placeholder='YYYY-MM-DDTHH:MM:SS',
+                            value=(datetime.utcnow() - timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S'),
+                            className="form-control"
+                        ),
+                    ], width=3),
+                    dbc.Col([
+                        html.Label("End (UTC):"),
+                        dcc.Input(
+                            id='fleet-replay-end',
+                            type='text',
+                            placeholder='YYYY-MM-DDTHH:MM:SS',
+                            value=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'),
+                            className="form-control"
+                        ),
+                    ], width=3),
+                    dbc.Col([
+                        html.Label("Frame Interval:"),
+                        dcc.Dropdown(
+                            id='fleet-replay-every',
+                            options=[
+                                {'label': '1 second', 'value': '1s'},
+                                {'label': '5 seconds', 'value': '5s'},
+                                {'label': '10 seconds', 'value': '10s'},
+                                {'label': '1 minute', 'value': '1m'},
+                            ],
+                            value='1s'
+                        ),
+                    ], width=3),
+                    dbc.Col([
+                        html.Button("Load Replay", id="load-fleet-replay-button", className="btn btn-primary mt-4"),
+                    ], width=3),
+                ]),
+                html.Br(),
+                dcc.Graph(id='fleet-replay-plot', style={'height': '60vh'}),
+                html.Div([
+                    dbc.Button("Play", id="fleet-play-button", color="success", size="sm", className="me-2"),
+                    dbc.Button("Pause", id="fleet-pause-button", color="primary", size="sm", className="me-2"),
+                    html.Span("Speed:"),
+                    dbc.Select(
+                        id="fleet-playback-speed",
+                        options=[
+                            {"label": "1x", "value": "1"},
+                            {"label": "10x", "value": "10"},
+                            {"label": "60x", "value": "60"},
+                            {"label": "300x", "value": "300"}
+                        ],
+                        value="60",
+                        style={"width": "90px", "display": "inline-block", "margin": "0 10px"}
+                    ),
+                    html.Span(id='fleet-replay-status', className='text-muted'),
+                ], style={"margin-bottom": "10px"}),
+                dcc.Slider(
+                    id='fleet-replay-slider',
+                    min=0,
+                    max=100,
+                    step=0.1,
+                    value=0,
+                    marks=None,
+                    tooltip={"placement": "bottom", "always_visible": False}
+                ),
+                dcc.Interval(
+                    id='fleet-replay-interval',
+                    interval=33,  # ~30 frames per second
+                    n_intervals=0,
+                    disabled=True
+                ),
+                dcc.Store(id='fleet-replay-config'),
+            ], width=12),
+        ], className="mt-3"),
     ]) 
\ No newline at end of file
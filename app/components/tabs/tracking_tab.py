@@ -4,6 +4,8 @@ Real-time tracking tab layout.
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 
+from config import LIVE_PUSH_ENABLED, LIVE_PUSH_REFRESH_INTERVAL
+
 
 def create_config_panel():
     """Creates the configuration panel layout."""
@@ -16,6 +18,15 @@ def create_config_panel():
         ),
         html.Br(),
         
+        dbc.Checklist(
+            id='live-push',
+            options=[{'label': 'Live Push', 'value': 'live', 'disabled': not LIVE_PUSH_ENABLED}],
+            value=['live'] if LIVE_PUSH_ENABLED else [],
+            switch=True,
+        ),
+        html.Small(id='live-stream-status', className='text-muted'),
+        html.Br(),
+        
         html.Label("Object Timeout (seconds):"),
         dcc.Input(
             id='object-timeout',
@@ -99,6 +110,7 @@ def create_config_panel():
         # Store components for state
         dcc.Store(id='background-image-store'),
         dcc.Store(id='selected-object', data=None),
+        dcc.Store(id='tracking-zone-version', data=None),
     ])
 
 
@@ -119,6 +131,13 @@ def create_tracking_tab():
                     interval=1000/3 * 1000,  # default 3 updates per second
                     n_intervals=0
                 ),
+                # Redraws of the tracking plot and object details; slowed
+                # down while live push updates the plot in the browser
+                dcc.Interval(
+                    id='tracking-interval',
+                    interval=LIVE_PUSH_REFRESH_INTERVAL * 1000 if LIVE_PUSH_ENABLED else 1000/3,
+                    n_intervals=0
+                ),
             ], width=9),
             
             dbc.Col([
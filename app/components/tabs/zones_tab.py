@@ -10,13 +10,15 @@ def create_zone_management_tab():
         dbc.Row([
             dbc.Col([
                 html.H4("Zone Definition"),
-                html.P("Click on the map to create polygon zones. Double-click to complete a zone."),
+                html.P("Click on the map to create polygon zones. Double-click to complete a zone. "
+                       "Rectangles and circles can be drawn with their own tools. "
+                       "For a line zone, draw a line or an open path across the doorway or gate."),
                 dcc.Graph(
                     id='zone-editor-plot',
                     style={'height': '60vh'},
                     config={
                         'displayModeBar': True,
-                        'modeBarButtonsToAdd': ['drawrect', 'drawopenpath', 'eraseshape'],
+                        'modeBarButtonsToAdd': ['drawrect', 'drawcircle', 'drawline', 'drawopenpath', 'eraseshape'],
                         'editable': True,
                         'edits': {
                             'shapePosition': True,
@@ -32,9 +34,22 @@ def create_zone_management_tab():
                     dcc.Input(id="zone-name", type="text", placeholder="Enter zone name", className="form-control"),
                     html.Label("Description:"),
                     dcc.Textarea(id="zone-description", placeholder="Enter description", className="form-control"),
+                    html.Label("Zone Type:"),
+                    dcc.RadioItems(
+                        id="zone-type",
+                        options=[
+                            {'label': ' Area (polygon or rectangle)', 'value': 'polygon'},
+                            {'label': ' Circle', 'value': 'circle'},
+                            {'label': ' Line (counts crossings)', 'value': 'line'},
+                        ],
+                        value='polygon',
+                        inline=True
+                    ),
                     html.Label("Zone Color:"),
                     dcc.Input(id="zone-color", type="color", value="#FF5733", className="form-control"),
                     html.Br(),
+                    html.Div("Draw a shape on the map before saving.", id="zone-draw-status",
+                             style={'color': 'orange', 'margin': '10px 0'}),
                     dbc.Button("Save Zone", id="save-zone-button", color="primary"),
                     dbc.Button("Delete Zone", id="delete-zone-button", color="danger", className="ml-2"),
                     html.Br(),
@@ -9,7 +9,27 @@ MQTT_BROKER = os.environ.get("MQTT_BROKER", "localhost")
 MQTT_PORT = 1883
 MQTT_TOPIC = "objects/tracking/position"
 
+# API client settings
+API_POOL_SIZE = 20  # kept-alive connections to the API
+API_RETRIES = 3
+API_BACKOFF_FACTOR = 0.2  # seconds, doubled on each retry
+API_TIMEOUTS = {  # seconds per endpoint template, first match wins
+    "/objects/*/history": 30,
+    "/analytics/*": 30,
+    "/replay/*": 30,
+    "/zones*": 3,
+}
+
 # Default configuration
 DEFAULT_TIMEOUT = 5  # seconds
 DEFAULT_UPDATE_FREQUENCY = 3  # updates per second
-MAX_HISTORY_POINTS = 100 
\ No newline at end of file
+MAX_HISTORY_POINTS = 100
+ZONE_CACHE_REFRESH_INTERVAL = 5  # seconds between zone version checks
+FLEET_REPLAY_CHUNK_FRAMES = 300  # frames per fleet replay request
+HISTORY_AUTO_MAX_POINTS = 5000  # target points for auto-resolution history loads
+
+# Live push settings
+LIVE_PUSH_ENABLED = os.environ.get("LIVE_PUSH_ENABLED", "true").lower() == "true"
+LIVE_PUSH_RATE = int(os.environ.get("LIVE_PUSH_RATE", "10"))  # delta frames per second
+LIVE_PUSH_QUEUE_SIZE = 20  # frames buffered per client before resyncing
+LIVE_PUSH_REFRESH_INTERVAL = 5  # seconds between details/zone overlay refreshes while live
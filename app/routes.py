@@ -0,0 +1,43 @@
+"""
+Plain Flask routes served alongside the Dash application.
+"""
+from flask import Response, jsonify, request, stream_with_context
+
+from services import APIError
+
+
+def register_routes(server, broadcaster, api_client):
+    """Register non-Dash HTTP endpoints on the underlying Flask server.
+
+    Args:
+        server: Flask server of the Dash app
+        broadcaster: LiveBroadcaster feeding the live tracking stream
+        api_client: Shared APIClient whose metrics are exposed
+    """
+
+    @server.route('/live/stream')
+    def live_stream():
+        """Server-Sent Events stream of real-time position deltas."""
+        return Response(
+            stream_with_context(broadcaster.stream()),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no',  # disable proxy buffering
+            }
+        )
+
+    @server.route('/metrics/api-client')
+    def api_client_metrics():
+        """Latency histograms of dashboard calls to the API service."""
+        return jsonify(api_client.get_latency_stats())
+
+    @server.route('/replay/frames')
+    def replay_frames():
+        """Relay one fleet replay chunk from the API to the browser."""
+        try:
+            return jsonify(api_client.get_json('/replay/frames', params=request.args.to_dict()))
+        except APIError as e:
+            return jsonify({'error': str(e)}), e.status_code
+        except Exception as e:
+            return jsonify({'error': str(e)}), 502
@@ -2,4 +2,7 @@
 Services for the object tracking application.
 """
 from .object_store import ObjectStore
-from .mqtt_client import MQTTClient 
\ No newline at end of file
+from .mqtt_client import MQTTClient
+from .live_stream import LiveBroadcaster
+from .zone_cache import ZoneCache
+from .api_client import APIClient, APIError 
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Shared HTTP client for all dashboard calls to the API service.
+"""
+import bisect
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class APIError(Exception):
+    """Raised when the API answers with an unexpected status code."""
+
+    def __init__(self, status_code, message=""):
+        super().__init__(f"API returned {status_code}: {message}")
+        self.status_code = status_code
+
+
+class APIClient:
+    """Pooled, keep-alive client with timeouts, retries and ETag caching.
+
+    Endpoints are addressed by path templates such as
+    '/objects/{object_id}/zones'. The template selects the timeout and is
+    the key under which request latencies are recorded.
+    """
+
+    def __init__(self, base_url, timeouts=None, default_timeout=5, pool_size=20,
+                 retries=3, backoff_factor=0.2, etag_cache_size=256):
+        """Initialize the API client.
+
+        Args:
+            base_url: Base URL of the API service
+            timeouts: {template glob: seconds} per-endpoint timeouts
+            default_timeout: Timeout for endpoints without an explicit entry
+            pool_size: Maximum number of kept-alive connections
+            retries: Retry attempts for failed idempotent requests
+            backoff_factor: Exponential backoff factor between retries
+            etag_cache_size: Maximum number of cached ETag responses
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.etag_cache_size = etag_cache_size
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'PUT', 'DELETE']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api-client")
+        self._etag_cache = OrderedDict()  # {url: (etag, data)}
+        self._latencies = {}  # {template: [count per bucket]}
+        self._lock = threading.Lock()
+
+    def get_json(self, endpoint, params=None, **path_params):
+        """GET an endpoint and return the decoded JSON body.
+
+        Uses If-None-Match when a previous response carried an ETag and
+        returns the cached body on 304 Not Modified.
+
+        Args:
+            endpoint: Path template, e.g. '/objects/{object_id}'
+            params: Optional query parameters
+            **path_params: Values substituted into the template
+
+        Raises:
+            APIError: For any status other than 200/304
+        """
+        url = self._url(endpoint, path_params)
+        cache_key = f"{url}?{urlencode(sorted((params or {}).items()), doseq=True)}"
+
+        headers = {}
+        with self._lock:
+            cached = self._etag_cache.get(cache_key)
+        if cached:
+            headers['If-None-Match'] = cached[0]
+
+        response = self._request('GET', endpoint, url, params=params, headers=headers)
+
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self._etag_cache.move_to_end(cache_key)
+            return cached[1]
+        if response.status_code != 200:
+            raise APIError(response.status_code, response.text)
+
+        data = response.json()
+        etag = response.headers.get('ETag')
+        if etag:
+            with self._lock:
+                self._etag_cache[cache_key] = (etag, data)
+                self._etag_cache.move_to_end(cache_key)
+                while len(self._etag_cache) > self.etag_cache_size:
+                    self._etag_cache.popitem(last=False)
+        return data
+
+    def get_json_many(self, calls):
+        """Issue several independent GETs concurrently.
+
+        Total latency is that of the slowest request rather than the sum.
+
+        Args:
+            calls: List of (endpoint, params, path_params) tuples
+
+        Returns:
+            List with the decoded body, or the exception raised, per call
+        """
+        futures = [
+            self._executor.submit(self.get_json, endpoint, params, **(path_params or {}))
+            for endpoint, params, path_params in calls
+        ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def post_json(self, endpoint, json=None, **path_params):
+        """POST a JSON body to an endpoint and return the decoded response.
+
+        Raises:
+            APIError: For any status other than 200
+        """
+        url = self._url(endpoint, path_params)
+        response = self._request('POST', endpoint, url, json=json)
+        if response.status_code != 200:
+            raise APIError(response.status_code, response.text)
+        return response.json()
+
+    def get_latency_stats(self):
+        """Get request latency histograms per endpoint template.
+
+        Returns:
+            {template: {'count': n, 'buckets': {'<=5ms': n, ..., '>10000ms': n}}}
+        """
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            return {
+                endpoint: {'count': sum(counts), 'buckets': dict(zip(labels, counts))}
+                for endpoint, counts in self._latencies.items()
+            }
+
+    def timeout_for(self, endpoint):
+        """Resolve the timeout configured for an endpoint template."""
+        for pattern, timeout in self.timeouts.items():
+            if fnmatch.fnmatchcase(endpoint, pattern):
+                return timeout
+        return self.default_timeout
+
+    def _url(self, endpoint, path_params):
+        """Build the absolute URL for a path template."""
+        path = endpoint.format(**{k: quote(str(v), safe='') for k, v in path_params.items()})
+        return f"{self.base_url}{path}"
+
+    def _request(self, method, endpoint, url, **kwargs):
+        """Send a request and record its latency under the endpoint template."""
+        start = time.perf_counter()
+        try:
+            return self.session.request(method, url, timeout=self.timeout_for(endpoint), **kwargs)
+        finally:
+            self._record_latency(endpoint, (time.perf_counter() - start) * 1000)
+
+    def _record_latency(self, endpoint, elapsed_ms):
+        """Add one observation to the endpoint's latency histogram."""
+        index = bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            counts = self._latencies.get(endpoint)
+            if counts is None:
+                counts = self._latencies[endpoint] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            counts[index] += 1
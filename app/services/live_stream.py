@@ -0,0 +1,146 @@
+"""
+Live push service broadcasting real-time position deltas to dashboard clients.
+"""
+import json
+import queue
+import threading
+import time
+
+
+class LiveBroadcaster:
+    """Broadcasts one compact position delta per tick to all subscribers.
+
+    Each tick drains the changes from the ObjectStore, encodes them once and
+    hands the same frame to every subscriber queue, so the cost of a tick does
+    not depend on how many browsers are watching.
+    """
+
+    def __init__(self, object_store, rate=10, queue_size=20, keepalive=15):
+        """Initialize the broadcaster.
+
+        Args:
+            object_store: ObjectStore instance providing position changes
+            rate: Number of ticks per second
+            queue_size: Maximum number of frames buffered per subscriber
+            keepalive: Seconds between keep-alive comments on idle streams
+        """
+        self.object_store = object_store
+        self.rate = rate
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.positions = {}  # {id: (x, y)} as last broadcast
+        self.seq = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Start the background tick thread."""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="live-broadcaster", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background tick thread."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def subscribe(self):
+        """Register a new subscriber and queue a full snapshot for it."""
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            q.put_nowait(self._encode_snapshot())
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        """Remove a subscriber queue."""
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def subscriber_count(self):
+        """Number of currently connected subscribers."""
+        with self._lock:
+            return len(self._subscribers)
+
+    def tick(self):
+        """Drain store changes and broadcast them as a single delta frame."""
+        updated, removed = self.object_store.drain_changes()
+        if not updated and not removed:
+            return
+
+        with self._lock:
+            self.seq += 1
+            self.positions.update(updated)
+            for obj_id in removed:
+                self.positions.pop(obj_id, None)
+            self._snapshot = None
+
+            frame = json.dumps({
+                "seq": self.seq,
+                "u": [[obj_id, round(x, 2), round(y, 2)] for obj_id, (x, y) in updated.items()],
+                "r": removed,
+            }, separators=(',', ':'))
+
+            for q in self._subscribers:
+                try:
+                    q.put_nowait(frame)
+                except queue.Full:
+                    # Slow client: drop its backlog and resync with a snapshot
+                    self._reset_queue(q)
+
+    def stream(self):
+        """Generate Server-Sent Events for one subscriber until it disconnects."""
+        q = self.subscribe()
+        try:
+            while True:
+                try:
+                    frame = q.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {frame}\n\n"
+        finally:
+            self.unsubscribe(q)
+
+    def _run(self):
+        """Tick loop running at the configured rate."""
+        period = 1.0 / self.rate
+        next_tick = time.monotonic()
+        while self._running:
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error broadcasting live update: {e}")
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+
+    def _encode_snapshot(self):
+        """Encode the full current state, cached until the next delta."""
+        if self._snapshot is None:
+            self._snapshot = json.dumps({
+                "seq": self.seq,
+                "full": True,
+                "u": [[obj_id, round(x, 2), round(y, 2)] for obj_id, (x, y) in self.positions.items()],
+                "r": [],
+            }, separators=(',', ':'))
+        return self._snapshot
+
+    def _reset_queue(self, q):
+        """Replace a subscriber's backlog with a full snapshot."""
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+        q.put_nowait(self._encode_snapshot())
@@ -17,6 +17,8 @@ class ObjectStore:
         self.objects = {}  # {id: {x, y, last_update, history: [(x,y,t)], ...}}
         self.timeout = timeout
         self._lock = threading.Lock()
+        self._changed = set()  # ids updated since the last drain_changes()
+        self._published = set()  # ids reported as live by drain_changes()
     
     def update_object(self, obj_id, x, y):
         """Update object position and maintain its history.
@@ -45,6 +47,7 @@ class ObjectStore:
                 # Limit history size
                 if len(self.objects[obj_id]['history']) > 100:
                     self.objects[obj_id]['history'] = self.objects[obj_id]['history'][-100:]
+            self._changed.add(obj_id)
     
     def get_active_objects(self):
         """Get objects that have been updated within the timeout period."""
@@ -56,6 +59,12 @@ class ObjectStore:
                     active[obj_id] = data
             return active
     
+    def get_last_update(self, obj_id):
+        """Get the time of the last update for an object, or None if unknown."""
+        with self._lock:
+            data = self.objects.get(obj_id)
+            return data['last_update'] if data else None
+    
     def get_object_trails(self, max_trail_points=20):
         """Get position trails for active objects.
         
@@ -75,4 +84,31 @@ class ObjectStore:
                         'x': [h[0] for h in history],
                         'y': [h[1] for h in history]
                     }
-        return trails 
\ No newline at end of file
+        return trails
+
+    def drain_changes(self):
+        """Collect position changes since the previous call.
+
+        Intended for a single consumer (the live broadcaster), which turns
+        the result into one delta per tick.
+
+        Returns:
+            Tuple (updated, removed) where updated is {obj_id: (x, y)} for
+            objects moved since the last call and removed is a list of ids
+            that have timed out since they were last reported.
+        """
+        with self._lock:
+            now = time.time()
+            updated = {}
+            for obj_id in self._changed:
+                data = self.objects[obj_id]
+                updated[obj_id] = (data['x'], data['y'])
+            self._changed.clear()
+
+            removed = [
+                obj_id for obj_id in self._published
+                if now - self.objects[obj_id]['last_update'] > self.timeout
+            ]
+            self._published.difference_update(removed)
+            self._published.update(updated)
+        return updated, removed
@@ -0,0 +1,190 @@
+"""
+Service caching zone definitions and their precomputed Plotly traces.
+"""
+import math
+import threading
+
+
+def hex_to_rgb(hex_color):
+    """Convert a '#RRGGBB' color string to an (r, g, b) tuple."""
+    # Remove # if present
+    if hex_color.startswith('#'):
+        hex_color = hex_color[1:]
+    return int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
+
+
+def _signed_area(ring):
+    """Twice the signed area of a ring of (x, y) points (positive if counter-clockwise)."""
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]))
+
+
+def zone_outline(zone, circle_segments=64):
+    """Get the rings of (x, y) points outlining an area zone.
+
+    Holes of multipolygons are wound opposite to their exterior so the
+    filled outline leaves them empty.
+    """
+    zone_type = zone.get('type') or 'polygon'
+    if zone_type == 'rect':
+        rect = zone['rect']
+        return [[
+            (rect['min_x'], rect['min_y']), (rect['max_x'], rect['min_y']),
+            (rect['max_x'], rect['max_y']), (rect['min_x'], rect['max_y'])
+        ]]
+    if zone_type == 'circle':
+        cx, cy, radius = zone['center']['x'], zone['center']['y'], zone['radius']
+        return [[
+            (cx + radius * math.cos(2 * math.pi * i / circle_segments),
+             cy + radius * math.sin(2 * math.pi * i / circle_segments))
+            for i in range(circle_segments)
+        ]]
+    if zone_type == 'multipolygon':
+        rings = []
+        for polygon in zone['polygons']:
+            exterior = [(p['x'], p['y']) for p in polygon['exterior']]
+            if _signed_area(exterior) < 0:
+                exterior.reverse()
+            rings.append(exterior)
+            for hole in polygon.get('holes') or []:
+                hole = [(p['x'], p['y']) for p in hole]
+                if _signed_area(hole) > 0:
+                    hole.reverse()
+                rings.append(hole)
+        return rings
+    return [[(p['x'], p['y']) for p in zone['polygon']]]
+
+
+class ZoneCache:
+    """Keeps active zones in memory so callbacks never fetch them per tick.
+
+    A background thread polls the API's cheap /zones/version fingerprint and
+    only reloads /zones when it changes. Callers that modify zones call
+    invalidate() to get the new zones picked up immediately.
+    """
+
+    def __init__(self, api_client, refresh_interval=5):
+        """Initialize the zone cache.
+
+        Args:
+            api_client: APIClient used to reach the API service
+            refresh_interval: Seconds between version checks
+        """
+        self.api_client = api_client
+        self.refresh_interval = refresh_interval
+        self.version = None
+        self._zones = []
+        self._tracking_traces = []
+        self._editor_traces = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Load zones and start the background refresh thread."""
+        if self._thread is not None:
+            return
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="zone-cache", daemon=True)
+        self._thread.start()
+
+    def invalidate(self):
+        """Force a reload on the next refresh cycle (called after zone edits)."""
+        self.version = None
+        self._wakeup.set()
+
+    def get_zones(self):
+        """Get the cached list of active zones."""
+        with self._lock:
+            return self._zones
+
+    def get_tracking_traces(self):
+        """Get precomputed scatter trace dicts for the tracking plot."""
+        with self._lock:
+            return self._tracking_traces
+
+    def get_editor_traces(self):
+        """Get precomputed scatter trace dicts for the zone editor plot."""
+        with self._lock:
+            return self._editor_traces
+
+    def refresh(self):
+        """Reload zones if the version reported by the API has changed.
+
+        Returns:
+            True if the cached zones were replaced
+        """
+        try:
+            version = self.api_client.get_json('/zones/version').get('version')
+            if version is not None and version == self.version:
+                return False
+
+            zones = self.api_client.get_json('/zones')
+        except Exception as e:
+            print(f"Error refreshing zone cache: {e}")
+            return False
+
+        tracking_traces = [self._build_trace(zone, opacity=0.3) for zone in zones]
+        editor_traces = [self._build_trace(zone, opacity=0.5, editor=True) for zone in zones]
+        with self._lock:
+            self._zones = zones
+            self._tracking_traces = tracking_traces
+            self._editor_traces = editor_traces
+            self.version = version
+        return True
+
+    def _run(self):
+        """Refresh loop; wakes early when invalidated."""
+        while True:
+            self._wakeup.wait(self.refresh_interval)
+            self._wakeup.clear()
+            self.refresh()
+
+    @staticmethod
+    def _build_trace(zone, opacity, editor=False):
+        """Build a scatter trace dict for a zone.
+
+        Area zones are drawn filled; line zones (tripwires) as a thick
+        open polyline.
+        """
+        # Convert hex color to rgba for transparency
+        r, g, b = hex_to_rgb(zone.get('color') or '#FF5733')
+
+        if zone.get('type') == 'line':
+            points = zone.get('line', [])
+            trace = {
+                'type': 'scatter',
+                'x': [p['x'] for p in points],
+                'y': [p['y'] for p in points],
+                'mode': 'lines',
+                'line': {'color': f'rgb({r},{g},{b})', 'width': 4, 'dash': 'dash'},
+                'name': zone.get('name', 'Unnamed Line'),
+                'text': zone.get('description', ''),
+            }
+        else:
+            x_vals = []
+            y_vals = []
+            for ring in zone_outline(zone):
+                if x_vals:
+                    # A gap starts the next ring of the same trace
+                    x_vals.append(None)
+                    y_vals.append(None)
+                # Close the ring
+                x_vals.extend([p[0] for p in ring] + [ring[0][0]])
+                y_vals.extend([p[1] for p in ring] + [ring[0][1]])
+
+            trace = {
+                'type': 'scatter',
+                'x': x_vals,
+                'y': y_vals,
+                'fill': 'toself',
+                'fillcolor': f'rgba({r},{g},{b},{opacity})',
+                'line': {'color': f'rgb({r},{g},{b})'},
+                'name': zone.get('name', 'Unnamed Zone'),
+                'text': zone.get('description', ''),
+            }
+        if editor:
+            trace['customdata'] = [zone['_id']]
+        else:
+            trace['hoverinfo'] = 'text'
+            trace['showlegend'] = False
+        return trace
@@ -13,14 +13,33 @@ db = db.getSiblingDB('object_tracking');
 
 // Create collections with validators
 db.createCollection("objects");
-db.createCollection("events");
 db.createCollection("zones");
-db.createCollection("zone_events");
+
+// Events are optionally stored as expiring time-series collections
+if (process.env.EVENT_STORAGE_MODE === "timeseries") {
+    const ttl = parseInt(process.env.EVENTS_TTL_SECONDS || "2592000");
+    const expiry = ttl > 0 ? { expireAfterSeconds: ttl } : {};
+    db.createCollection("events", Object.assign({
+        timeseries: { timeField: "timestamp", metaField: "object_id", granularity: "seconds" }
+    }, expiry));
+    db.createCollection("zone_events", Object.assign({
+        timeseries: { timeField: "timestamp", metaField: "zone_id", granularity: "seconds" }
+    }, expiry));
+} else {
+    db.createCollection("events");
+    db.createCollection("zone_events");
+}
 
 // Create indexes
 db.objects.createIndex({ "status": 1 });
 db.zones.createIndex({ "active": 1 });
+db.zones.createIndex({ "updated_at": 1 });
+db.objects.createIndex({ "site": 1, "floor": 1 });
 db.zone_events.createIndex({ "object_id": 1, "timestamp": -1 });
 db.zone_events.createIndex({ "zone_id": 1, "timestamp": -1 });
 db.events.createIndex({ "object_id": 1, "timestamp": -1 });
-db.events.createIndex({ "event_type": 1 }); 
\ No newline at end of file
+db.events.createIndex({ "event_type": 1 });
+db.zone_dwell_hourly.createIndex({ "zone_id": 1, "hour": 1 });
+db.zone_dwell_hourly.createIndex({ "hour": 1 });
+db.zone_transitions_hourly.createIndex({ "hour": 1 }); 
+db.backfill_jobs.createIndex({ "status": 1, "created_at": 1 });
@@ -0,0 +1,323 @@
+"""
+Asyncio entry point of the data processor.
+
+processor.py handles each message in paho's network thread and waits for
+its InfluxDB and MongoDB writes, so the socket is not read while a write is
+in flight. Here the work is split into stages joined by bounded queues:
+
+    MQTT -> decode -+-> positions queue -> zone evaluation -> zone events, events -> MongoDB
+                    +-> position lines -> InfluxDB
+                    +-> object state -> MongoDB
+
+Decoding (parsing, partition filter, compression, line protocol encoding
+and object state buffering) runs on the event loop. Zones and proximity are
+evaluated in batches on one executor thread, in message order, by the same
+ZoneProcessor and ProximityDetector as in processor.py, so events are
+identical. Each sink keeps several writes in flight; when one falls behind,
+its queue fills up and the stages feeding it wait. The MQTT client buffers
+at most ASYNC_QUEUE_SIZE messages and drops the excess with a warning.
+
+Usage:
+    python async_processor.py
+"""
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiomqtt
+import redis
+from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+
+from backfill import BackfillWorker
+from batch_writer import AsyncBatchWriter
+from compression import PositionCompressor
+from line_protocol import PositionEncoder
+from object_state import AsyncObjectStateWriter
+from occupancy import OccupancyPublisher
+from partitions import PartitionFilter, partition_key
+from proximity import ProximityDetector, episode_events
+from rollups import ZoneRollupWriter
+from settings import (
+    mqtt_broker, mqtt_port, mqtt_topic, occupancy_topic, influxdb_url, influxdb_token, influxdb_org,
+    influxdb_bucket, influxdb_flush_ms, influxdb_gzip, mongodb_uri, redis_host, redis_port,
+    object_state_flush_ms, compression_mode, compression_deadband, compression_tolerance,
+    compression_heartbeat, compression_objects, zone_hysteresis_defaults, tripwire_cell_size,
+    proximity_enabled, proximity_radius, near_miss_distance, proximity_interval,
+    processor_partitions, rollup_flush_ms, occupancy_publish_interval, backfill_workers,
+    backfill_poll_interval, async_queue_size, async_zone_batch_size, async_influx_writers,
+    async_mongo_writers
+)
+from zone_processor import ZoneProcessor
+
+# Site/floor partitions handled by this processor
+partition_filter = PartitionFilter(processor_partitions)
+
+position_encoder = PositionEncoder()
+position_compressor = PositionCompressor(
+    compression_mode,
+    deadband=compression_deadband,
+    tolerance=compression_tolerance,
+    heartbeat=compression_heartbeat,
+    objects=compression_objects
+)
+
+# Zone loading, rollups and backfill jobs stay on a synchronous client; it is
+# only used off the event loop
+mongo_client = MongoClient(mongodb_uri)
+db = mongo_client['object_tracking']
+
+proximity_detector = ProximityDetector(
+    radius=proximity_radius,
+    near_miss_distance=near_miss_distance
+) if proximity_enabled else None
+next_proximity_tick = 0
+
+# Zone events of the batch being evaluated, only touched by the zone thread
+zone_events_buffer = []
+
+zone_rollups = ZoneRollupWriter(db, flush_interval=rollup_flush_ms / 1000)
+zone_processor = ZoneProcessor(
+    mongo_client,
+    rollups=zone_rollups,
+    hysteresis=zone_hysteresis_defaults,
+    tripwire_cell_size=tripwire_cell_size,
+    partition_filter=partition_filter,
+    event_sink=zone_events_buffer.extend
+)
+occupancy_publisher = OccupancyPublisher(
+    zone_processor,
+    redis.Redis(host=redis_host, port=redis_port),
+    occupancy_topic,
+    interval=occupancy_publish_interval
+)
+backfill_worker = BackfillWorker(
+    db,
+    workers=backfill_workers,
+    poll_interval=backfill_poll_interval
+)
+
+
+class LoopPublisher:
+    """Lets threads publish MQTT messages through the event loop's client."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.client = None  # aiomqtt client while connected
+
+    def publish(self, topic, payload):
+        """Publish from another thread, waiting until the message is sent."""
+        client = self.client
+        if client is None:
+            return
+        asyncio.run_coroutine_threadsafe(client.publish(topic, payload), self.loop).result()
+
+
+def decode_message(payload):
+    """Decode a position message and prepare its position lines.
+
+    Returns:
+        ((obj_id, x, y, timestamp, site, floor), encoded lines), or None
+        for messages without a position or of another partition
+    """
+    message = json.loads(payload)
+    obj_id = message.get('id')
+    x = message.get('x')
+    y = message.get('y')
+    timestamp = message.get('timestamp', time.time())
+    # Optional site/floor partition of the position
+    site, floor = key = partition_key(message.get('site'), message.get('floor'))
+    if not obj_id or x is None or y is None or not partition_filter.owns(key):
+        return None
+
+    # Lines for InfluxDB of the points the compressor keeps
+    lines = [
+        position_encoder.encode(obj_id, pt, px, py, site, floor)
+        for pt, px, py in position_compressor.offer(obj_id, timestamp, x, y, key)
+    ]
+    return (obj_id, x, y, timestamp, site, floor), [line for line in lines if line is not None]
+
+
+def encode_pending(pending):
+    """Encode the last points the compressor held back for the given objects."""
+    lines = [
+        position_encoder.encode(obj_id, pt, px, py, site, floor)
+        for obj_id, (site, floor), (pt, px, py) in pending
+    ]
+    return [line for line in lines if line is not None]
+
+
+def evaluate_zones(positions):
+    """Evaluate zones and proximity for a batch of positions, in order.
+
+    Runs on the zone thread.
+
+    Returns:
+        (zone events, proximity events) of the batch
+    """
+    global next_proximity_tick
+    events = []
+    for obj_id, x, y, timestamp, site, floor in positions:
+        try:
+            zone_processor.process_position(obj_id, x, y, timestamp, site, floor)
+            if proximity_detector:
+                proximity_detector.update(obj_id, x, y, timestamp, partition_key(site, floor))
+                if timestamp >= next_proximity_tick:
+                    next_proximity_tick = timestamp + proximity_interval
+                    for episode in proximity_detector.tick(timestamp):
+                        events.extend(episode_events(episode))
+        except Exception as e:
+            print(f"Error processing position of {obj_id}: {e}")
+    zone_events = zone_events_buffer[:]
+    del zone_events_buffer[:]
+    return zone_events, events
+
+
+def insert_events(collection):
+    """Build the write function of an AsyncBatchWriter inserting into a motor collection."""
+    async def insert(events):
+        try:
+            await collection.insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            # Events stored by an earlier attempt at the same batch
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+    return insert
+
+
+async def read_messages(client, positions, position_writer, object_state_writer):
+    """Decode stage: feeds the position sinks and the zone stage."""
+    async for message in client.messages:
+        try:
+            decoded = decode_message(message.payload)
+        except Exception as e:
+            print(f"Error processing message: {e}")
+            continue
+        if decoded is None:
+            continue
+        position, lines = decoded
+
+        # Buffer last known position; flushed to MongoDB in bulk, which also
+        # records appearances of objects marked as gone
+        object_state_writer.update(*position)
+        await position_writer.add(lines)
+        await positions.put(position)
+        print(f"Processed position for {position[0]}: ({position[1]}, {position[2]})")
+
+
+async def evaluate_stage(positions, zone_event_writer, event_writer):
+    """Zone stage: evaluates queued positions in batches on one thread."""
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="zone-evaluation")
+    while True:
+        batch = [await positions.get()]
+        while len(batch) < async_zone_batch_size and not positions.empty():
+            batch.append(positions.get_nowait())
+        zone_events, events = await loop.run_in_executor(executor, evaluate_zones, batch)
+        await zone_event_writer.add(zone_events)
+        await event_writer.add(events)
+        for _ in batch:
+            positions.task_done()
+
+
+async def expire_stage(position_writer):
+    """Store the final point of objects that stopped reporting."""
+    while True:
+        await asyncio.sleep(position_compressor.heartbeat)
+        await position_writer.add(encode_pending(position_compressor.expire(time.time())))
+
+
+async def consume(publisher, positions, position_writer, object_state_writer):
+    """Read position messages, reconnecting to the broker when the connection drops."""
+    while True:
+        try:
+            async with aiomqtt.Client(
+                mqtt_broker,
+                mqtt_port,
+                max_queued_incoming_messages=async_queue_size
+            ) as client:
+                print("Connected to MQTT Broker!")
+                await client.subscribe(mqtt_topic)
+                publisher.client = client
+                await read_messages(client, positions, position_writer, object_state_writer)
+        except aiomqtt.MqttError as e:
+            print(f"MQTT connection failed: {e}")
+        finally:
+            publisher.client = None
+        await asyncio.sleep(2)
+
+
+async def run():
+    # Async clients belong to the running event loop
+    influx_client = InfluxDBClientAsync(url=influxdb_url, token=influxdb_token, org=influxdb_org,
+                                        enable_gzip=influxdb_gzip)
+    write_api = influx_client.write_api()
+    motor_db = AsyncIOMotorClient(mongodb_uri)['object_tracking']
+
+    async def write_positions(lines):
+        await write_api.write(bucket=influxdb_bucket, record=b"\n".join(lines))
+
+    position_writer = AsyncBatchWriter(
+        write_positions,
+        "positions",
+        flush_interval=influxdb_flush_ms / 1000,
+        concurrency=async_influx_writers
+    )
+    zone_event_writer = AsyncBatchWriter(
+        insert_events(motor_db['zone_events']),
+        "zone events",
+        max_batch=1000,
+        concurrency=async_mongo_writers
+    )
+    event_writer = AsyncBatchWriter(
+        insert_events(motor_db['events']),
+        "events",
+        max_batch=1000,
+        concurrency=async_mongo_writers
+    )
+    object_state_writer = AsyncObjectStateWriter(
+        motor_db['objects'],
+        motor_db['events'],
+        flush_interval=object_state_flush_ms / 1000
+    )
+    positions = asyncio.Queue(async_queue_size)
+    publisher = LoopPublisher(asyncio.get_running_loop())
+
+    for writer in (position_writer, zone_event_writer, event_writer):
+        writer.start()
+    object_state_writer.start()
+    occupancy_publisher.start(publisher)
+    zone_rollups.start()
+    backfill_worker.start()
+    zone_stage = asyncio.ensure_future(evaluate_stage(positions, zone_event_writer, event_writer))
+    expiry = None
+    if position_compressor.mode != "off":
+        expiry = asyncio.ensure_future(expire_stage(position_writer))
+    try:
+        await consume(publisher, positions, position_writer, object_state_writer)
+    finally:
+        # Thread-based components are stopped off the loop, which their
+        # threads may be waiting on
+        await asyncio.to_thread(backfill_worker.stop)
+        await asyncio.to_thread(occupancy_publisher.stop)
+        await positions.join()
+        zone_stage.cancel()
+        await asyncio.to_thread(zone_rollups.stop)
+        await object_state_writer.stop()
+        if expiry is not None:
+            expiry.cancel()
+        await position_writer.add(encode_pending(position_compressor.flush()))
+        for writer in (position_writer, zone_event_writer, event_writer):
+            await writer.stop()
+        await influx_client.close()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
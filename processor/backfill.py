@@ -0,0 +1,448 @@
+"""
+Retroactive zone events for zones drawn after the fact.
+
+A backfill job replays the stored position history of one zone's area over
+a time range and inserts the zone_events the live processor would have
+recorded: the same hysteresis state machine for area zones and the same
+tripwire test for line zones. Each object's positions are streamed from
+InfluxDB in time-ordered chunks and replayed in one pass, with objects
+spread over a process pool.
+
+Jobs and their progress live in the backfill_jobs collection. Objects are
+recorded as completed once their events are inserted, so an interrupted job
+resumes with the remaining objects. Backfilled events get deterministic ids
+and are tagged with the job id; events an object's earlier run already
+stored are skipped, so an object replayed twice is not duplicated (also in
+time-series collections, where _id is not unique).
+
+A running job records its owner and refreshes a heartbeat. Jobs are only
+taken over from another worker once their heartbeat is stale, so several
+processor instances can share the queue.
+
+Jobs are queued through the API (POST /zones/{zone_id}/backfill) and picked
+up by the processor, or run directly:
+    python backfill.py <zone_id> --start 2024-01-01T00:00:00 [--end ...] [--workers 4]
+    python backfill.py --resume <job_id>
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+from influxdb_client import InfluxDBClient
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from hysteresis import OUTSIDE, ZoneHysteresis, ZoneMembership
+from influx_tiers import select_tier
+from partitions import partition_key
+from settings import (
+    influxdb_url, influxdb_token, influxdb_org, mongodb_uri, zone_hysteresis_defaults,
+    backfill_chunk_seconds, backfill_heartbeat_timeout
+)
+from timestamps import to_epoch
+from tripwire import TripwireIndex
+from zone_events import cross_events, enter_event, exit_event
+from zone_shapes import compile_zone
+
+# Clients of a pool worker process, created by _init_worker
+_query_api = None
+_zone_events = None
+
+
+def create_job(db, zone_id, start_time, end_time, bucket=None):
+    """Queue a backfill job.
+
+    Args:
+        db: object_tracking database
+        zone_id: Zone to backfill
+        start_time: Range start (naive UTC datetime)
+        end_time: Range end (naive UTC datetime)
+        bucket: InfluxDB bucket to read, defaults to the finest tier that
+            still holds start_time (as for jobs queued through the API)
+
+    Returns:
+        Job id
+    """
+    job_id = f"backfill_{str(uuid.uuid4())[:8]}"
+    db['backfill_jobs'].insert_one({
+        "_id": job_id,
+        "zone_id": zone_id,
+        "start": start_time,
+        "end": end_time,
+        "bucket": bucket or select_tier(start_time, end_time)["bucket"],
+        "status": "pending",
+        "objects_total": None,
+        "objects_done": 0,
+        "events_inserted": 0,
+        "completed_objects": [],
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    })
+    return job_id
+
+
+def job_owner():
+    """Identify this process as the owner of the jobs it runs."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def stale_heartbeat():
+    """Query condition of jobs whose owner stopped refreshing the heartbeat."""
+    cutoff = datetime.utcnow() - timedelta(seconds=backfill_heartbeat_timeout)
+    return {"heartbeat_at": {"$not": {"$gte": cutoff}}}
+
+
+def _heartbeat(jobs, job_id, owner, stop):
+    """Refresh a job's heartbeat until stopped (runs in a thread)."""
+    while not stop.wait(backfill_heartbeat_timeout / 4):
+        try:
+            jobs.update_one({"_id": job_id, "owner": owner}, {"$set": {"heartbeat_at": datetime.utcnow()}})
+        except Exception as e:
+            print(f"Error updating heartbeat of backfill {job_id}: {e}")
+
+
+def run_job(db, job_id, workers=2, hysteresis=None, owner=None):
+    """Run (or resume) a backfill job to completion.
+
+    Args:
+        db: object_tracking database
+        job_id: Job to run
+        workers: Number of worker processes
+        hysteresis: Default ZoneHysteresis, overridden by the zone's settings
+        owner: Owner recorded on the job, defaults to this process
+
+    Returns:
+        The final job document
+
+    Raises:
+        ValueError: If the job or its zone is unknown, or the job is
+            running with a fresh heartbeat under another owner
+    """
+    owner = owner or job_owner()
+    jobs = db['backfill_jobs']
+    job = jobs.find_one_and_update(
+        {"_id": job_id, "$or": [{"status": {"$ne": "running"}}, {"owner": owner}, stale_heartbeat()]},
+        {"$set": {
+            "status": "running",
+            "owner": owner,
+            "heartbeat_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }, "$unset": {"error": ""}},
+        return_document=ReturnDocument.AFTER
+    )
+    if job is None:
+        if jobs.find_one({"_id": job_id}, {"_id": 1}) is None:
+            raise ValueError(f"Unknown backfill job: {job_id}")
+        raise ValueError(f"Backfill job {job_id} is running on another worker")
+    mine = {"_id": job_id, "owner": owner}
+    zone = db['zones'].find_one({"_id": job["zone_id"]})
+    if zone is None:
+        jobs.update_one(mine, {"$set": {"status": "failed", "error": "Zone not found"}})
+        raise ValueError(f"Unknown zone: {job['zone_id']}")
+    settings = ZoneHysteresis.from_zone(zone, hysteresis or zone_hysteresis_defaults)
+
+    stop_heartbeat = threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(jobs, job_id, owner, stop_heartbeat),
+        name="backfill-heartbeat", daemon=True
+    ).start()
+    try:
+        with InfluxDBClient(url=influxdb_url, token=influxdb_token, org=influxdb_org) as client:
+            object_ids = list_objects(client.query_api(), job["bucket"], job["start"], job["end"], zone)
+        remaining = sorted(set(object_ids) - set(job.get("completed_objects", [])))
+        jobs.update_one(mine, {"$set": {
+            "objects_total": len(object_ids),
+            "updated_at": datetime.utcnow()
+        }})
+        print(f"Backfill {job_id}: {len(remaining)} of {len(object_ids)} objects to replay")
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_backfill_object, job, zone, settings, obj_id) for obj_id in remaining]
+            for future in as_completed(futures):
+                obj_id, inserted = future.result()
+                progress = jobs.find_one_and_update(
+                    mine,
+                    {
+                        "$addToSet": {"completed_objects": obj_id},
+                        "$inc": {"objects_done": 1, "events_inserted": inserted},
+                        "$set": {"updated_at": datetime.utcnow()}
+                    },
+                    projection={"objects_done": 1, "objects_total": 1, "events_inserted": 1},
+                    return_document=ReturnDocument.AFTER
+                )
+                if progress is None:
+                    for pending in futures:
+                        pending.cancel()
+                    raise RuntimeError(f"Backfill {job_id} was taken over by another worker")
+                print(f"Backfill {job_id}: {progress['objects_done']}/{progress['objects_total']} objects, "
+                      f"{progress['events_inserted']} events")
+    except Exception as e:
+        jobs.update_one(mine, {"$set": {
+            "status": "failed",
+            "error": str(e),
+            "updated_at": datetime.utcnow()
+        }})
+        raise
+    finally:
+        stop_heartbeat.set()
+
+    jobs.update_one(mine, {"$set": {"status": "done", "updated_at": datetime.utcnow()}})
+    return jobs.find_one({"_id": job_id}, {"completed_objects": 0})
+
+
+def partition_predicate(zone):
+    """Flux condition limiting positions to the site/floor a zone applies to."""
+    site, floor = partition_key(zone.get("site"), zone.get("floor"))
+    condition = 'r._measurement == "object_position"'
+    if site is not None:
+        condition += f' and r.site == "{site}"'
+    if floor is not None:
+        condition += f' and r.floor == "{floor}"'
+    return condition
+
+
+def list_objects(query_api, bucket, start_time, end_time, zone):
+    """List the object ids with positions a zone applies to in a time range."""
+    flux_query = f'''
+    import "influxdata/influxdb/schema"
+    schema.tagValues(
+        bucket: "{bucket}",
+        tag: "object_id",
+        predicate: (r) => {partition_predicate(zone)},
+        start: {start_time.isoformat()}Z,
+        stop: {end_time.isoformat()}Z
+    )
+    '''
+    return [record.get_value() for table in query_api.query(flux_query) for record in table.records]
+
+
+def stream_positions(query_api, bucket, obj_id, start_time, end_time, zone,
+                     chunk_seconds=backfill_chunk_seconds):
+    """Yield (timestamp, x, y) of an object where a zone applies, in time order, one chunk per query."""
+    chunk_start = start_time
+    while chunk_start < end_time:
+        chunk_end = min(end_time, chunk_start + timedelta(seconds=chunk_seconds))
+        flux_query = f'''
+        from(bucket: "{bucket}")
+            |> range(start: {chunk_start.isoformat()}Z, stop: {chunk_end.isoformat()}Z)
+            |> filter(fn: (r) => {partition_predicate(zone)})
+            |> filter(fn: (r) => r.object_id == "{obj_id}")
+            |> filter(fn: (r) => r._field == "x" or r._field == "y")
+            |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+            |> group()
+            |> sort(columns: ["_time"])
+        '''
+        for record in query_api.query_stream(flux_query):
+            if record["x"] is not None and record["y"] is not None:
+                yield to_epoch(record.get_time()), record["x"], record["y"]
+        chunk_start = chunk_end
+
+
+def replay_zone(obj_id, zone, settings, positions):
+    """Derive the zone events of one object's time-ordered positions.
+
+    Args:
+        obj_id: Object identifier
+        zone: Zone document (area or line zone)
+        settings: ZoneHysteresis of an area zone
+        positions: Iterable of (timestamp, x, y) in time order
+
+    Returns:
+        List of zone_events documents
+    """
+    events = []
+    if zone.get("type") == "line":
+        tripwires = TripwireIndex()
+        tripwires.build({zone["_id"]: zone})
+        previous = None
+        for timestamp, x, y in positions:
+            if previous is not None and timestamp > previous[2]:
+                crossings = tripwires.crossings(previous[:2], (x, y))
+                if crossings:
+                    events.extend(cross_events(obj_id, previous, (x, y, timestamp), crossings))
+            previous = (x, y, timestamp)
+        return events
+
+    shape = compile_zone(zone)
+    membership = ZoneMembership()
+    entry_time = None
+    for timestamp, x, y in positions:
+        inside = shape.contains(x, y)
+        if membership.state == OUTSIDE and not inside:
+            continue
+        distance = shape.distance(x, y) if settings.buffer else 0
+        change = membership.update(timestamp, x, y, inside, distance, settings)
+        if change is None:
+            continue
+        kind, since, point = change
+        if kind == "enter":
+            events.append(enter_event(obj_id, zone["_id"], since, point))
+            entry_time = since
+        else:
+            duration = since - entry_time if entry_time is not None else None
+            events.append(exit_event(obj_id, zone["_id"], since, point, duration))
+            entry_time = None
+    return events
+
+
+def _init_worker():
+    """Create the database clients of a pool worker process."""
+    global _query_api, _zone_events
+    influx_client = InfluxDBClient(url=influxdb_url, token=influxdb_token, org=influxdb_org)
+    _query_api = influx_client.query_api()
+    _zone_events = MongoClient(mongodb_uri)['object_tracking']['zone_events']
+
+
+def _backfill_object(job, zone, settings, obj_id):
+    """Replay one object and insert its events (runs in a worker process).
+
+    Returns:
+        (obj_id, number of events inserted)
+    """
+    positions = stream_positions(_query_api, job["bucket"], obj_id, job["start"], job["end"], zone)
+    events = replay_zone(obj_id, zone, settings, positions)
+    for index, event in enumerate(events):
+        event["_id"] = f"{job['_id']}:{obj_id}:{index}"
+        event["backfill_job"] = job["_id"]
+
+    # Skip events an earlier, interrupted run of this object stored; the
+    # unique _id index does not exist in time-series collections
+    stored = {
+        event["_id"] for event in
+        _zone_events.find({"backfill_job": job["_id"], "object_id": obj_id}, {"_id": 1})
+    }
+    events = [event for event in events if event["_id"] not in stored]
+    if not events:
+        return obj_id, 0
+
+    try:
+        _zone_events.insert_many(events, ordered=False)
+    except BulkWriteError as e:
+        # Events left by an earlier, interrupted run of this object
+        if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+            raise
+        return obj_id, e.details["nInserted"]
+    return obj_id, len(events)
+
+
+class BackfillWorker:
+    """Runs backfill jobs queued through the API in the background.
+
+    Each job runs in a separate `backfill.py --resume` process, so its
+    process pool is not forked from the threaded live processor. Pending
+    jobs and running jobs with a stale heartbeat are claimed, so jobs of
+    other live processor instances are left alone.
+    """
+
+    def __init__(self, db, workers=2, poll_interval=5.0):
+        """Initialize the worker.
+
+        Args:
+            db: object_tracking database
+            workers: Worker processes per job
+            poll_interval: Seconds between checks for queued jobs
+        """
+        self.db = db
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.owner = job_owner()
+        self._process = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="backfill-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop picking up jobs and hand a job in progress back to the queue."""
+        self._stop.set()
+        process = self._process
+        if process is not None:
+            process.terminate()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _claim(self):
+        """Claim the oldest pending job, or a running one whose owner stopped."""
+        return self.db['backfill_jobs'].find_one_and_update(
+            {"$or": [{"status": "pending"}, dict(stale_heartbeat(), status="running")]},
+            {"$set": {
+                "status": "running",
+                "owner": self.owner,
+                "heartbeat_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            }},
+            sort=[("created_at", 1)]
+        )
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            job = self._claim()
+            if job is None:
+                continue
+            returncode = None
+            if not self._stop.is_set():
+                self._process = subprocess.Popen([
+                    sys.executable, os.path.abspath(__file__),
+                    "--resume", job["_id"],
+                    "--workers", str(self.workers),
+                    "--owner", self.owner
+                ])
+                returncode = self._process.wait()
+                self._process = None
+            if self._stop.is_set():
+                # Interrupted by stop(); any worker may resume it right away
+                self.db['backfill_jobs'].update_one(
+                    {"_id": job["_id"], "owner": self.owner, "status": "running"},
+                    {"$set": {"status": "pending"}, "$unset": {"owner": "", "heartbeat_at": ""}}
+                )
+            elif returncode != 0:
+                print(f"Backfill {job['_id']} failed with exit code {returncode}")
+
+
+def _parse_time(value):
+    """Parse an ISO time as a naive UTC datetime."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute zone events for a zone from stored positions")
+    parser.add_argument("zone_id", nargs="?", help="zone to backfill")
+    parser.add_argument("--start", help="range start, ISO UTC time")
+    parser.add_argument("--end", help="range end, ISO UTC time (default: now)")
+    parser.add_argument("--bucket", help="InfluxDB bucket to read (default: the tier holding --start)")
+    parser.add_argument("--resume", metavar="JOB_ID", help="resume an interrupted job")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--owner", help="owner recorded on the job (default: host:pid)")
+    args = parser.parse_args()
+
+    db = MongoClient(mongodb_uri)['object_tracking']
+    if args.resume:
+        job_id = args.resume
+    elif args.zone_id and args.start:
+        end_time = _parse_time(args.end) if args.end else datetime.utcnow()
+        job_id = create_job(db, args.zone_id, _parse_time(args.start), end_time, args.bucket)
+        print(f"Created backfill job {job_id}")
+    else:
+        parser.error("give a zone_id and --start, or --resume JOB_ID")
+
+    job = run_job(db, job_id, args.workers, zone_hysteresis_defaults, owner=args.owner)
+    print(f"Backfill {job_id} done: {job['events_inserted']} events for {job['objects_done']} objects")
+
+
+if __name__ == "__main__":
+    main()
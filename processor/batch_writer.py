@@ -0,0 +1,100 @@
+"""
+Concurrent batched writes from asyncio code.
+"""
+import asyncio
+
+
+class AsyncBatchWriter:
+    """Groups items into batches and keeps several batch writes in flight.
+
+    Items are cut into batches of max_batch, and whatever is pending is
+    batched every flush_interval seconds. Up to max_queued batches wait for
+    the concurrency writer tasks; add() waits while that queue is full, so
+    a slow database slows down the stages feeding it instead of growing
+    memory without bound.
+    """
+
+    def __init__(self, write, name, flush_interval=0.1, max_batch=5000, concurrency=4, max_queued=16,
+                 retries=5, retry_interval=1.0):
+        """Initialize the writer.
+
+        Args:
+            write: Coroutine function writing one list of items
+            name: What is written, for log messages
+            flush_interval: Seconds between flushes of a partial batch
+            max_batch: Items per batch
+            concurrency: Batches written at the same time
+            max_queued: Batches waiting for a writer before add() blocks
+            retries: Attempts after a failed write before a batch is dropped
+            retry_interval: Seconds between attempts
+        """
+        self.write = write
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.retries = retries
+        self.retry_interval = retry_interval
+        self._pending = []
+        self._batches = None
+        self._tasks = []
+
+    async def add(self, items):
+        """Queue items, waiting while too many batches are waiting."""
+        self._pending.extend(items)
+        await self._queue_batches(self.max_batch)
+
+    def start(self):
+        """Start the writer and flush tasks on the running event loop."""
+        if self._tasks:
+            return
+        # Created here so the queue belongs to the running loop
+        self._batches = asyncio.Queue(self.max_queued)
+        self._tasks = [asyncio.ensure_future(self._run_writer()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.ensure_future(self._run_flush()))
+
+    async def stop(self):
+        """Write everything pending, then stop the tasks."""
+        if not self._tasks:
+            return
+        await self._queue_batches(1)
+        await self._batches.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _queue_batches(self, minimum):
+        """Move pending items into batches while at least minimum are pending."""
+        while self._pending and len(self._pending) >= minimum:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            await self._batches.put(batch)
+
+    async def _write_batch(self, batch):
+        """Write one batch, retrying failed attempts."""
+        for attempt in range(self.retries + 1):
+            try:
+                await self.write(batch)
+                return
+            except Exception as e:
+                print(f"Error writing {len(batch)} {self.name}: {e}")
+                if attempt < self.retries:
+                    await asyncio.sleep(self.retry_interval)
+        print(f"Dropped {len(batch)} {self.name}")
+
+    async def _run_writer(self):
+        """Writer loop; several run concurrently."""
+        while True:
+            batch = await self._batches.get()
+            try:
+                await self._write_batch(batch)
+            finally:
+                self._batches.task_done()
+
+    async def _run_flush(self):
+        """Flush loop batching partial batches."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._queue_batches(1)
@@ -0,0 +1,99 @@
+"""
+Benchmark of position compression on a simulated stop-and-go trace.
+
+Feeds one object's positions through each compression mode, then
+reconstructs every received position from the stored points the way the
+history API does (holding the last stored point for deadband, linear
+interpolation for swinging_door) and reports stored points, the largest
+reconstruction error and the time spent per point.
+
+Usage:
+    python benchmark_compression.py [--points 20000] [--rate 10]
+"""
+import argparse
+import bisect
+import math
+import random
+import time
+
+from compression import PositionCompressor
+
+
+def stop_and_go_trace(points, rate, seed=1):
+    """Positions of an object alternating between walking and standing still.
+
+    Returns:
+        List of (timestamp, x, y) at `rate` points per second
+    """
+    rng = random.Random(seed)
+    trace = []
+    x = y = 0.0
+    heading = speed = 0.0
+    for i in range(points):
+        if rng.random() < 0.01:
+            # Start walking in a new direction or stop
+            heading = rng.uniform(0, 2 * math.pi)
+            speed = rng.choice([0.0, rng.uniform(0.5, 2.0)])
+        x += math.cos(heading) * speed / rate
+        y += math.sin(heading) * speed / rate
+        # Positioning noise
+        trace.append((i / rate, x + rng.gauss(0, 0.02), y + rng.gauss(0, 0.02)))
+    return trace
+
+
+def compress(compressor, trace, obj_id="obj"):
+    """Stored points of a trace, including the tail flushed at the end."""
+    stored = []
+    for t, x, y in trace:
+        stored.extend(compressor.offer(obj_id, t, x, y))
+    stored.extend(point for _, _, point in compressor.flush())
+    return stored
+
+
+def reconstruct(stored, times, t, mode):
+    """Position at time t rebuilt from the stored points and their times."""
+    i = bisect.bisect_right(times, t) - 1
+    t0, x0, y0 = stored[i]
+    if mode == "deadband" or i + 1 == len(stored) or t0 == t:
+        return x0, y0
+    t1, x1, y1 = stored[i + 1]
+    f = (t - t0) / (t1 - t0)
+    return x0 + (x1 - x0) * f, y0 + (y1 - y0) * f
+
+
+def max_error(trace, stored, mode):
+    """Largest distance between a received position and its reconstruction."""
+    times = [point[0] for point in stored]
+    return max(
+        math.hypot(x - rx, y - ry)
+        for t, x, y in trace
+        for rx, ry in [reconstruct(stored, times, t, mode)]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark position compression")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--rate", type=float, default=10, help="positions per second")
+    parser.add_argument("--deadband", type=float, default=0.5)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--heartbeat", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    trace = stop_and_go_trace(args.points, args.rate, args.seed)
+    print(f"points={args.points} rate={args.rate}Hz heartbeat={args.heartbeat}s")
+    for mode, bound in (("deadband", args.deadband), ("swinging_door", args.tolerance)):
+        compressor = PositionCompressor(
+            mode, deadband=args.deadband, tolerance=args.tolerance, heartbeat=args.heartbeat
+        )
+        start = time.perf_counter()
+        stored = compress(compressor, trace)
+        elapsed = time.perf_counter() - start
+        print(f"{mode} ({bound}): stored {len(stored)} points "
+              f"({100 * len(stored) / len(trace):.1f}%), max error {max_error(trace, stored, mode):.3f}, "
+              f"{elapsed / len(trace) * 1e6:.2f} us/point")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark of the proximity detector at warehouse scale.
+
+Simulates N objects moving at walking/forklift speeds and feeds every
+position update plus one detection batch per simulated tick, reporting the
+time spent per tick against the tick budget.
+
+Usage:
+    python benchmark_proximity.py [--objects 10000] [--rate 10] [--seconds 10]
+"""
+import argparse
+import math
+import random
+import time
+
+from proximity import ProximityDetector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proximity detection")
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--rate", type=float, default=10, help="updates per object per second")
+    parser.add_argument("--seconds", type=float, default=10, help="simulated duration")
+    parser.add_argument("--area", type=float, default=1000, help="side of the square floor")
+    parser.add_argument("--radius", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    detector = ProximityDetector(radius=args.radius, near_miss_distance=args.radius / 4)
+    objects = [
+        [f"obj_{i}", rng.uniform(0, args.area), rng.uniform(0, args.area),
+         rng.uniform(0.5, 3.0), rng.uniform(0, 2 * math.pi)]
+        for i in range(args.objects)
+    ]
+
+    dt = 1 / args.rate
+    ticks = int(args.seconds * args.rate)
+    update_time = 0.0
+    tick_times = []
+    episodes = 0
+    pairs = 0
+
+    for step in range(ticks):
+        now = step * dt
+        # Move objects outside of the timed section
+        for obj in objects:
+            obj[1] = min(args.area, max(0.0, obj[1] + math.cos(obj[4]) * obj[3] * dt))
+            obj[2] = min(args.area, max(0.0, obj[2] + math.sin(obj[4]) * obj[3] * dt))
+            if rng.random() < 0.01:
+                obj[4] = rng.uniform(0, 2 * math.pi)
+
+        start = time.perf_counter()
+        for obj_id, x, y, _, _ in objects:
+            detector.update(obj_id, x, y, now)
+        update_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        episodes += len(detector.tick(now))
+        tick_times.append(time.perf_counter() - start)
+        pairs += detector.active_count()
+
+    tick_times.sort()
+    total = update_time + sum(tick_times)
+    budget = args.seconds
+    print(f"objects={args.objects} rate={args.rate}Hz ticks={ticks} radius={args.radius}")
+    print(f"updates: {update_time / ticks * 1000:.2f} ms/tick")
+    print(f"detection: mean {sum(tick_times) / ticks * 1000:.2f} ms, "
+          f"p99 {tick_times[int(0.99 * (ticks - 1))] * 1000:.2f} ms per tick")
+    print(f"pairs in proximity per tick: {pairs / ticks:.1f}, episodes ended: {episodes}")
+    print(f"CPU used: {total:.2f}s for {budget:.2f}s of traffic ({100 * total / budget:.0f}% of one core)")
+
+
+if __name__ == "__main__":
+    main()
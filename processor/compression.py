@@ -0,0 +1,200 @@
+"""
+Lossy compression of position streams before they are stored.
+
+Two modes are available:
+
+- "deadband": a point is stored when the object has moved more than
+  `deadband` from the last stored point. Holding the last stored value until
+  the next one (step interpolation) reconstructs every received position
+  within that distance; linear interpolation does not bound the error.
+- "swinging_door": a point is stored when the straight line from the last
+  stored point can no longer pass within `tolerance` of every point received
+  since. Linear interpolation between stored points reconstructs the path
+  within that distance.
+
+In both modes a point is also stored at least every `heartbeat` seconds, so
+stationary objects still show up and the unstored tail stays bounded. The
+last received point of an object that stops reporting is returned by
+expire() once it has been silent for `heartbeat` seconds, and by flush() on
+shutdown, so its final position is stored too.
+
+Run `python benchmark_compression.py` for stored points and reconstruction
+error on a simulated trace.
+"""
+import fnmatch
+import math
+import threading
+
+COMPRESSION_MODES = ("off", "deadband", "swinging_door")
+
+
+class _ObjectState:
+    """Per-object compression state."""
+
+    __slots__ = ("stored", "held", "tags", "lo_x", "hi_x", "lo_y", "hi_y")
+
+    def __init__(self, point, tags):
+        self.stored = point  # last stored (t, x, y)
+        self.held = None  # last received but not stored (t, x, y)
+        self.tags = tags  # returned with the held point when it is stored late
+        self.lo_x = self.lo_y = -math.inf  # swinging door slope bounds
+        self.hi_x = self.hi_y = math.inf
+
+
+class PositionCompressor:
+    """Decides which received positions are worth storing, per object.
+
+    Thread-safe: positions may be offered while another thread expires idle
+    objects.
+    """
+
+    def __init__(self, mode="off", deadband=0.5, tolerance=0.25, heartbeat=30, objects=None):
+        """Initialize the compressor.
+
+        Args:
+            mode: One of COMPRESSION_MODES
+            deadband: Minimum movement before storing a point (deadband mode)
+            tolerance: Maximum reconstruction error (swinging_door mode)
+            heartbeat: Maximum seconds between stored points
+            objects: Glob patterns of object ids to compress; None for all
+        """
+        if mode not in COMPRESSION_MODES:
+            raise ValueError(f"Unknown compression mode: {mode}")
+        self.mode = mode
+        self.deadband = deadband
+        # Bound each axis separately so the Euclidean error stays within tolerance
+        self.axis_tolerance = tolerance / math.sqrt(2)
+        self.heartbeat = heartbeat
+        self.objects = objects or None
+        self._states = {}
+        self._enabled = {}  # {obj_id: bool} cached pattern matches
+        self._lock = threading.Lock()
+
+    def is_enabled(self, obj_id):
+        """Check whether positions of an object are compressed."""
+        if self.mode == "off":
+            return False
+        enabled = self._enabled.get(obj_id)
+        if enabled is None:
+            enabled = self.objects is None or any(fnmatch.fnmatchcase(obj_id, p) for p in self.objects)
+            self._enabled[obj_id] = enabled
+        return enabled
+
+    def offer(self, obj_id, timestamp, x, y, tags=None):
+        """Feed one received position.
+
+        Args:
+            tags: Returned by expire() and flush() with the object's pending
+                point, e.g. the (site, floor) needed to store it
+
+        Returns:
+            List of (timestamp, x, y) points to store, oldest first
+        """
+        point = (timestamp, x, y)
+        if not self.is_enabled(obj_id):
+            return [point]
+
+        with self._lock:
+            state = self._states.get(obj_id)
+            if state is None:
+                self._states[obj_id] = _ObjectState(point, tags)
+                return [point]
+            if timestamp <= (state.held or state.stored)[0]:
+                # Out of order or duplicate; the reconstruction cannot use it
+                return []
+
+            state.tags = tags
+            if self.mode == "deadband":
+                return self._offer_deadband(state, point)
+            return self._offer_swinging_door(state, point)
+
+    def forget(self, obj_id):
+        """Drop the state of an object, storing its pending point if any.
+
+        Returns:
+            List of points to store
+        """
+        with self._lock:
+            state = self._states.pop(obj_id, None)
+        return [state.held] if state and state.held else []
+
+    def expire(self, now):
+        """Forget objects silent for `heartbeat` seconds.
+
+        Args:
+            now: Current time, comparable with the offered timestamps
+
+        Returns:
+            List of (obj_id, tags, point) of their pending points to store
+        """
+        with self._lock:
+            idle = [
+                obj_id for obj_id, state in self._states.items()
+                if now - (state.held or state.stored)[0] >= self.heartbeat
+            ]
+            states = [(obj_id, self._states.pop(obj_id)) for obj_id in idle]
+        return [(obj_id, state.tags, state.held) for obj_id, state in states if state.held]
+
+    def flush(self):
+        """Forget every object, e.g. on shutdown.
+
+        Returns:
+            List of (obj_id, tags, point) of the pending points to store
+        """
+        with self._lock:
+            states, self._states = self._states, {}
+        return [(obj_id, state.tags, state.held) for obj_id, state in states.items() if state.held]
+
+    def _offer_deadband(self, state, point):
+        """Store the point if it left the deadband or the heartbeat is due."""
+        t, x, y = point
+        st, sx, sy = state.stored
+        if math.hypot(x - sx, y - sy) > self.deadband or t - st >= self.heartbeat:
+            state.stored = point
+            state.held = None
+            return [point]
+        state.held = point
+        return []
+
+    def _offer_swinging_door(self, state, point):
+        """Hold the point while one line still fits, else store the held one."""
+        if not self._within_doors(state, point):
+            # The door closed: store the last point that still fit and swing
+            # a new door from it
+            stored = [state.held]
+            self._restart(state, state.held)
+        else:
+            stored = []
+
+        if point[0] - state.stored[0] >= self.heartbeat:
+            self._restart(state, point)
+            stored.append(point)
+        else:
+            self._narrow_doors(state, point)
+            state.held = point
+        return stored
+
+    def _restart(self, state, point):
+        """Make point the last stored point and reopen the doors."""
+        state.stored = point
+        state.held = None
+        state.lo_x = state.lo_y = -math.inf
+        state.hi_x = state.hi_y = math.inf
+
+    def _within_doors(self, state, point):
+        """Check that the line from the stored point to point fits all held points."""
+        st, sx, sy = state.stored
+        dt = point[0] - st
+        slope_x = (point[1] - sx) / dt
+        slope_y = (point[2] - sy) / dt
+        return state.lo_x <= slope_x <= state.hi_x and state.lo_y <= slope_y <= state.hi_y
+
+    def _narrow_doors(self, state, point):
+        """Constrain future slopes so the line also passes near point."""
+        st, sx, sy = state.stored
+        dt = point[0] - st
+        tol = self.axis_tolerance
+        state.lo_x = max(state.lo_x, (point[1] - tol - sx) / dt)
+        state.hi_x = min(state.hi_x, (point[1] + tol - sx) / dt)
+        state.lo_y = max(state.lo_y, (point[2] - tol - sy) / dt)
+        state.hi_y = min(state.hi_y, (point[2] + tol - sy) / dt)
@@ -0,0 +1,78 @@
+"""
+Planar geometry helpers for zone polygons.
+
+Polygons are lists of {'x': .., 'y': ..} vertices as stored in the zones
+collection.
+"""
+import math
+
+
+def point_segment_distance(px, py, ax, ay, bx, by):
+    """Distance from point P to the segment AB."""
+    dx = bx - ax
+    dy = by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def point_in_polygon(point, polygon):
+    """Check if a point is inside a polygon using ray casting."""
+    x, y = point
+    n = len(polygon)
+    inside = False
+
+    p1x, p1y = polygon[0]['x'], polygon[0]['y']
+    for i in range(1, n + 1):
+        p2x, p2y = polygon[i % n]['x'], polygon[i % n]['y']
+        if y > min(p1y, p2y):
+            if y <= max(p1y, p2y):
+                if x <= max(p1x, p2x):
+                    if p1y != p2y:
+                        xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+                    if p1x == p2x or x <= xinters:
+                        inside = not inside
+        p1x, p1y = p2x, p2y
+
+    return inside
+
+
+def distance_to_boundary(point, polygon):
+    """Distance from a point to the nearest edge of a polygon."""
+    x, y = point
+    n = len(polygon)
+    return min(
+        point_segment_distance(
+            x, y,
+            polygon[i]['x'], polygon[i]['y'],
+            polygon[(i + 1) % n]['x'], polygon[(i + 1) % n]['y']
+        )
+        for i in range(n)
+    )
+
+
+def segment_intersection(p0, p1, q0, q1):
+    """Intersect the segments P (p0 -> p1) and Q (q0 -> q1).
+
+    Returns:
+        (t, side) where t in [0, 1] is the position of the intersection along
+        P and side is +1 if P crosses Q from its left to its right, -1 for
+        right to left; None if the segments do not cross
+    """
+    rx = p1[0] - p0[0]
+    ry = p1[1] - p0[1]
+    sx = q1[0] - q0[0]
+    sy = q1[1] - q0[1]
+    denom = rx * sy - ry * sx
+    if denom == 0:
+        # Parallel or collinear; touching along a line is not a crossing
+        return None
+    qpx = q0[0] - p0[0]
+    qpy = q0[1] - p0[1]
+    t = (qpx * sy - qpy * sx) / denom
+    u = (qpx * ry - qpy * rx) / denom
+    if 0 <= t <= 1 and 0 <= u <= 1:
+        return t, (1 if denom > 0 else -1)
+    return None
@@ -0,0 +1,96 @@
+"""
+Debouncing of zone membership changes.
+
+An object must be at least `buffer` inside a zone's boundary to count as
+inside and at least `buffer` outside to count as outside; in between it
+keeps its previous state. An entry only counts after the object stayed in
+for `min_dwell` seconds, and an exit only after it stayed out for
+`exit_grace` seconds. Confirmed changes carry the time and position at
+which they started, so reported timestamps stay correct.
+"""
+OUTSIDE = "outside"
+ENTERING = "entering"
+INSIDE = "inside"
+EXITING = "exiting"
+
+
+class ZoneHysteresis:
+    """Hysteresis settings of one zone."""
+
+    __slots__ = ("buffer", "min_dwell", "exit_grace")
+
+    def __init__(self, buffer=0.0, min_dwell=0.0, exit_grace=0.0):
+        """Initialize the settings.
+
+        Args:
+            buffer: Distance beyond the boundary needed to change state
+            min_dwell: Seconds inside before an entry counts
+            exit_grace: Seconds outside before an exit counts
+        """
+        self.buffer = buffer
+        self.min_dwell = min_dwell
+        self.exit_grace = exit_grace
+
+    @classmethod
+    def from_zone(cls, zone, defaults):
+        """Read a zone's optional 'hysteresis' settings over the defaults."""
+        settings = zone.get("hysteresis") or {}
+        return cls(
+            buffer=float(settings.get("buffer", defaults.buffer)),
+            min_dwell=float(settings.get("min_dwell", defaults.min_dwell)),
+            exit_grace=float(settings.get("exit_grace", defaults.exit_grace)),
+        )
+
+
+class ZoneMembership:
+    """State machine of one object's membership in one zone."""
+
+    __slots__ = ("state", "since", "point")
+
+    def __init__(self):
+        self.state = OUTSIDE
+        self.since = None  # when the pending change started
+        self.point = None  # where the pending change started
+
+    @property
+    def is_member(self):
+        """Whether the object currently counts as inside the zone."""
+        return self.state in (INSIDE, EXITING)
+
+    def update(self, timestamp, x, y, inside, distance, settings):
+        """Feed one position.
+
+        Args:
+            timestamp: Epoch seconds of the position
+            x, y: Position
+            inside: Whether the position lies inside the zone polygon
+            distance: Distance from the position to the zone boundary
+            settings: ZoneHysteresis of the zone
+
+        Returns:
+            ("enter" | "exit", start timestamp, (x, y) at start) when a change
+            is confirmed, otherwise None
+        """
+        clearly_inside = inside and distance >= settings.buffer
+        clearly_outside = not inside and distance >= settings.buffer
+
+        if self.state == OUTSIDE:
+            if clearly_inside:
+                self.state, self.since, self.point = ENTERING, timestamp, (x, y)
+        elif self.state == INSIDE:
+            if clearly_outside:
+                self.state, self.since, self.point = EXITING, timestamp, (x, y)
+        elif self.state == ENTERING and clearly_outside:
+            self.state = OUTSIDE
+            return None
+        elif self.state == EXITING and clearly_inside:
+            self.state = INSIDE
+            return None
+
+        if self.state == ENTERING and timestamp - self.since >= settings.min_dwell:
+            self.state = INSIDE
+            return ("enter", self.since, self.point)
+        if self.state == EXITING and timestamp - self.since >= settings.exit_grace:
+            self.state = OUTSIDE
+            return ("exit", self.since, self.point)
+        return None
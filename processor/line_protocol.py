@@ -0,0 +1,167 @@
+"""
+Direct InfluxDB line protocol encoding of object positions.
+
+Building an influxdb_client Point per position allocates the point, its tag
+and field dicts and escapes every key and value again when it is
+serialized. Positions only differ in their tags per object, so the escaped
+'measurement,tags ' prefix is built once per object and each position is
+formatted straight into bytes, identical to what Point produces.
+"""
+import math
+import threading
+
+MEASUREMENT = "object_position"
+
+# Same escaping as influxdb_client for tag keys and values
+_ESCAPE_KEY = str.maketrans({
+    ',': r'\,',
+    '=': r'\=',
+    ' ': r'\ ',
+    '\n': r'\n',
+    '\t': r'\t',
+    '\r': r'\r',
+})
+
+
+def _escape_tag_value(value):
+    """Escape a tag value like influxdb_client does."""
+    escaped = str(value).translate(_ESCAPE_KEY)
+    if escaped.endswith('\\'):
+        escaped += ' '
+    return escaped
+
+
+def _format_float(value):
+    """Format a float field value, dropping a trailing '.0' like influxdb_client."""
+    text = str(value)
+    return text[:-2] if text.endswith('.0') else text
+
+
+class PositionEncoder:
+    """Encodes object_position points as line protocol bytes."""
+
+    def __init__(self):
+        self._prefixes = {}  # {(obj_id, site, floor): b"object_position,tags "}
+
+    def prefix(self, obj_id, site=None, floor=None):
+        """Get the escaped measurement and tag set of an object, cached."""
+        key = (obj_id, site, floor)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            # Tags sorted by key, as InfluxDB indexes them
+            tags = [("floor", floor), ("object_id", obj_id), ("site", site)]
+            tag_set = "".join(
+                f",{name}={_escape_tag_value(value)}"
+                for name, value in tags
+                if value is not None and value != ""
+            )
+            prefix = self._prefixes[key] = f"{MEASUREMENT}{tag_set} ".encode()
+        return prefix
+
+    def encode(self, obj_id, timestamp, x, y, site=None, floor=None):
+        """Encode one position as a line (without newline).
+
+        Returns:
+            Line protocol bytes, or None for non-finite coordinates, which
+            InfluxDB cannot store
+        """
+        x = float(x)
+        y = float(y)
+        if not (math.isfinite(x) and math.isfinite(y)):
+            return None
+        return b"%sx=%s,y=%s %d" % (
+            self.prefix(obj_id, site, floor),
+            _format_float(x).encode(),
+            _format_float(y).encode(),
+            int(timestamp * 1e9)  # Convert to nanoseconds
+        )
+
+
+class LineProtocolWriter:
+    """Batches encoded lines and writes each batch as one request body.
+
+    Lines are buffered and written every flush_interval seconds, or as soon
+    as max_batch lines are pending, joined into a single pre-encoded body.
+    Gzip compression of the body is done by the InfluxDB client when it is
+    created with enable_gzip=True.
+    """
+
+    def __init__(self, write_api, bucket, flush_interval=0.1, max_batch=5000, max_pending=500000):
+        """Initialize the writer.
+
+        Args:
+            write_api: Synchronous InfluxDB write API
+            bucket: Bucket receiving the lines
+            flush_interval: Seconds between flushes
+            max_batch: Pending lines that trigger an immediate flush
+            max_pending: Lines kept while InfluxDB is unreachable; the
+                oldest are dropped beyond it
+        """
+        self.write_api = write_api
+        self.bucket = bucket
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._lines = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, lines):
+        """Queue encoded lines for the next flush."""
+        with self._lock:
+            self._lines.extend(lines)
+            full = len(self._lines) >= self.max_batch
+        if full:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="influx-line-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write any pending lines."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self):
+        """Write all pending lines in one request.
+
+        Returns:
+            Number of lines written
+        """
+        with self._lock:
+            lines, self._lines = self._lines, []
+        if not lines:
+            return 0
+
+        try:
+            self.write_api.write(bucket=self.bucket, record=b"\n".join(lines))
+        except Exception:
+            # Keep the lines, in order, for the next attempt
+            with self._lock:
+                self._lines[:0] = lines
+                dropped = len(self._lines) - self.max_pending
+                if dropped > 0:
+                    del self._lines[:dropped]
+                    print(f"Dropped {dropped} positions pending for InfluxDB")
+            raise
+        return len(lines)
+
+    def _run(self):
+        """Flush loop; wakes early when a batch fills up."""
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing positions to InfluxDB: {e}")
@@ -0,0 +1,222 @@
+"""
+Coalesced writes of per-object state to MongoDB.
+"""
+import asyncio
+import threading
+
+from pymongo import UpdateOne
+
+from timestamps import to_datetime
+
+
+class ObjectStateWriter:
+    """Buffers the latest state of each object and flushes it periodically.
+
+    Position messages only overwrite an in-memory entry per object; every
+    flush_interval seconds all dirty objects are written with one unordered
+    bulk_write. Mongo writes therefore scale with the number of objects per
+    interval rather than with the message rate, and stored state is at most
+    flush_interval seconds stale.
+    """
+
+    def __init__(self, objects_collection, events_collection, flush_interval=0.5):
+        """Initialize the writer.
+
+        Args:
+            objects_collection: Collection holding per-object state
+            events_collection: Collection receiving appearance events
+            flush_interval: Seconds between flushes (the staleness bound)
+        """
+        self.objects_collection = objects_collection
+        self.events_collection = events_collection
+        self.flush_interval = flush_interval
+        self._dirty = {}  # {obj_id: {"x", "y", "timestamp", "first_timestamp", "site", "floor"}}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def update(self, obj_id, x, y, timestamp, site=None, floor=None):
+        """Record the latest position of an object (last write wins)."""
+        with self._lock:
+            state = self._dirty.get(obj_id)
+            if state is None:
+                self._dirty[obj_id] = {
+                    "x": x, "y": y, "timestamp": timestamp, "first_timestamp": timestamp,
+                    "site": site, "floor": floor
+                }
+            else:
+                state["x"] = x
+                state["y"] = y
+                state["timestamp"] = timestamp
+                state["site"] = site
+                state["floor"] = floor
+
+    def start(self):
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="object-state-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write any pending state."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self):
+        """Write all dirty object states in one bulk operation.
+
+        Returns:
+            Number of objects written
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+
+        try:
+            # Objects coming back after a disappearance, checked before their
+            # status is overwritten
+            returning = list(self.objects_collection.find(
+                {"_id": {"$in": list(dirty)}, "status": "gone"},
+                {"last_disappearance": 1}
+            ))
+            operations, appearances = self._writes(dirty, returning)
+            self.objects_collection.bulk_write(operations, ordered=False)
+            if appearances:
+                self.events_collection.insert_many(appearances)
+        except Exception:
+            self._requeue(dirty)
+            raise
+        return len(dirty)
+
+    def _writes(self, dirty, returning):
+        """Build the bulk upserts of the dirty states and the appearance events.
+
+        Returns:
+            (operations, appearance events) tuple
+        """
+        operations = [
+            UpdateOne(
+                {"_id": obj_id},
+                {
+                    "$set": {
+                        "last_position": {"x": state["x"], "y": state["y"]},
+                        "last_updated": to_datetime(state["timestamp"]),
+                        "site": state["site"],
+                        "floor": state["floor"]
+                    },
+                    "$setOnInsert": {
+                        "first_seen": to_datetime(state["first_timestamp"]),
+                        "type": "default"
+                    }
+                },
+                upsert=True
+            )
+            for obj_id, state in dirty.items()
+        ]
+        for obj in returning:
+            operations.append(UpdateOne({"_id": obj["_id"]}, {"$set": {"status": "active"}}))
+
+        appearances = [
+            {
+                "object_id": obj["_id"],
+                "event_type": "appearance",
+                "timestamp": to_datetime(dirty[obj["_id"]]["first_timestamp"]),
+                "details": {
+                    "previous_disappearance": obj.get("last_disappearance")
+                }
+            }
+            for obj in returning
+        ]
+        return operations, appearances
+
+    def _requeue(self, dirty):
+        """Put states from a failed flush back, keeping newer updates."""
+        with self._lock:
+            for obj_id, state in dirty.items():
+                newer = self._dirty.get(obj_id)
+                if newer is None:
+                    self._dirty[obj_id] = state
+                else:
+                    newer["first_timestamp"] = state["first_timestamp"]
+
+    def _run(self):
+        """Flush loop."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing object state: {e}")
+
+
+class AsyncObjectStateWriter(ObjectStateWriter):
+    """ObjectStateWriter flushing through async (motor) collections.
+
+    Builds the same upserts and appearance events as ObjectStateWriter;
+    the flush loop is a task of the event loop instead of a thread.
+    """
+
+    def __init__(self, objects_collection, events_collection, flush_interval=0.5):
+        """Initialize the writer.
+
+        Args:
+            objects_collection: Motor collection holding per-object state
+            events_collection: Motor collection receiving appearance events
+            flush_interval: Seconds between flushes (the staleness bound)
+        """
+        super().__init__(objects_collection, events_collection, flush_interval)
+        self._task = None
+
+    def start(self):
+        """Start the flush task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write any pending state."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        """Write all dirty object states in one bulk operation.
+
+        Returns:
+            Number of objects written
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+
+        try:
+            returning = await self.objects_collection.find(
+                {"_id": {"$in": list(dirty)}, "status": "gone"},
+                {"last_disappearance": 1}
+            ).to_list(None)
+            operations, appearances = self._writes(dirty, returning)
+            await self.objects_collection.bulk_write(operations, ordered=False)
+            if appearances:
+                await self.events_collection.insert_many(appearances)
+        except Exception:
+            self._requeue(dirty)
+            raise
+        return len(dirty)
+
+    async def _run(self):
+        """Flush loop."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing object state: {e}")
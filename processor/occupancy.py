@@ -0,0 +1,105 @@
+"""
+Periodic publishing of live zone occupancy.
+"""
+import json
+import threading
+import time
+
+# Redis hash holding one JSON entry per zone, updated atomically per publish.
+# Processors sharded by site/floor each write one entry per zone and shard
+# ("<zone_id>@<shard>", with zone_id, shard and updated_at in the entry),
+# which readers merge per zone.
+OCCUPANCY_KEY = "zone_occupancy"
+OCCUPANCY_UPDATED_KEY = "zone_occupancy:updated_at"
+
+
+class OccupancyPublisher:
+    """Publishes the zone processor's occupancy to Redis and MQTT.
+
+    Occupancy itself is maintained incrementally by ZoneProcessor on every
+    entry and exit; this only snapshots it every interval seconds, so
+    readers get current counts without replaying zone events.
+    """
+
+    def __init__(self, zone_processor, redis_client, topic, interval=1.0):
+        """Initialize the publisher.
+
+        Args:
+            zone_processor: ZoneProcessor maintaining the occupancy sets
+            redis_client: Redis client receiving the snapshot
+            topic: MQTT topic the snapshot is published to
+            interval: Seconds between publishes
+        """
+        self.zone_processor = zone_processor
+        self.redis_client = redis_client
+        self.topic = topic
+        self.interval = interval
+        self.mqtt_client = None
+        patterns = zone_processor.partition_filter.patterns
+        self.shard = ",".join(patterns) if patterns else None  # None when not sharded
+        self._published = set()  # hash fields this publisher wrote last time
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, mqtt_client):
+        """Start publishing through the given MQTT client."""
+        if self._thread is not None:
+            return
+        self.mqtt_client = mqtt_client
+        self._thread = threading.Thread(target=self._run, name="occupancy-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the publish thread and remove this shard's entries."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.shard is not None and self._published:
+            try:
+                self.redis_client.hdel(OCCUPANCY_KEY, *self._published)
+            except Exception as e:
+                print(f"Error removing zone occupancy: {e}")
+
+    def publish(self):
+        """Publish one occupancy snapshot."""
+        zones = self.zone_processor.occupancy_snapshot()
+        updated_at = time.time()
+
+        if self.shard is None:
+            entries = zones
+        else:
+            entries = {
+                f"{zone_id}@{self.shard}": dict(zone, zone_id=zone_id, shard=self.shard, updated_at=updated_at)
+                for zone_id, zone in zones.items()
+            }
+
+        pipe = self.redis_client.pipeline(transaction=True)
+        if self.shard is None:
+            pipe.delete(OCCUPANCY_KEY)
+        elif self._published - set(entries):
+            # Only remove this processor's entries of zones that are gone
+            pipe.hdel(OCCUPANCY_KEY, *(self._published - set(entries)))
+        if entries:
+            pipe.hset(OCCUPANCY_KEY, mapping={
+                field: json.dumps(entry) for field, entry in entries.items()
+            })
+        pipe.set(OCCUPANCY_UPDATED_KEY, updated_at)
+        pipe.execute()
+        self._published = set(entries)
+
+        if self.mqtt_client is not None:
+            # Sharded processors each publish their own occupants
+            self.mqtt_client.publish(self.topic, json.dumps({
+                "updated_at": updated_at,
+                "shard": self.shard,
+                "zones": zones
+            }))
+
+    def _run(self):
+        """Publish loop."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                print(f"Error publishing zone occupancy: {e}")
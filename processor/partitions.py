@@ -0,0 +1,60 @@
+"""
+Site/floor partitioning of objects and zones.
+
+Positions and zones may carry an optional site and floor. A partition key
+is the (site, floor) pair with missing values as None. A zone applies to
+the positions of its own partition and of the partitions below it: a zone
+without site or floor applies everywhere, a zone with only a site to every
+floor of that site.
+"""
+import fnmatch
+
+
+def partition_key(site=None, floor=None):
+    """Normalize optional site/floor values into a (site, floor) key of strings or None."""
+    return (
+        str(site) if site not in (None, "") else None,
+        str(floor) if floor not in (None, "") else None
+    )
+
+
+def partition_label(key):
+    """Format a partition key as 'site/floor' ('/' when unpartitioned)."""
+    return f"{key[0] or ''}/{key[1] or ''}"
+
+
+def covering_keys(key):
+    """Keys of the zones that apply to positions in a partition, broadest first."""
+    site, floor = key
+    keys = [(None, None)]
+    if site is not None:
+        keys.append((site, None))
+    if floor is not None:
+        keys.append((None, floor))
+        if site is not None:
+            keys.append((site, floor))
+    return keys
+
+
+class PartitionFilter:
+    """Selects the partitions handled by one processor worker.
+
+    Patterns are globs over partition labels, e.g. 'hq/*' or 'warehouse/2';
+    '/' matches unpartitioned positions. Without patterns every partition
+    is handled.
+    """
+
+    def __init__(self, patterns=None):
+        self.patterns = patterns or None
+        self._matches = {}  # {key: bool} cached pattern matches
+
+    def owns(self, key):
+        """Check whether a partition is handled by this worker."""
+        if self.patterns is None:
+            return True
+        owned = self._matches.get(key)
+        if owned is None:
+            label = partition_label(key)
+            owned = any(fnmatch.fnmatchcase(label, p) for p in self.patterns)
+            self._matches[key] = owned
+        return owned
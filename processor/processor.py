@@ -1,26 +1,47 @@
-import os
 import json
+import threading
 import time
 from paho.mqtt import client as mqtt_client
-from influxdb_client import InfluxDBClient, Point
+from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS
 from pymongo import MongoClient
+import redis
 
-# Environment variables
-mqtt_broker = os.environ.get("MQTT_BROKER", "localhost")
-mqtt_port = 1883
-mqtt_topic = "objects/tracking/position"
+from backfill import BackfillWorker
+from compression import PositionCompressor
+from line_protocol import LineProtocolWriter, PositionEncoder
+from object_state import ObjectStateWriter
+from occupancy import OccupancyPublisher
+from partitions import PartitionFilter, partition_key
+from proximity import ProximityDetector, episode_events
+from rollups import ZoneRollupWriter
+from settings import (
+    mqtt_broker, mqtt_port, mqtt_topic, occupancy_topic, influxdb_url, influxdb_token, influxdb_org,
+    influxdb_bucket, influxdb_flush_ms, influxdb_gzip, mongodb_uri, redis_host, redis_port,
+    object_state_flush_ms, compression_mode, compression_deadband, compression_tolerance,
+    compression_heartbeat, compression_objects, zone_hysteresis_defaults, tripwire_cell_size,
+    proximity_enabled, proximity_radius, near_miss_distance, proximity_interval,
+    processor_partitions, rollup_flush_ms, occupancy_publish_interval, backfill_workers,
+    backfill_poll_interval
+)
+from zone_processor import ZoneProcessor
 
-influxdb_url = os.environ.get("INFLUXDB_URL", "http://localhost:8086")
-influxdb_token = os.environ.get("INFLUXDB_TOKEN", "my-token")
-influxdb_org = os.environ.get("INFLUXDB_ORG", "tracking")
-influxdb_bucket = os.environ.get("INFLUXDB_BUCKET", "object_positions")
-
-mongodb_uri = os.environ.get("MONGODB_URI", "mongodb://localhost:27017/")
+# Site/floor partitions handled by this processor
+partition_filter = PartitionFilter(processor_partitions)
 
 # Connect to InfluxDB
-influx_client = InfluxDBClient(url=influxdb_url, token=influxdb_token, org=influxdb_org)
+influx_client = InfluxDBClient(url=influxdb_url, token=influxdb_token, org=influxdb_org, enable_gzip=influxdb_gzip)
 write_api = influx_client.write_api(write_options=SYNCHRONOUS)
+position_encoder = PositionEncoder()
+position_writer = LineProtocolWriter(write_api, influxdb_bucket, flush_interval=influxdb_flush_ms / 1000)
+
+position_compressor = PositionCompressor(
+    compression_mode,
+    deadband=compression_deadband,
+    tolerance=compression_tolerance,
+    heartbeat=compression_heartbeat,
+    objects=compression_objects
+)
 
 # Connect to MongoDB
 mongo_client = MongoClient(mongodb_uri)
@@ -28,108 +49,39 @@ db = mongo_client['object_tracking']
 objects_collection = db['objects']
 events_collection = db['events']
 
+# Last-write-wins buffer for per-object state, flushed in bulk
+object_state_writer = ObjectStateWriter(
+    objects_collection,
+    events_collection,
+    flush_interval=object_state_flush_ms / 1000
+)
 
-class ZoneProcessor:
-    def __init__(self, db_client):
-        self.db = db_client['object_tracking']
-        self.zones_collection = self.db['zones']
-        self.zone_events_collection = self.db['zone_events']
-        self.object_zones = {}  # tracks which objects are in which zones
-        self.zones = self._load_zones()
-        
-    def _load_zones(self):
-        """Load all active zones from the database"""
-        zones = {}
-        for zone in self.zones_collection.find({"active": True}):
-            zones[zone["_id"]] = zone
-        return zones
-        
-    def reload_zones(self):
-        """Reload zones from the database (called periodically)"""
-        self.zones = self._load_zones()
-        
-    def is_point_in_polygon(self, point, polygon):
-        """Check if a point is inside a polygon using ray casting algorithm"""
-        x, y = point
-        n = len(polygon)
-        inside = False
-        
-        p1x, p1y = polygon[0]['x'], polygon[0]['y']
-        for i in range(1, n + 1):
-            p2x, p2y = polygon[i % n]['x'], polygon[i % n]['y']
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
-        
-        return inside
-        
-    def process_position(self, obj_id, x, y, timestamp):
-        """Process an object position and generate zone events if needed"""
-        # Get current zones for this object
-        current_zones = self.object_zones.get(obj_id, set())
-        new_zones = set()
-        
-        # Check each zone
-        for zone_id, zone in self.zones.items():
-            polygon = zone['polygon']
-            if self.is_point_in_polygon((x, y), polygon):
-                new_zones.add(zone_id)
-                
-                # Check if this is a zone entry
-                if zone_id not in current_zones:
-                    # Generate zone entry event
-                    self.zone_events_collection.insert_one({
-                        "object_id": obj_id,
-                        "zone_id": zone_id,
-                        "event_type": "enter",
-                        "timestamp": timestamp,
-                        "metadata": {
-                            "entry_point": {"x": x, "y": y}
-                        }
-                    })
-                    print(f"Object {obj_id} entered zone {zone['name']}")
-        
-        # Check for zone exits
-        for zone_id in current_zones:
-            if zone_id not in new_zones:
-                # Generate zone exit event
-                self.zone_events_collection.insert_one({
-                    "object_id": obj_id,
-                    "zone_id": zone_id,
-                    "event_type": "exit",
-                    "timestamp": timestamp,
-                    "metadata": {
-                        "exit_point": {"x": x, "y": y}
-                    }
-                })
-                
-                # Update duration in the entry event
-                last_entry = self.zone_events_collection.find_one({
-                    "object_id": obj_id,
-                    "zone_id": zone_id,
-                    "event_type": "enter"
-                }, sort=[("timestamp", -1)])
-                
-                if last_entry:
-                    entry_time = last_entry["timestamp"]
-                    duration = timestamp - entry_time
-                    self.zone_events_collection.update_one(
-                        {"_id": last_entry["_id"]},
-                        {"$set": {"duration": duration}}
-                    )
-                
-                print(f"Object {obj_id} exited zone {self.zones[zone_id]['name']}")
-        
-        # Update the object's zones
-        self.object_zones[obj_id] = new_zones
+proximity_detector = ProximityDetector(
+    radius=proximity_radius,
+    near_miss_distance=near_miss_distance
+) if proximity_enabled else None
+next_proximity_tick = 0
 
+zone_rollups = ZoneRollupWriter(db, flush_interval=rollup_flush_ms / 1000)
+zone_processor = ZoneProcessor(
+    mongo_client,
+    rollups=zone_rollups,
+    hysteresis=zone_hysteresis_defaults,
+    tripwire_cell_size=tripwire_cell_size,
+    partition_filter=partition_filter
+)
+occupancy_publisher = OccupancyPublisher(
+    zone_processor,
+    redis.Redis(host=redis_host, port=redis_port),
+    occupancy_topic,
+    interval=occupancy_publish_interval
+)
+backfill_worker = BackfillWorker(
+    db,
+    workers=backfill_workers,
+    poll_interval=backfill_poll_interval
+)
 
-zone_processor = ZoneProcessor(mongo_client)
 # MQTT Connection
 def connect_mqtt():
 
@@ -165,66 +117,81 @@ def on_message(client, userdata, msg):
         x = payload.get('x')
         y = payload.get('y')
         timestamp = payload.get('timestamp', time.time())
+        # Optional site/floor partition of the position
+        site, floor = key = partition_key(payload.get('site'), payload.get('floor'))
         
-        if obj_id and x is not None and y is not None:
-            # Store in InfluxDB
-            point = Point("object_position") \
-                .tag("object_id", obj_id) \
-                .field("x", float(x)) \
-                .field("y", float(y)) \
-                .time(int(timestamp * 1e9))  # Convert to nanoseconds
-            
-            write_api.write(bucket=influxdb_bucket, record=point)
+        if obj_id and x is not None and y is not None and partition_filter.owns(key):
+            # Queue for InfluxDB the points the compressor keeps
+            lines = [
+                position_encoder.encode(obj_id, pt, px, py, site, floor)
+                for pt, px, py in position_compressor.offer(obj_id, timestamp, x, y, key)
+            ]
+            position_writer.add([line for line in lines if line is not None])
             
-            # Update MongoDB (last known position and metadata)
-            objects_collection.update_one(
-                {"_id": obj_id},
-                {
-                    "$set": {
-                        "last_position": {"x": x, "y": y},
-                        "last_updated": timestamp
-                    },
-                    "$setOnInsert": {
-                        "first_seen": timestamp,
-                        "type": "default"
-                    }
-                },
-                upsert=True
-            )
-            zone_processor.process_position(obj_id, x, y, timestamp)
-            # Log disappearance/appearance events
-            check_appearance_events(obj_id, timestamp)
+            # Buffer last known position; flushed to MongoDB in bulk, which
+            # also records appearances of objects marked as gone
+            object_state_writer.update(obj_id, x, y, timestamp, site, floor)
+            zone_processor.process_position(obj_id, x, y, timestamp, site, floor)
+            if proximity_detector:
+                proximity_detector.update(obj_id, x, y, timestamp, key)
+                check_proximity(timestamp)
             
             print(f"Processed position for {obj_id}: ({x}, {y})")
     except Exception as e:
         print(f"Error processing message: {e}")
 
-def check_appearance_events(obj_id, timestamp):
-    """Detect and record object appearances and disappearances"""
-    # Get object info
-    obj = objects_collection.find_one({"_id": obj_id})
+def check_proximity(timestamp):
+    """Run a proximity batch when due and record the episodes that ended"""
+    global next_proximity_tick
+    if timestamp < next_proximity_tick:
+        return
+    next_proximity_tick = timestamp + proximity_interval
     
-    # If object exists and was previously marked as gone
-    if obj and obj.get("status") == "gone":
-        # Record reappearance event
-        events_collection.insert_one({
-            "object_id": obj_id,
-            "event_type": "appearance",
-            "timestamp": timestamp,
-            "details": {
-                "previous_disappearance": obj.get("last_disappearance")
-            }
-        })
-        # Update object status
-        objects_collection.update_one(
-            {"_id": obj_id},
-            {"$set": {"status": "active"}}
-        )
+    events = []
+    for episode in proximity_detector.tick(timestamp):
+        events.extend(episode_events(episode))
+    if events:
+        events_collection.insert_many(events, ordered=False)
+
+def store_pending_positions(pending):
+    """Queue the last points the compressor held back for the given objects"""
+    lines = [
+        position_encoder.encode(obj_id, pt, px, py, site, floor)
+        for obj_id, (site, floor), (pt, px, py) in pending
+    ]
+    position_writer.add([line for line in lines if line is not None])
+
+def expire_compressed_positions(stop):
+    """Store the final point of objects that stopped reporting"""
+    while not stop.wait(position_compressor.heartbeat):
+        store_pending_positions(position_compressor.expire(time.time()))
 
 def main():
     # Connect to MQTT broker
     client = connect_mqtt()
-    client.loop_forever()
+    position_writer.start()
+    stop_expiry = threading.Event()
+    if position_compressor.mode != "off":
+        threading.Thread(
+            target=expire_compressed_positions,
+            args=(stop_expiry,),
+            name="compression-expiry",
+            daemon=True
+        ).start()
+    object_state_writer.start()
+    occupancy_publisher.start(client)
+    zone_rollups.start()
+    backfill_worker.start()
+    try:
+        client.loop_forever()
+    finally:
+        backfill_worker.stop()
+        occupancy_publisher.stop()
+        zone_rollups.stop()
+        object_state_writer.stop()
+        stop_expiry.set()
+        store_pending_positions(position_compressor.flush())
+        position_writer.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
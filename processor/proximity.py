@@ -0,0 +1,168 @@
+"""
+Object-to-object proximity detection over a uniform spatial hash.
+"""
+import math
+
+from timestamps import to_datetime
+
+
+class ProximityDetector:
+    """Finds all pairs of objects closer than a radius and tracks episodes.
+
+    Current positions are kept in a grid of square cells one radius wide, so
+    each object is only compared with objects in its own and adjacent cells
+    rather than with every other object. Calling tick() once per batch finds
+    the close pairs; a pair that stops being close ends an episode, reported
+    with its start, end and minimum distance.
+    """
+
+    def __init__(self, radius=2.0, near_miss_distance=None, stale_after=10.0):
+        """Initialize the detector.
+
+        Args:
+            radius: Distance below which two objects are in proximity
+            near_miss_distance: Minimum distance flagging an episode as a near miss
+            stale_after: Seconds without updates before an object is dropped
+        """
+        self.radius = radius
+        self.near_miss_distance = near_miss_distance
+        self.stale_after = stale_after
+        self.cell_size = radius
+        self._positions = {}  # {obj_id: (x, y, timestamp)}
+        self._cells = {}  # {(partition, cx, cy): {obj_id: (x, y)}}
+        self._object_cells = {}  # {obj_id: (partition, cx, cy)}
+        self._episodes = {}  # {(obj_a, obj_b): [start, last_seen, min_distance, min_time]}
+
+    def update(self, obj_id, x, y, timestamp, partition=None):
+        """Record the latest position of an object.
+
+        Objects in different partitions (e.g. floors) are never paired.
+        """
+        cell = (partition, math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        old_cell = self._object_cells.get(obj_id)
+        if old_cell != cell:
+            if old_cell is not None:
+                members = self._cells[old_cell]
+                del members[obj_id]
+                if not members:
+                    del self._cells[old_cell]
+            self._object_cells[obj_id] = cell
+        self._cells.setdefault(cell, {})[obj_id] = (x, y)
+        self._positions[obj_id] = (x, y, timestamp)
+
+    def remove(self, obj_id):
+        """Forget an object."""
+        self._positions.pop(obj_id, None)
+        cell = self._object_cells.pop(obj_id, None)
+        if cell is not None:
+            members = self._cells[cell]
+            del members[obj_id]
+            if not members:
+                del self._cells[cell]
+
+    def find_pairs(self):
+        """Find all pairs of objects within the radius.
+
+        Returns:
+            {(obj_a, obj_b): distance} with obj_a < obj_b
+        """
+        radius_sq = self.radius * self.radius
+        cells = self._cells
+        pairs = {}
+        for (partition, cx, cy), members in cells.items():
+            items = list(members.items())
+            # Pairs inside the cell
+            for i, (a, (ax, ay)) in enumerate(items):
+                for b, (bx, by) in items[i + 1:]:
+                    dx = ax - bx
+                    dy = ay - by
+                    d_sq = dx * dx + dy * dy
+                    if d_sq <= radius_sq:
+                        pairs[(a, b) if a < b else (b, a)] = d_sq
+            # Pairs with half of the neighbouring cells, so each is seen once
+            for neighbour in (
+                (partition, cx + 1, cy - 1), (partition, cx + 1, cy),
+                (partition, cx + 1, cy + 1), (partition, cx, cy + 1)
+            ):
+                others = cells.get(neighbour)
+                if not others:
+                    continue
+                for a, (ax, ay) in items:
+                    for b, (bx, by) in others.items():
+                        dx = ax - bx
+                        dy = ay - by
+                        d_sq = dx * dx + dy * dy
+                        if d_sq <= radius_sq:
+                            pairs[(a, b) if a < b else (b, a)] = d_sq
+        return {pair: math.sqrt(d_sq) for pair, d_sq in pairs.items()}
+
+    def tick(self, timestamp):
+        """Run one detection batch.
+
+        Args:
+            timestamp: Epoch seconds of the batch
+
+        Returns:
+            List of ended episodes as dicts with object_ids, start, end,
+            min_distance, min_distance_time and near_miss
+        """
+        self._drop_stale(timestamp)
+
+        pairs = self.find_pairs()
+        for pair, distance in pairs.items():
+            episode = self._episodes.get(pair)
+            if episode is None:
+                self._episodes[pair] = [timestamp, timestamp, distance, timestamp]
+            else:
+                episode[1] = timestamp
+                if distance < episode[2]:
+                    episode[2] = distance
+                    episode[3] = timestamp
+
+        ended = []
+        for pair in [pair for pair in self._episodes if pair not in pairs]:
+            start, last_seen, min_distance, min_time = self._episodes.pop(pair)
+            ended.append({
+                "object_ids": pair,
+                "start": start,
+                "end": timestamp,
+                "min_distance": min_distance,
+                "min_distance_time": min_time,
+                "near_miss": self.near_miss_distance is not None and min_distance <= self.near_miss_distance,
+            })
+        return ended
+
+    def active_count(self):
+        """Number of pairs currently in proximity."""
+        return len(self._episodes)
+
+    def _drop_stale(self, timestamp):
+        """Remove objects that have not reported for stale_after seconds."""
+        cutoff = timestamp - self.stale_after
+        for obj_id in [o for o, (_, _, t) in self._positions.items() if t < cutoff]:
+            self.remove(obj_id)
+
+
+def episode_events(episode):
+    """Build the events collection documents of an ended proximity episode.
+
+    One event per object so each shows up in its own event history.
+    """
+    details = {
+        "start": to_datetime(episode["start"]),
+        "end": to_datetime(episode["end"]),
+        "duration": episode["end"] - episode["start"],
+        "min_distance": episode["min_distance"],
+        "min_distance_time": to_datetime(episode["min_distance_time"]),
+        "near_miss": episode["near_miss"]
+    }
+    obj_a, obj_b = episode["object_ids"]
+    return [
+        {
+            "object_id": obj_id,
+            "event_type": "proximity",
+            "timestamp": details["start"],
+            "details": dict(details, other_object_id=other_id)
+        }
+        for obj_id, other_id in ((obj_a, obj_b), (obj_b, obj_a))
+    ]
@@ -0,0 +1,158 @@
+"""
+Incremental hourly rollups of zone dwell times and zone-to-zone transitions.
+"""
+import threading
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Upper bounds (seconds) of the dwell histogram buckets; the last is open
+DWELL_BUCKETS = [
+    (10, "0_10s"),
+    (30, "10s_30s"),
+    (60, "30s_1m"),
+    (300, "1m_5m"),
+    (900, "5m_15m"),
+    (3600, "15m_1h"),
+]
+DWELL_OVERFLOW_BUCKET = "1h_plus"
+
+
+def dwell_bucket(duration):
+    """Get the histogram bucket label for a dwell time in seconds."""
+    for upper, label in DWELL_BUCKETS:
+        if duration < upper:
+            return label
+    return DWELL_OVERFLOW_BUCKET
+
+
+def hour_start(epoch):
+    """Truncate epoch seconds to the start of the UTC hour."""
+    return datetime.fromtimestamp(epoch - epoch % 3600, tz=timezone.utc)
+
+
+class ZoneRollupWriter:
+    """Accumulates dwell and transition counters and flushes them as $inc upserts.
+
+    zone_dwell_hourly holds one document per (zone, hour) with visit counts,
+    total dwell and a dwell histogram. zone_transitions_hourly holds one
+    document per (origin zone, hour) with counts per destination zone.
+    Reports over long ranges read these instead of raw zone events.
+    """
+
+    def __init__(self, db, flush_interval=1.0):
+        """Initialize the writer.
+
+        Args:
+            db: object_tracking database
+            flush_interval: Seconds between flushes
+        """
+        self.dwell_collection = db['zone_dwell_hourly']
+        self.transitions_collection = db['zone_transitions_hourly']
+        self.flush_interval = flush_interval
+        self._dwell = {}  # {(zone_id, hour): {field: increment}}
+        self._transitions = {}  # {(from_zone_id, hour): {to_zone_id: increment}}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record_exit(self, zone_id, timestamp, duration):
+        """Count a visit ending at timestamp, with its dwell time if known."""
+        with self._lock:
+            counters = self._dwell.setdefault((zone_id, hour_start(timestamp)), {})
+            counters["visits"] = counters.get("visits", 0) + 1
+            if duration is not None:
+                bucket = f"histogram.{dwell_bucket(duration)}"
+                counters["dwell_samples"] = counters.get("dwell_samples", 0) + 1
+                counters["total_dwell"] = counters.get("total_dwell", 0) + duration
+                counters[bucket] = counters.get(bucket, 0) + 1
+
+    def record_transition(self, from_zone_id, to_zone_id, timestamp):
+        """Count an object moving from one zone into another."""
+        with self._lock:
+            counters = self._transitions.setdefault((from_zone_id, hour_start(timestamp)), {})
+            counters[to_zone_id] = counters.get(to_zone_id, 0) + 1
+
+    def start(self):
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="zone-rollup-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write any pending counters."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self):
+        """Write the accumulated counters with one bulk_write per collection."""
+        with self._lock:
+            dwell, self._dwell = self._dwell, {}
+            transitions, self._transitions = self._transitions, {}
+
+        if dwell:
+            operations = [
+                UpdateOne(
+                    {"_id": f"{zone_id}:{hour.isoformat()}"},
+                    {
+                        "$inc": counters,
+                        "$setOnInsert": {"zone_id": zone_id, "hour": hour}
+                    },
+                    upsert=True
+                )
+                for (zone_id, hour), counters in dwell.items()
+            ]
+            self._bulk_write(self.dwell_collection, operations, dwell, self._dwell)
+        if transitions:
+            operations = [
+                UpdateOne(
+                    {"_id": f"{from_zone_id}:{hour.isoformat()}"},
+                    {
+                        "$inc": {f"to.{to_zone_id}": count for to_zone_id, count in counters.items()},
+                        "$setOnInsert": {"from_zone_id": from_zone_id, "hour": hour}
+                    },
+                    upsert=True
+                )
+                for (from_zone_id, hour), counters in transitions.items()
+            ]
+            self._bulk_write(self.transitions_collection, operations, transitions, self._transitions)
+
+    def _bulk_write(self, collection, operations, pending, target):
+        """Apply one batch; counters that were not applied are retried next flush.
+
+        operations must be in the order of pending's keys. An unordered
+        bulk_write applies every operation not listed in its write errors,
+        so only those are requeued; any other error is taken to mean that
+        nothing was applied.
+        """
+        try:
+            collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            keys = list(pending)
+            failed = [keys[error["index"]] for error in e.details["writeErrors"]]
+            self._requeue({key: pending[key] for key in failed}, target)
+            print(f"Error flushing {len(failed)} zone rollups to {collection.name}: {e}")
+        except Exception as e:
+            self._requeue(pending, target)
+            print(f"Error flushing zone rollups to {collection.name}: {e}")
+
+    def _requeue(self, pending, target):
+        """Merge counters from a failed flush back into the live counters."""
+        with self._lock:
+            for key, counters in pending.items():
+                merged = target.setdefault(key, {})
+                for field, value in counters.items():
+                    merged[field] = merged.get(field, 0) + value
+
+    def _run(self):
+        """Flush loop."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing zone rollups: {e}")
@@ -0,0 +1,72 @@
+"""
+Environment configuration of the data processor entry points.
+"""
+import os
+
+from hysteresis import ZoneHysteresis
+
+mqtt_broker = os.environ.get("MQTT_BROKER", "localhost")
+mqtt_port = 1883
+mqtt_topic = "objects/tracking/position"
+occupancy_topic = "objects/tracking/zone_occupancy"
+
+influxdb_url = os.environ.get("INFLUXDB_URL", "http://localhost:8086")
+influxdb_token = os.environ.get("INFLUXDB_TOKEN", "my-token")
+influxdb_org = os.environ.get("INFLUXDB_ORG", "tracking")
+influxdb_bucket = os.environ.get("INFLUXDB_BUCKET", "object_positions")
+# Positions are batched into one line protocol request per interval
+influxdb_flush_ms = int(os.environ.get("INFLUXDB_FLUSH_MS", "100"))
+influxdb_gzip = os.environ.get("INFLUXDB_GZIP", "false").lower() == "true"
+
+mongodb_uri = os.environ.get("MONGODB_URI", "mongodb://localhost:27017/")
+redis_host = os.environ.get("REDIS_HOST", "localhost")
+redis_port = int(os.environ.get("REDIS_PORT", "6379"))
+
+# Upper bound on how stale object state in MongoDB may be
+object_state_flush_ms = int(os.environ.get("OBJECT_STATE_FLUSH_MS", "500"))
+# Opt-in compression of positions written to InfluxDB
+compression_mode = os.environ.get("POSITION_COMPRESSION", "off")  # off, deadband or swinging_door
+compression_deadband = float(os.environ.get("COMPRESSION_DEADBAND", "0.5"))
+compression_tolerance = float(os.environ.get("COMPRESSION_TOLERANCE", "0.25"))
+compression_heartbeat = float(os.environ.get("COMPRESSION_HEARTBEAT", "30"))
+# Comma-separated object id patterns to compress (empty for all objects)
+compression_objects = [p.strip() for p in os.environ.get("COMPRESSION_OBJECTS", "").split(",") if p.strip()]
+
+# Default zone hysteresis; zones may override it with a 'hysteresis' field
+zone_hysteresis_defaults = ZoneHysteresis(
+    buffer=float(os.environ.get("ZONE_BUFFER_DISTANCE", "0")),
+    min_dwell=float(os.environ.get("ZONE_MIN_DWELL", "0")),
+    exit_grace=float(os.environ.get("ZONE_EXIT_GRACE", "0"))
+)
+
+# Grid cell size of the tripwire (line zone) segment index
+tripwire_cell_size = float(os.environ.get("TRIPWIRE_CELL_SIZE", "5"))
+
+# Object-to-object proximity detection
+proximity_enabled = os.environ.get("PROXIMITY_ENABLED", "false").lower() == "true"
+proximity_radius = float(os.environ.get("PROXIMITY_RADIUS", "2.0"))
+near_miss_distance = float(os.environ.get("NEAR_MISS_DISTANCE", "0.5"))
+proximity_interval = float(os.environ.get("PROXIMITY_INTERVAL", "0.1"))  # seconds between batches
+
+# Site/floor partitions handled by this processor, as comma-separated
+# 'site/floor' globs (empty for all); '/' matches unpartitioned positions
+processor_partitions = [p.strip() for p in os.environ.get("PROCESSOR_PARTITIONS", "").split(",") if p.strip()]
+
+# Interval of batched dwell/transition rollup writes
+rollup_flush_ms = int(os.environ.get("ROLLUP_FLUSH_MS", "1000"))
+# Seconds between zone occupancy publishes
+occupancy_publish_interval = float(os.environ.get("OCCUPANCY_PUBLISH_INTERVAL", "1"))
+# Zone backfill jobs queued through the API
+backfill_workers = int(os.environ.get("BACKFILL_WORKERS", "2"))
+backfill_poll_interval = float(os.environ.get("BACKFILL_POLL_INTERVAL", "5"))
+# Seconds of positions fetched per InfluxDB query of a backfill
+backfill_chunk_seconds = float(os.environ.get("BACKFILL_CHUNK_SECONDS", "3600"))
+# Seconds without a heartbeat after which a running backfill is taken over
+backfill_heartbeat_timeout = float(os.environ.get("BACKFILL_HEARTBEAT_TIMEOUT", "60"))
+
+# Asyncio processor (async_processor.py): bounded queues between its stages
+# and the number of writes kept in flight per sink
+async_queue_size = int(os.environ.get("ASYNC_QUEUE_SIZE", "10000"))
+async_zone_batch_size = int(os.environ.get("ASYNC_ZONE_BATCH_SIZE", "500"))
+async_influx_writers = int(os.environ.get("ASYNC_INFLUX_WRITERS", "4"))
+async_mongo_writers = int(os.environ.get("ASYNC_MONGO_WRITERS", "4"))
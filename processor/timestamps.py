@@ -0,0 +1,22 @@
+"""
+Canonical timestamp handling for documents written to MongoDB.
+
+All timestamps are stored as BSON dates in UTC so range filters built from
+datetimes compare against a single type and use the timestamp indexes.
+"""
+from datetime import datetime, timezone
+
+
+def to_datetime(epoch):
+    """Convert epoch seconds to a timezone-aware UTC datetime."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def to_epoch(value):
+    """Convert a stored timestamp (BSON date or legacy epoch float) to epoch seconds."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            # PyMongo returns naive datetimes that are in UTC
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
@@ -0,0 +1,132 @@
+"""
+Line-crossing (tripwire) detection for "line" zones.
+"""
+import math
+
+from geometry import segment_intersection
+
+
+class TripwireIndex:
+    """Uniform grid over tripwire segments.
+
+    Each segment is registered in every grid cell its bounding box touches,
+    so a movement only needs to be tested against the segments in the cells
+    it passes through. Long jumps walk at most as many cells as there are
+    segments; beyond that every segment is tested instead.
+    """
+
+    def __init__(self, cell_size=5.0):
+        """Initialize an empty index.
+
+        Args:
+            cell_size: Side of the square grid cells
+        """
+        self.cell_size = cell_size
+        self._cells = {}  # {(cx, cy): [(zone_id, segment_index, start, end)]}
+        self._segments = []  # every indexed (zone_id, segment_index, start, end)
+
+    def build(self, line_zones):
+        """Index the segments of the given line zones.
+
+        Args:
+            line_zones: {zone_id: zone} where zone['line'] is a list of
+                {'x', 'y'} points forming a polyline
+        """
+        self._cells = {}
+        self._segments = []
+        for zone_id, zone in line_zones.items():
+            points = [(p['x'], p['y']) for p in zone.get('line', [])]
+            for index, (start, end) in enumerate(zip(points, points[1:])):
+                segment = (zone_id, index, start, end)
+                self._segments.append(segment)
+                for cell in self._cells_for_box(start, end):
+                    self._cells.setdefault(cell, []).append(segment)
+
+    def crossings(self, start, end):
+        """Find the tripwires crossed by a movement from start to end.
+
+        Returns:
+            List of (zone_id, segment_index, t, direction) ordered by t, the
+            fraction of the movement at which the crossing happened.
+            direction is 'forward' when crossing from the left of the
+            segment (walking from its first to its second point) to its
+            right, 'reverse' otherwise.
+        """
+        if not self._cells or start == end:
+            return []
+        found = []
+        for zone_id, index, seg_start, seg_end in self._candidates(start, end):
+            hit = segment_intersection(start, end, seg_start, seg_end)
+            # A position exactly on the line counts for the movement
+            # reaching it, not again for the one leaving it
+            if hit and hit[0] > 0:
+                t, side = hit
+                found.append((zone_id, index, t, "forward" if side > 0 else "reverse"))
+        found.sort(key=lambda crossing: crossing[2])
+        return found
+
+    def _candidates(self, start, end):
+        """Segments sharing a grid cell with the movement, each once."""
+        size = self.cell_size
+        cx, cy = math.floor(start[0] / size), math.floor(start[1] / size)
+        ex, ey = math.floor(end[0] / size), math.floor(end[1] / size)
+        if abs(ex - cx) + abs(ey - cy) + 1 > len(self._segments):
+            return self._segments
+        seen = set()
+        candidates = []
+        for cell in self._cells_along(start, end):
+            for segment in self._cells.get(cell, ()):
+                if segment[:2] not in seen:
+                    seen.add(segment[:2])
+                    candidates.append(segment)
+        return candidates
+
+    def _cells_along(self, a, b):
+        """Grid cells a segment passes through, walked from a to b.
+
+        Amanatides-Woo traversal: step into the neighbouring cell whose
+        boundary the segment reaches first. When both boundaries are reached
+        at (nearly) the same time, both side cells are included so passing
+        through a cell corner cannot skip a segment.
+        """
+        size = self.cell_size
+        cx, cy = math.floor(a[0] / size), math.floor(a[1] / size)
+        ex, ey = math.floor(b[0] / size), math.floor(b[1] / size)
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Movement fraction at which the next x/y cell boundary is reached,
+        # and the fraction needed to cross a whole cell
+        if dx:
+            t_max_x = ((cx + (step_x > 0)) * size - a[0]) / dx
+            t_delta_x = size / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy:
+            t_max_y = ((cy + (step_y > 0)) * size - a[1]) / dy
+            t_delta_y = size / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        cells = [(cx, cy)]
+        # Every step moves one axis towards the end cell, so this ends there
+        while (cx, cy) != (ex, ey):
+            if cy == ey or (cx != ex and t_max_x < t_max_y):
+                if cy != ey and t_max_y - t_max_x < 1e-9:
+                    cells.append((cx, cy + step_y))
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                if cx != ex and t_max_x - t_max_y < 1e-9:
+                    cells.append((cx + step_x, cy))
+                cy += step_y
+                t_max_y += t_delta_y
+            cells.append((cx, cy))
+        return cells
+
+    def _cells_for_box(self, a, b):
+        """Grid cells covered by the bounding box of two points."""
+        size = self.cell_size
+        x0, x1 = math.floor(min(a[0], b[0]) / size), math.floor(max(a[0], b[0]) / size)
+        y0, y1 = math.floor(min(a[1], b[1]) / size), math.floor(max(a[1], b[1]) / size)
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
@@ -0,0 +1,64 @@
+"""
+Documents of the zone_events collection.
+
+Shared by the live processor and the backfill job so both record zone
+entries, exits and line crossings in exactly the same shape.
+"""
+from timestamps import to_datetime
+
+
+def enter_event(obj_id, zone_id, timestamp, point):
+    """Build the event of an object entering a zone at (x, y) point."""
+    return {
+        "object_id": obj_id,
+        "zone_id": zone_id,
+        "event_type": "enter",
+        "timestamp": to_datetime(timestamp),
+        "metadata": {
+            "entry_point": {"x": point[0], "y": point[1]}
+        }
+    }
+
+
+def exit_event(obj_id, zone_id, timestamp, point, duration):
+    """Build the event of an object leaving a zone after duration seconds."""
+    return {
+        "object_id": obj_id,
+        "zone_id": zone_id,
+        "event_type": "exit",
+        "timestamp": to_datetime(timestamp),
+        "duration": duration,
+        "metadata": {
+            "exit_point": {"x": point[0], "y": point[1]}
+        }
+    }
+
+
+def cross_events(obj_id, previous, current, crossings):
+    """Build the events of a movement crossing line zones.
+
+    Args:
+        obj_id: Object identifier
+        previous: (x, y, timestamp) the movement started from
+        current: (x, y, timestamp) the movement ended at
+        crossings: Result of TripwireIndex.crossings for the movement
+
+    Returns:
+        List of events with the crossing time and point interpolated
+    """
+    px, py, pt = previous
+    x, y, timestamp = current
+    return [
+        {
+            "object_id": obj_id,
+            "zone_id": zone_id,
+            "event_type": "cross",
+            "direction": direction,
+            "timestamp": to_datetime(pt + t * (timestamp - pt)),
+            "metadata": {
+                "crossing_point": {"x": px + t * (x - px), "y": py + t * (y - py)},
+                "segment": segment
+            }
+        }
+        for zone_id, segment, t, direction in crossings
+    ]
@@ -0,0 +1,246 @@
+"""
+Zone membership, tripwire crossings and occupancy of tracked objects.
+"""
+import math
+import threading
+
+from geometry import point_in_polygon
+from hysteresis import OUTSIDE, ZoneHysteresis, ZoneMembership
+from partitions import PartitionFilter, covering_keys, partition_key
+from timestamps import to_epoch
+from tripwire import TripwireIndex
+from zone_events import cross_events, enter_event, exit_event
+from zone_shapes import compile_zone
+
+
+class ZoneProcessor:
+    def __init__(self, db_client, rollups=None, hysteresis=None, tripwire_cell_size=5.0, partition_filter=None,
+                 event_sink=None):
+        """Initialize the processor and load the active zones.
+
+        Args:
+            db_client: MongoClient of the tracking database
+            rollups: ZoneRollupWriter receiving exits and transitions
+            hysteresis: Default ZoneHysteresis of zones without their own
+            tripwire_cell_size: Grid cell size of the tripwire index
+            partition_filter: PartitionFilter of the partitions handled here
+            event_sink: Callable receiving the list of zone events of each
+                position, in order (default: insert into zone_events)
+        """
+        self.db = db_client['object_tracking']
+        self.partition_filter = partition_filter or PartitionFilter()
+        self.rollups = rollups  # ZoneRollupWriter receiving exits and transitions
+        self.hysteresis_defaults = hysteresis or ZoneHysteresis()
+        self.hysteresis = {}  # {zone_id: ZoneHysteresis}
+        self.zones_collection = self.db['zones']
+        self.zone_events_collection = self.db['zone_events']
+        self.event_sink = event_sink or self.zone_events_collection.insert_many
+        self.object_zones = {}  # tracks which objects are in which zones
+        self.memberships = {}  # {object_id: {zone_id: ZoneMembership}} for non-outside states
+        self.last_positions = {}  # {object_id: (x, y, timestamp)} for line crossings
+        self.object_partitions = {}  # {object_id: (site, floor)} of the last position
+        self.shapes = {}  # compiled zone geometry by zone id
+        self.partitions = {}  # {(site, floor): {zone_id: shape}} of the zones in each partition
+        self._partition_zones = {}  # {(site, floor): {zone_id: shape}} applying to positions there
+        self.lines = {}  # line zones by id
+        self.tripwire_cell_size = tripwire_cell_size
+        self.tripwires = {}  # {(site, floor): TripwireIndex} of the line zones in each partition
+        self.entry_times = {}  # {(object_id, zone_id): entry epoch seconds}
+        self.zone_occupants = {}  # {zone_id: set of object ids currently inside}
+        self.last_exited = {}  # {object_id: zone_id it most recently left}
+        self._occupancy_lock = threading.Lock()
+        self.zones = self._load_zones()
+        
+    def _load_zones(self):
+        """Load all active zones from the database
+        
+        Area zones (polygon, rect, circle, multipolygon) are returned and
+        their geometry compiled into self.shapes; line zones (type "line")
+        are indexed as tripwires instead. Both are grouped by their
+        site/floor partition.
+        """
+        zones = {}
+        shapes = {}
+        partitions = {}
+        lines = {}
+        line_partitions = {}
+        for zone in self.zones_collection.find({"active": True}):
+            key = partition_key(zone.get("site"), zone.get("floor"))
+            if zone.get("type") == "line":
+                lines[zone["_id"]] = zone
+                line_partitions.setdefault(key, {})[zone["_id"]] = zone
+                continue
+            try:
+                shapes[zone["_id"]] = compile_zone(zone)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping zone {zone['_id']} with invalid geometry: {e}")
+                continue
+            zones[zone["_id"]] = zone
+            partitions.setdefault(key, {})[zone["_id"]] = shapes[zone["_id"]]
+            self.hysteresis[zone["_id"]] = ZoneHysteresis.from_zone(zone, self.hysteresis_defaults)
+        
+        tripwires = {}
+        for key, partition_lines in line_partitions.items():
+            tripwires[key] = TripwireIndex(self.tripwire_cell_size)
+            tripwires[key].build(partition_lines)
+        self.shapes = shapes
+        self.partitions = partitions
+        self._partition_zones = {}
+        self.lines = lines
+        self.tripwires = tripwires
+        return zones
+        
+    def reload_zones(self):
+        """Reload zones from the database (called periodically)"""
+        self.zones = self._load_zones()
+        
+    def zones_for(self, key):
+        """Get the compiled zones applying to positions in a (site, floor) partition"""
+        zones = self._partition_zones.get(key)
+        if zones is None:
+            zones = {}
+            for covering in covering_keys(key):
+                zones.update(self.partitions.get(covering, {}))
+            self._partition_zones[key] = zones
+        return zones
+        
+    def is_point_in_polygon(self, point, polygon):
+        """Check if a point is inside a polygon using ray casting algorithm"""
+        return point_in_polygon(point, polygon)
+        
+    def _time_in_zone(self, obj_id, zone_id, timestamp):
+        """Seconds since the object entered the zone, or None if unknown"""
+        entry_time = self.entry_times.pop((obj_id, zone_id), None)
+        if entry_time is None:
+            # Entered before a restart; look up the stored entry event
+            last_entry = self.zone_events_collection.find_one({
+                "object_id": obj_id,
+                "zone_id": zone_id,
+                "event_type": "enter"
+            }, sort=[("timestamp", -1)])
+            if not last_entry:
+                return None
+            entry_time = to_epoch(last_entry["timestamp"])
+        return timestamp - entry_time
+        
+    def occupancy_snapshot(self):
+        """Get the occupancy of every active zone by the objects this worker tracks
+        
+        Zones spanning several partitions (global or site-wide zones) get
+        occupants from every worker handling one of those partitions, so each
+        worker reports its own occupants of all zones.
+        """
+        with self._occupancy_lock:
+            return {
+                str(zone_id): {
+                    "zone_name": zone.get("name", "Unnamed Zone"),
+                    "count": len(self.zone_occupants.get(zone_id, ())),
+                    "object_ids": sorted(self.zone_occupants.get(zone_id, ()))
+                }
+                for zone_id, zone in self.zones.items()
+            }
+        
+    def _check_tripwires(self, obj_id, x, y, timestamp, key):
+        """Get the crossing events of line zones between the previous and this position"""
+        previous = self.last_positions.get(obj_id)
+        self.last_positions[obj_id] = (x, y, timestamp)
+        if previous is None or timestamp <= previous[2]:
+            return []
+        
+        crossings = []
+        for covering in covering_keys(key):
+            index = self.tripwires.get(covering)
+            if index:
+                crossings.extend(index.crossings(previous[:2], (x, y)))
+        if not crossings:
+            return []
+        crossings.sort(key=lambda crossing: crossing[2])
+        
+        # Interpolate when and where each line was crossed
+        events = cross_events(obj_id, previous, (x, y, timestamp), crossings)
+        for event in events:
+            print(f"Object {obj_id} crossed line {self.lines[event['zone_id']]['name']} ({event['direction']})")
+        return events
+        
+    def process_position(self, obj_id, x, y, timestamp, site=None, floor=None):
+        """Process an object position and generate zone events if needed
+        
+        Only the zones of the position's site/floor partition are checked.
+        The position's crossings, exits and entries are passed to the event
+        sink together, in that order.
+        """
+        key = partition_key(site, floor)
+        if self.object_partitions.get(obj_id) != key:
+            # Moving to another floor crosses no line on either floor
+            self.object_partitions[obj_id] = key
+            self.last_positions.pop(obj_id, None)
+        events = self._check_tripwires(obj_id, x, y, timestamp, key)
+        
+        # Get current zones for this object
+        current_zones = self.object_zones.get(obj_id, set())
+        new_zones = set(current_zones)
+        memberships = self.memberships.setdefault(obj_id, {})
+        entries = []
+        exits = []
+        
+        # Zones of a partition the object left are evaluated as far outside
+        zones = self.zones_for(key)
+        if any(zone_id not in zones for zone_id in memberships):
+            zones = dict(zones)
+            for zone_id in memberships:
+                zones.setdefault(zone_id, None)
+        
+        # Check each zone, debouncing boundary noise per zone
+        for zone_id, shape in zones.items():
+            inside = shape.contains(x, y) if shape else False
+            membership = memberships.get(zone_id)
+            if membership is None:
+                if not inside:
+                    continue
+                membership = memberships[zone_id] = ZoneMembership()
+            
+            settings = self.hysteresis[zone_id]
+            distance = (shape.distance(x, y) if shape else math.inf) if settings.buffer else 0
+            change = membership.update(timestamp, x, y, inside, distance, settings)
+            if change:
+                (entries if change[0] == "enter" else exits).append((zone_id,) + change[1:])
+            if membership.state == OUTSIDE:
+                del memberships[zone_id]
+        
+        # Zone exits carry the time spent in the zone, so events are never
+        # updated after insertion
+        for zone_id, exit_time, exit_point in exits:
+            duration = self._time_in_zone(obj_id, zone_id, exit_time)
+            events.append(exit_event(obj_id, zone_id, exit_time, exit_point, duration))
+            new_zones.discard(zone_id)
+            self.last_exited[obj_id] = zone_id
+            if self.rollups:
+                self.rollups.record_exit(zone_id, exit_time, duration)
+            
+            print(f"Object {obj_id} exited zone {self.zones[zone_id]['name']}")
+        
+        for zone_id, entry_time, entry_point in entries:
+            events.append(enter_event(obj_id, zone_id, entry_time, entry_point))
+            new_zones.add(zone_id)
+            self.entry_times[(obj_id, zone_id)] = entry_time
+            print(f"Object {obj_id} entered zone {self.zones[zone_id]['name']}")
+        
+        if events:
+            self.event_sink(events)
+        
+        # Count moves into new zones from the zone the object left last
+        entered = new_zones - current_zones
+        if entered and obj_id in self.last_exited:
+            from_zone_id = self.last_exited.pop(obj_id)
+            if self.rollups:
+                for zone_id, entry_time, _ in entries:
+                    if zone_id != from_zone_id:
+                        self.rollups.record_transition(from_zone_id, zone_id, entry_time)
+        
+        # Update the object's zones and the zones' occupants
+        with self._occupancy_lock:
+            for zone_id in entered:
+                self.zone_occupants.setdefault(zone_id, set()).add(obj_id)
+            for zone_id in current_zones - new_zones:
+                self.zone_occupants.get(zone_id, set()).discard(obj_id)
+            self.object_zones[obj_id] = new_zones
@@ -0,0 +1,166 @@
+"""
+Zone geometry compiled for fast containment checks.
+
+Zones have one of these geometries:
+
+- "polygon" (the default): 'polygon' is a list of {'x', 'y'} vertices
+- "rect": 'rect' is {'min_x', 'min_y', 'max_x', 'max_y'}
+- "circle": 'center' is {'x', 'y'} and 'radius' a distance
+- "multipolygon": 'polygons' is a list of {'exterior': vertices,
+  'holes': [vertices, ...]}
+
+When zones are loaded each one is compiled once. Rectangles and circles are
+checked in constant time. Polygon rings become contiguous NumPy arrays of
+their edges with the bounding box and edge slopes precomputed, so a check
+is a bounding box test followed by one vectorized pass over the edges.
+Every shape offers contains(x, y) and distance(x, y) to its boundary.
+"""
+import math
+
+import numpy as np
+
+
+class PolygonShape:
+    """A simple polygon compiled for containment and distance queries."""
+
+    def __init__(self, vertices):
+        """Compile a polygon.
+
+        Args:
+            vertices: List of {'x', 'y'} vertex dicts
+        """
+        xs = np.array([v['x'] for v in vertices], dtype=np.float64)
+        ys = np.array([v['y'] for v in vertices], dtype=np.float64)
+        # Edge i runs from vertex i to vertex i + 1 (wrapping around)
+        self.x0, self.y0 = xs, ys
+        self.x1, self.y1 = np.roll(xs, -1), np.roll(ys, -1)
+        self.dx = self.x1 - self.x0
+        self.dy = self.y1 - self.y0
+        self.min_x, self.max_x = float(xs.min()), float(xs.max())
+        self.min_y, self.max_y = float(ys.min()), float(ys.max())
+
+        # x change per unit of y for ray crossings; horizontal edges never
+        # cross a horizontal ray, so their slope is unused
+        horizontal = self.dy == 0
+        self.inv_slope = np.where(horizontal, 0.0, self.dx / np.where(horizontal, 1.0, self.dy))
+        # Reciprocal squared edge lengths for projections; 0 for degenerate edges
+        length_sq = self.dx * self.dx + self.dy * self.dy
+        self.inv_length_sq = np.where(length_sq == 0, 0.0, 1.0 / np.where(length_sq == 0, 1.0, length_sq))
+
+    @property
+    def vertex_count(self):
+        """Number of vertices."""
+        return len(self.x0)
+
+    def in_bbox(self, x, y, margin=0.0):
+        """Check if a point is inside the bounding box grown by margin."""
+        return (self.min_x - margin <= x <= self.max_x + margin
+                and self.min_y - margin <= y <= self.max_y + margin)
+
+    def contains(self, x, y):
+        """Check if a point is inside the polygon (ray casting).
+
+        Boundary points are decided exactly as by geometry.point_in_polygon.
+        """
+        if not self.in_bbox(x, y):
+            return False
+        crosses = (self.y0 < y) != (self.y1 < y)
+        hits = crosses & (x <= self.x0 + (y - self.y0) * self.inv_slope)
+        return bool(np.count_nonzero(hits) & 1)
+
+    def distance(self, x, y):
+        """Distance from a point to the nearest edge."""
+        px = x - self.x0
+        py = y - self.y0
+        t = np.clip((px * self.dx + py * self.dy) * self.inv_length_sq, 0.0, 1.0)
+        return float(np.sqrt(np.min((px - t * self.dx) ** 2 + (py - t * self.dy) ** 2)))
+
+
+class RectShape:
+    """An axis-aligned rectangle."""
+
+    def __init__(self, min_x, min_y, max_x, max_y):
+        self.min_x, self.max_x = min(min_x, max_x), max(min_x, max_x)
+        self.min_y, self.max_y = min(min_y, max_y), max(min_y, max_y)
+
+    def contains(self, x, y):
+        """Check if a point is inside the rectangle (boundary included)."""
+        return self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y
+
+    def distance(self, x, y):
+        """Distance from a point to the nearest side."""
+        if self.contains(x, y):
+            return min(x - self.min_x, self.max_x - x, y - self.min_y, self.max_y - y)
+        dx = max(self.min_x - x, 0.0, x - self.max_x)
+        dy = max(self.min_y - y, 0.0, y - self.max_y)
+        return math.hypot(dx, dy)
+
+
+class CircleShape:
+    """A circle."""
+
+    def __init__(self, x, y, radius):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.radius_sq = radius * radius
+
+    def contains(self, x, y):
+        """Check if a point is inside the circle (boundary included)."""
+        dx = x - self.x
+        dy = y - self.y
+        return dx * dx + dy * dy <= self.radius_sq
+
+    def distance(self, x, y):
+        """Distance from a point to the circumference."""
+        return abs(math.hypot(x - self.x, y - self.y) - self.radius)
+
+
+class MultiPolygonShape:
+    """Polygons with optional holes, each ring compiled as a PolygonShape."""
+
+    def __init__(self, polygons):
+        """Compile the polygons.
+
+        Args:
+            polygons: List of {'exterior': vertices, 'holes': [vertices]}
+        """
+        self.parts = [
+            (PolygonShape(polygon['exterior']), [PolygonShape(hole) for hole in polygon.get('holes') or []])
+            for polygon in polygons
+        ]
+        self.rings = [ring for exterior, holes in self.parts for ring in [exterior] + holes]
+
+    def contains(self, x, y):
+        """Check if a point is inside a polygon and outside its holes.
+
+        Each ring is only ray cast when the point is in its bounding box.
+        """
+        for exterior, holes in self.parts:
+            if exterior.contains(x, y) and not any(hole.contains(x, y) for hole in holes):
+                return True
+        return False
+
+    def distance(self, x, y):
+        """Distance from a point to the nearest ring."""
+        return min(ring.distance(x, y) for ring in self.rings)
+
+
+def compile_zone(zone):
+    """Compile the geometry of an area zone document.
+
+    Raises:
+        ValueError: If the zone type is unknown
+    """
+    zone_type = zone.get('type') or 'polygon'
+    if zone_type == 'polygon':
+        return PolygonShape(zone['polygon'])
+    if zone_type == 'rect':
+        rect = zone['rect']
+        return RectShape(float(rect['min_x']), float(rect['min_y']), float(rect['max_x']), float(rect['max_y']))
+    if zone_type == 'circle':
+        center = zone['center']
+        return CircleShape(float(center['x']), float(center['y']), float(zone['radius']))
+    if zone_type == 'multipolygon':
+        return MultiPolygonShape(zone['polygons'])
+    raise ValueError(f"Unknown zone type: {zone_type}")
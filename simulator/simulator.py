@@ -11,6 +11,9 @@ broker_port = 1883
 topic = "objects/tracking/position"
 object_count = 10
 update_interval = 1/10  # seconds (10 updates per second)
+# Optional site and comma-separated floors objects are spread over
+site = os.environ.get("SIMULATOR_SITE", "")
+floors = [f.strip() for f in os.environ.get("SIMULATOR_FLOORS", "").split(",") if f.strip()]
 
 print(f"Connecting to MQTT broker at {broker_address}:{broker_port}")
 
@@ -43,7 +46,8 @@ for i in range(object_count):
         "x": random.uniform(0, 100),
         "y": random.uniform(0, 100),
         "speed": random.uniform(0.5, 2),
-        "direction": random.uniform(0, 2 * math.pi)
+        "direction": random.uniform(0, 2 * math.pi),
+        "floor": floors[i % len(floors)] if floors else None
     }
 
 try:
@@ -73,6 +77,10 @@ try:
                 "x": obj["x"],
                 "y": obj["y"]
             }
+            if site:
+                message["site"] = site
+            if obj["floor"]:
+                message["floor"] = obj["floor"]
             client.publish(topic, json.dumps(message))
             
         time.sleep(update_interval)
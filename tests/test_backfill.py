@@ -0,0 +1,39 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("influxdb_client")
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "processor"))
+sys.path.insert(1, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+import backfill
+import settings
+from influx_tiers import TIERS
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.inserted = []
+
+    def insert_one(self, document):
+        self.inserted.append(document)
+
+
+def test_backfill_uses_the_live_processor_settings():
+    assert backfill.zone_hysteresis_defaults is settings.zone_hysteresis_defaults
+    assert backfill.mongodb_uri == settings.mongodb_uri
+
+
+@pytest.mark.parametrize("age, tier", [(timedelta(days=1), 0), (timedelta(days=30), 1), (timedelta(days=365), 2)])
+def test_job_reads_the_tier_holding_its_range(age, tier):
+    jobs = RecordingCollection()
+    end_time = datetime.utcnow()
+
+    backfill.create_job({"backfill_jobs": jobs}, "zone-1", end_time - age, end_time)
+
+    assert jobs.inserted[0]["bucket"] == TIERS[tier]["bucket"]
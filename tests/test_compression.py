@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "processor"))
+
+from benchmark_compression import compress, max_error, stop_and_go_trace
+from compression import PositionCompressor
+
+
+@pytest.mark.parametrize("mode, bound", [("deadband", 0.5), ("swinging_door", 0.25)])
+def test_reconstruction_stays_within_the_bound(mode, bound):
+    trace = stop_and_go_trace(5000, rate=10)
+    compressor = PositionCompressor(mode, deadband=0.5, tolerance=0.25, heartbeat=30)
+
+    stored = compress(compressor, trace)
+
+    assert len(stored) < len(trace) / 4
+    assert max_error(trace, stored, mode) <= bound + 1e-9
+    assert stored[-1] == trace[-1]
+
+
+@pytest.mark.parametrize("mode", ["deadband", "swinging_door"])
+def test_silent_object_stores_its_final_position(mode):
+    compressor = PositionCompressor(mode, deadband=0.5, tolerance=0.25, heartbeat=30)
+    assert compressor.offer("obj", 0.0, 1.0, 1.0, ("hq", "1")) == [(0.0, 1.0, 1.0)]
+    assert compressor.offer("obj", 1.0, 1.1, 1.0, ("hq", "1")) == []
+
+    assert compressor.expire(30.0) == []
+    assert compressor.expire(31.0) == [("obj", ("hq", "1"), (1.0, 1.1, 1.0))]
+    assert compressor.flush() == []
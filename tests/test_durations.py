@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from durations import parse_duration
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("500ms", 0.5),
+    ("1s", 1),
+    ("5m", 300),
+    ("1m30s", 90),
+    ("1h15m", 4500),
+    ("1d12h", 129600),
+    ("2w", 1209600),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", ["", "0s", "0m0s", "1", "m", "1mo", "1y", "1h 15m", "-1s", "1.5s"])
+def test_parse_duration_rejects(value):
+    with pytest.raises(ValueError):
+        parse_duration(value)
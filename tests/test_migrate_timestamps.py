@@ -0,0 +1,102 @@
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from migrate_timestamps import NUMERIC_TYPES, migrate_field
+
+
+def matches(doc, query):
+    """Evaluate the filters migrate_field uses."""
+    for field, condition in query.items():
+        value = doc.get(field)
+        if "$type" in condition:
+            assert condition["$type"] == NUMERIC_TYPES
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return False
+        if "$gt" in condition and not value > condition["$gt"]:
+            return False
+        if "$in" in condition and value not in condition["$in"]:
+            return False
+    return True
+
+
+class Cursor(list):
+    def sort(self, key, direction):
+        return Cursor(sorted(self, key=lambda doc: doc[key], reverse=direction < 0))
+
+    def limit(self, count):
+        return Cursor(self[:count])
+
+
+class Collection:
+    """In-memory stand-in for the collection methods migrate_field calls."""
+
+    def __init__(self, docs=()):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+
+    def find(self, query, projection=None):
+        return Cursor(dict(doc) for doc in self.docs.values() if matches(doc, query))
+
+    def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    def update_many(self, query, pipeline):
+        # The $toDate pipeline: epoch seconds -> UTC date, as stored by PyMongo
+        (field,) = pipeline[0]["$set"]
+        modified = 0
+        for doc in self.docs.values():
+            if matches(doc, query):
+                doc[field] = datetime.fromtimestamp(doc[field], tz=timezone.utc).replace(tzinfo=None)
+                modified += 1
+        return SimpleNamespace(modified_count=modified)
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        doc.update(update.get("$set", {}))
+        for field in update.get("$unset", {}):
+            doc.pop(field, None)
+
+
+def make_db(events):
+    return {"events": Collection(events), "migrations": Collection()}
+
+
+def test_converts_epoch_seconds_in_batches():
+    already = datetime(2024, 1, 1)
+    db = make_db([
+        {"_id": 1, "timestamp": 1_700_000_000.5},
+        {"_id": 2, "timestamp": already},
+        {"_id": 3, "timestamp": 1_700_000_060},
+    ])
+
+    assert migrate_field(db, "events", "timestamp", batch_size=1) == 2
+
+    docs = db["events"].docs
+    assert docs[1]["timestamp"] == datetime(2023, 11, 14, 22, 13, 20, 500000)
+    assert docs[2]["timestamp"] == already
+    assert docs[3]["timestamp"] == datetime(2023, 11, 14, 22, 14, 20)
+
+
+def test_interrupted_run_resumes_after_its_checkpoint():
+    db = make_db([{"_id": 1, "timestamp": 1_700_000_000}, {"_id": 2, "timestamp": 1_700_000_000}])
+    db["migrations"].update_one({"_id": "timestamps:events.timestamp"}, {"$set": {"last_id": 1}})
+
+    assert migrate_field(db, "events", "timestamp") == 1
+    assert isinstance(db["events"].docs[1]["timestamp"], int)
+
+
+def test_completed_run_picks_up_later_epoch_writes():
+    db = make_db([{"_id": 1, "timestamp": 1_700_000_000}, {"_id": 2, "timestamp": 1_700_000_000}])
+    migrate_field(db, "events", "timestamp")
+    # A processor that was not upgraded rewrites an already migrated document
+    db["events"].docs[1]["timestamp"] = 1_700_000_100.0
+
+    assert migrate_field(db, "events", "timestamp") == 1
+    assert db["events"].docs[1]["timestamp"] == datetime(2023, 11, 14, 22, 15, 0)
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "processor"))
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from rollups import ZoneRollupWriter
+
+HOUR = 1_700_000_000 - 1_700_000_000 % 3600
+
+
+class FailingCollection:
+    """Collection whose bulk_write fails with the given error."""
+
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+        self.batches = []
+
+    def bulk_write(self, operations, ordered=True):
+        self.batches.append(operations)
+        if self.error:
+            raise self.error
+
+
+def make_writer(dwell_error=None, transitions_error=None):
+    db = {
+        "zone_dwell_hourly": FailingCollection("zone_dwell_hourly", dwell_error),
+        "zone_transitions_hourly": FailingCollection("zone_transitions_hourly", transitions_error),
+    }
+    return ZoneRollupWriter(db), db
+
+
+def test_partial_bulk_write_requeues_only_failed_counters():
+    error = BulkWriteError({
+        "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}],
+        "nInserted": 0, "nUpserted": 1, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+    })
+    writer, _ = make_writer(dwell_error=error)
+    writer.record_exit("zone-a", HOUR + 10, 5)
+    writer.record_exit("zone-b", HOUR + 20, 5)
+
+    writer.flush()
+
+    assert [key[0] for key in writer._dwell] == ["zone-b"]
+    assert next(iter(writer._dwell.values()))["visits"] == 1
+
+
+def test_failure_before_send_requeues_every_counter():
+    writer, _ = make_writer(transitions_error=AutoReconnect("connection refused"))
+    writer.record_transition("zone-a", "zone-b", HOUR + 10)
+    writer.record_transition("zone-b", "zone-c", HOUR + 20)
+
+    writer.flush()
+
+    assert sorted(key[0] for key in writer._transitions) == ["zone-a", "zone-b"]
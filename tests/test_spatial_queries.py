@@ -0,0 +1,35 @@
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+
+from spatial_queries import flux_string, region_visits
+
+
+class RecordingQueryAPI:
+    def __init__(self):
+        self.queries = []
+
+    def query(self, flux_query):
+        self.queries.append(flux_query)
+        return []
+
+
+def test_flux_string_escapes_quotes_backslashes_and_interpolation():
+    assert flux_string("hq") == '"hq"'
+    assert flux_string('a"b') == '"a\\"b"'
+    assert flux_string("a\\") == '"a\\\\"'
+    assert flux_string("${token}") == '"\\${token}"'
+
+
+def test_region_visits_keeps_site_and_floor_inside_string_literals():
+    query_api = RecordingQueryAPI()
+    site = 'hq") or (r._measurement == "x'
+
+    region_visits(query_api, "positions", datetime(2024, 1, 1), datetime(2024, 1, 2), (0, 0, 10, 10),
+                  site=site, floor="1\\")
+
+    (flux_query,) = query_api.queries
+    assert 'r.site == "hq\\") or (r._measurement == \\"x"' in flux_query
+    assert 'r.floor == "1\\\\")' in flux_query
@@ -0,0 +1,77 @@
+import inspect
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("dash")
+pytest.importorskip("dash_bootstrap_components")
+pytest.importorskip("paho.mqtt")
+pytest.importorskip("requests")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import dash
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+
+from callbacks import tracking_callbacks
+from config import LIVE_PUSH_REFRESH_INTERVAL
+
+# Callback functions without Dash's request context wrapper
+update_tracking_interval = inspect.unwrap(tracking_callbacks.update_tracking_interval)
+update_graph = inspect.unwrap(tracking_callbacks.update_graph)
+
+GRAPH_SETTINGS = (['show'], 20, 0, 0, 100, 100, None, ['show'])
+
+
+class StaticObjectStore:
+    def get_active_objects(self):
+        return {"obj-1": {"x": 1.0, "y": 2.0}}
+
+    def get_object_trails(self, max_trail_points=20):
+        return {}
+
+
+class StaticZoneCache:
+    def __init__(self, version):
+        self.version = version
+
+    def get_tracking_traces(self):
+        return [{"type": "scatter", "name": "zone", "x": [0, 1, 1], "y": [0, 0, 1]}]
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    monkeypatch.setattr(tracking_callbacks, "object_store", StaticObjectStore())
+    monkeypatch.setattr(tracking_callbacks, "zone_cache", StaticZoneCache("v1"))
+
+
+def triggered_by(component_id):
+    """Run the next callback call as if component_id had triggered it."""
+    return context_value.set(AttributeDict(
+        triggered_inputs=[{"prop_id": f"{component_id}.n_intervals", "value": 1}]
+    ))
+
+
+def test_live_push_keeps_a_slow_tracking_interval():
+    assert update_tracking_interval(3, ['live']) == LIVE_PUSH_REFRESH_INTERVAL * 1000
+    assert update_tracking_interval(4, []) == 250
+
+
+def test_live_tick_skips_redraw_while_zones_are_unchanged(stores):
+    token = triggered_by("tracking-interval")
+    try:
+        assert update_graph(1, *GRAPH_SETTINGS, ['live'], "v1") == (dash.no_update, dash.no_update)
+    finally:
+        context_value.reset(token)
+
+
+def test_live_tick_redraws_zone_overlays_after_zone_change(stores):
+    token = triggered_by("tracking-interval")
+    try:
+        fig, version = update_graph(1, *GRAPH_SETTINGS, ['live'], "v0")
+    finally:
+        context_value.reset(token)
+    assert version == "v1"
+    assert [trace.name for trace in fig.data] == ["zone", "Objects", "Trails"]
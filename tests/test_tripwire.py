@@ -0,0 +1,75 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "processor"))
+
+from geometry import segment_intersection
+from tripwire import TripwireIndex
+
+
+def line_zone(*points):
+    return {"line": [{"x": x, "y": y} for x, y in points]}
+
+
+def brute_force(zones, start, end):
+    """Crossings found by testing the movement against every segment."""
+    found = []
+    for zone_id, zone in zones.items():
+        points = [(p["x"], p["y"]) for p in zone["line"]]
+        for index, (seg_start, seg_end) in enumerate(zip(points, points[1:])):
+            hit = segment_intersection(start, end, seg_start, seg_end)
+            if hit and hit[0] > 0:
+                found.append((zone_id, index, hit[0], "forward" if hit[1] > 0 else "reverse"))
+    return sorted(found, key=lambda crossing: crossing[2])
+
+
+def test_long_diagonal_move_walks_only_the_cells_it_crosses():
+    zones = {
+        "gate": line_zone((400, 390), (410, 420)),
+        "far": line_zone((900, 100), (920, 100)),
+    }
+    zones.update({f"wire-{i}": line_zone((i * 7.0, -50), (i * 7.0, -40)) for i in range(500)})
+    index = TripwireIndex(cell_size=5.0)
+    index.build(zones)
+
+    # The bounding box holds 201 * 201 cells; the walk steps through 400
+    # cell boundaries, passing each of the 200 grid corners it meets on
+    # both sides
+    cells = index._cells_along((0.0, 0.0), (1000.0, 1000.0))
+    assert len(cells) == 1 + 400 + 200
+    assert len(set(cells)) == len(cells)
+
+    assert len(index._candidates((0.0, 0.0), (1000.0, 1000.0))) == 1
+    crossings = index.crossings((0.0, 0.0), (1000.0, 1000.0))
+    assert [(zone_id, index) for zone_id, index, _, _ in crossings] == [("gate", 0)]
+
+
+def test_glitch_longer_than_the_index_tests_every_segment():
+    zones = {"gate": line_zone((400, 390), (410, 420))}
+    index = TripwireIndex(cell_size=5.0)
+    index.build(zones)
+
+    assert index._candidates((0.0, 0.0), (1000.0, 1000.0)) == index._segments
+    assert [crossing[0] for crossing in index.crossings((0.0, 0.0), (1000.0, 1000.0))] == ["gate"]
+
+
+def test_cell_walk_matches_testing_every_segment():
+    rng = random.Random(7)
+    zones = {
+        f"line-{i}": line_zone(*[(rng.uniform(-50, 150), rng.uniform(-50, 150)) for _ in range(3)])
+        for i in range(40)
+    }
+    # Lines through grid corners and along cell boundaries
+    zones["corner"] = line_zone((0, 10), (10, 0))
+    zones["boundary"] = line_zone((5, -20), (5, 120))
+    index = TripwireIndex(cell_size=5.0)
+    index.build(zones)
+
+    moves = [((0, 0), (10, 10)), ((10, 10), (0, 0)), ((5, 5), (-5, 20)), ((5, 0), (5, 30))]
+    for _ in range(500):
+        start = (rng.choice([rng.uniform(-50, 150), rng.randrange(-10, 30) * 5.0]), rng.uniform(-50, 150))
+        end = (rng.uniform(-50, 150), rng.choice([rng.uniform(-50, 150), rng.randrange(-10, 30) * 5.0]))
+        moves.append((start, end))
+    for start, end in moves:
+        assert index.crossings(start, end) == brute_force(zones, start, end)
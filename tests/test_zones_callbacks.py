@@ -0,0 +1,98 @@
+import inspect
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("dash")
+pytest.importorskip("dash_bootstrap_components")
+pytest.importorskip("paho.mqtt")
+pytest.importorskip("requests")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from dash._callback import GLOBAL_CALLBACK_MAP
+
+from callbacks import zones_callbacks
+from components.tabs.zones_tab import create_zone_management_tab
+
+# Callback functions without Dash's request context wrapper
+update_zone_form = inspect.unwrap(zones_callbacks.update_zone_form)
+save_zone = inspect.unwrap(zones_callbacks.save_zone)
+
+# relayoutData of a circle and of an ellipse drawn with the drawcircle tool
+DRAWN_CIRCLE = {"shapes": [{"type": "circle", "x0": 10, "y0": 20, "x1": 30, "y1": 40}]}
+DRAWN_ELLIPSE = {"shapes": [{"type": "circle", "x0": 10, "y0": 20, "x1": 30, "y1": 50}]}
+
+
+class RecordingAPIClient:
+    def __init__(self):
+        self.posted = []
+
+    def post_json(self, path, json=None):
+        self.posted.append((path, json))
+        return {"status": "created"}
+
+
+def find_component(component, component_id):
+    """Depth-first search of a Dash layout for a component id."""
+    if getattr(component, "id", None) == component_id:
+        return component
+    children = getattr(component, "children", None)
+    if not isinstance(children, (list, tuple)):
+        children = [children]
+    for child in children:
+        if child is not None and not isinstance(child, (str, int, float)):
+            found = find_component(child, component_id)
+            if found is not None:
+                return found
+    return None
+
+
+def test_drawing_keeps_zone_type_in_form():
+    form = find_component(create_zone_management_tab(), "zone-form")
+    assert find_component(form, "zone-type") is not None
+
+    status, _ = update_zone_form(DRAWN_CIRCLE)
+    assert status.startswith("Shape detected")
+    # Drawing must not rebuild the form and drop its inputs
+    assert not any("zone-form.children" in key for key in GLOBAL_CALLBACK_MAP)
+
+
+def test_draw_then_save_circle(monkeypatch):
+    api_client = RecordingAPIClient()
+    monkeypatch.setattr(zones_callbacks, "api_client", api_client)
+    monkeypatch.setattr(zones_callbacks, "zone_cache", None)
+
+    status, _ = update_zone_form(DRAWN_CIRCLE, "circle")
+    assert status.startswith("Shape detected")
+    save_zone(1, "Pad", "Landing pad", "#00FF00", "circle", DRAWN_CIRCLE)
+
+    assert len(api_client.posted) == 1
+    path, zone = api_client.posted[0]
+    assert path == "/zones"
+    assert zone["type"] == "circle"
+    assert zone["center"] == {"x": 20, "y": 30}
+    assert zone["radius"] == 10
+    assert "rect" not in zone
+
+
+def test_draw_then_save_ellipse_as_circle(monkeypatch):
+    api_client = RecordingAPIClient()
+    monkeypatch.setattr(zones_callbacks, "api_client", api_client)
+    monkeypatch.setattr(zones_callbacks, "zone_cache", None)
+
+    # The user is told the stretched drawing becomes a circle
+    status, style = update_zone_form(DRAWN_ELLIPSE, "circle")
+    assert "not round" in status and "12.50" in status
+    assert style["color"] == "orange"
+    save_zone(1, "Pad", "Landing pad", "#00FF00", "circle", DRAWN_ELLIPSE)
+
+    _, zone = api_client.posted[0]
+    assert zone["center"] == {"x": 20, "y": 35}
+    # Mean of the half-axes 10 and 15, not the smaller one
+    assert zone["radius"] == 12.5
+
+    # Saved as an area, the same box is kept as drawn
+    status, _ = update_zone_form(DRAWN_ELLIPSE, "polygon")
+    assert status.startswith("Shape detected")